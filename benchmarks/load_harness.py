@@ -0,0 +1,637 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import resource
+import selectors
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import requests
+from benchmarks.payloads import (
+    portfolio_page, synthetic_fear_and_greed, synthetic_global_metrics, synthetic_listings,
+    synthetic_portfolios, synthetic_price_alerts, synthetic_subscriptions,
+)
+from benchmarks.run import isolate_data_paths
+from config.settings import config
+from scripts.webhook_standin import FakeBotApi, percentile
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+OWNER_CHAT_ID = "10000"
+MARKET_VARIANTS = 12
+
+SCENARIOS = {
+    "smoke": {"portfolios": 20, "tickers": 10, "coins": 3500, "chats": 5, "alerts": 50},
+    "1k-portfolios": {"portfolios": 1000, "tickers": 20, "coins": 3500, "chats": 50, "alerts": 200},
+    "500-tickers": {"portfolios": 50, "tickers": 500, "coins": 3500, "chats": 200, "alerts": 2000},
+    "full": {"portfolios": 1000, "tickers": 500, "coins": 3500, "chats": 200, "alerts": 2000},
+}
+
+class SimulatedClock:
+    def __init__(self):
+        self._monotonic = time.monotonic
+        self._time = time.time
+        self._offset = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def skipped(self) -> float:
+        return self._offset
+
+    def monotonic(self) -> float:
+        return self._monotonic() + self._offset
+
+    def time(self) -> float:
+        return self._time() + self._offset
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            with self._lock:
+                self._offset += seconds
+
+    def install(self):
+        time.monotonic = self.monotonic
+        time.time = self.time
+
+    def uninstall(self):
+        time.monotonic = self._monotonic
+        time.time = self._time
+
+class FastForwardSelector(selectors.DefaultSelector):
+    def __init__(self, clock: SimulatedClock, busy: Callable[[], bool], quiet_period: float):
+        super().__init__()
+        self.clock = clock
+        self.busy = busy
+        self.quiet_period = quiet_period
+
+    def select(self, timeout=None):
+        if timeout is None or timeout <= 0:
+            return super().select(timeout)
+
+        deadline = self.clock.monotonic() + timeout
+        while True:
+            remaining = deadline - self.clock.monotonic()
+            if remaining <= 0:
+                return []
+
+            events = super().select(min(remaining, self.quiet_period))
+            if events:
+                return events
+
+            # Nothing arrived for a quiet period and no job or thread is working: jump to the next timer
+            if not self.busy():
+                self.clock.advance(deadline - self.clock.monotonic())
+                return []
+
+class SimulatedEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: SimulatedClock, quiet_period: float = 0.002):
+        self.active_jobs = 0
+        self.outbound_queue = None
+        self._executor_jobs = 0
+        super().__init__(FastForwardSelector(clock, self.busy, quiet_period))
+
+    def busy(self) -> bool:
+        # Messages a job left in the outbound queue are still work, even after the job itself returned
+        outbound = self.outbound_queue.pending if self.outbound_queue is not None else 0
+        return self.active_jobs > 0 or self._executor_jobs > 0 or outbound > 0
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._executor_jobs += 1
+        future.add_done_callback(self._executor_job_done)
+        return future
+
+    def _executor_job_done(self, future):
+        self._executor_jobs -= 1
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self, name: str, elapsed: float = None) -> dict:
+        with self._lock:
+            samples = sorted(self.samples.get(name, []))
+        return summarize(samples, elapsed)
+
+def summarize(samples: List[float], elapsed: float = None) -> dict:
+    if not samples:
+        return {"count": 0}
+
+    summary = {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+    }
+    if elapsed:
+        summary["per_second"] = round(len(samples) / elapsed, 1)
+    return summary
+
+class StandInServer:
+    def __init__(self, host: str, port: int, coins: int, recording: Optional[dict] = None, seed: int = 0,
+                 page_holdings: int = 10, page_volatility: float = 0.01, api_latency: float = 0.0,
+                 page_latency: float = 0.0):
+        self.recording = recording or {}
+        self.page_holdings = page_holdings
+        self.page_volatility = page_volatility
+        self.api_latency = api_latency
+        self.page_latency = page_latency
+        self.recorder = LatencyRecorder()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+        self._encoded: Dict[tuple, bytes] = {}
+        self._portfolios: Dict[int, float] = {}
+
+        base_coins = (self.recording.get("listings") or {}).get("data") or synthetic_listings(coins, seed)["data"]
+        self.coins = scale_listings(base_coins, coins)
+        self.symbols = [coin["symbol"] for coin in self.coins]
+        self._listings = self._market_variants(self.coins)
+        self._global_metrics = [
+            self.recording.get("global_metrics") or synthetic_global_metrics(seed + index)
+            for index in range(MARKET_VARIANTS)
+        ]
+        self._fear_and_greed = [
+            self.recording.get("fear_and_greed") or synthetic_fear_and_greed(seed + index)
+            for index in range(MARKET_VARIANTS)
+        ]
+
+        # Encode every market payload up front so the stand-in's own allocations don't show up as bot memory growth
+        for index in range(MARKET_VARIANTS):
+            self._encode(("listings", index, len(self.coins)), lambda: self._listings_payload(index, len(self.coins)))
+            self._encode(("global", index), lambda: self._global_metrics[index])
+            self._encode(("fng", index), lambda: self._fear_and_greed[index])
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stand-in", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self, elapsed: float = None) -> Dict[str, dict]:
+        with self._lock:
+            routes = list(self._requests)
+        return {route: self.recorder.summary(route, elapsed) for route in routes}
+
+    def respond(self, path: str, query: Dict[str, List[str]]) -> Optional[tuple]:
+        if path == "/v1/cryptocurrency/listings/latest":
+            index = self._count("cmc_listings") % MARKET_VARIANTS
+            limit = int(query.get("limit", [len(self.coins)])[0])
+            return self.api_latency, self._encode(("listings", index, limit), lambda: self._listings_payload(index, limit))
+
+        if path == "/v1/global-metrics/quotes/latest":
+            index = self._count("cmc_global_metrics") % MARKET_VARIANTS
+            return self.api_latency, self._encode(("global", index), lambda: self._global_metrics[index])
+
+        if path.rstrip("/") == "/fng":
+            index = self._count("fear_and_greed") % MARKET_VARIANTS
+            return self.api_latency, self._encode(("fng", index), lambda: self._fear_and_greed[index])
+
+        if path.startswith("/p/"):
+            self._count("portfolio_page")
+            return self.page_latency, self._portfolio_page(int(path[3:8]))
+
+        return None
+
+    def _count(self, route: str) -> int:
+        with self._lock:
+            count = self._requests.get(route, 0)
+            self._requests[route] = count + 1
+            return count
+
+    def _encode(self, key: tuple, build: Callable[[], dict]) -> bytes:
+        with self._lock:
+            payload = self._encoded.get(key)
+        if payload is None:
+            payload = json.dumps(build()).encode()
+            with self._lock:
+                self._encoded[key] = payload
+        return payload
+
+    def _listings_payload(self, index: int, limit: int) -> dict:
+        return {"status": {"error_code": 0, "credit_count": max(1, limit // 200)}, "data": self._listings[index][:limit]}
+
+    def _market_variants(self, coins: List[dict]) -> List[List[dict]]:
+        variants, current = [], coins
+        for _ in range(MARKET_VARIANTS):
+            current = [_drift_coin(coin, self._rng) for coin in current]
+            variants.append(current)
+        return variants
+
+    def _portfolio_page(self, index: int) -> bytes:
+        pages = self.recording.get("pages")
+        if pages:
+            return pages[index % len(pages)]
+
+        with self._lock:
+            previous = self._portfolios.get(index) or random.Random(index).uniform(1_000, 250_000)
+            value = previous * math.exp(self._rng.gauss(0, self.page_volatility))
+            self._portfolios[index] = value
+
+        change = (value / previous - 1) * 100
+        return portfolio_page(
+            f"user{index:05d}", value, change, value - previous, holdings=self.page_holdings, seed=index
+        ).encode()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                started = time.perf_counter()
+                parsed = urlparse(self.path)
+                response = stand_in.respond(parsed.path, parse_qs(parsed.query))
+
+                if response is None:
+                    self.send_error(404)
+                    return
+
+                latency, body = response
+                if latency:
+                    time.sleep(latency)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html" if parsed.path.startswith("/p/") else "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                stand_in.recorder.add(_route(parsed.path), time.perf_counter() - started)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def _route(path: str) -> str:
+    if path.startswith("/p/"):
+        return "portfolio_page"
+    if "listings" in path:
+        return "cmc_listings"
+    if "global-metrics" in path:
+        return "cmc_global_metrics"
+    return "fear_and_greed"
+
+def _drift_coin(coin: dict, rng: random.Random) -> dict:
+    quote = dict(coin["quote"]["USD"])
+    if quote.get("price") is not None:
+        move = rng.gauss(0, 0.01)
+        quote["price"] *= math.exp(move)
+        if quote.get("market_cap") is not None:
+            quote["market_cap"] *= math.exp(move)
+    if quote.get("percent_change_24h") is not None:
+        quote["percent_change_24h"] = quote["percent_change_24h"] * 0.9 + rng.gauss(0, 1.5)
+    return dict(coin, quote={"USD": quote})
+
+def scale_listings(coins: List[dict], count: int) -> List[dict]:
+    scaled = list(coins[:count])
+    copy = 1
+    while len(scaled) < count:
+        for coin in coins[:count - len(scaled)]:
+            scaled.append(dict(
+                coin, id=len(scaled) + 1, cmc_rank=len(scaled) + 1,
+                symbol=f"{coin['symbol']}{copy}", name=f"{coin['name']} {copy}",
+            ))
+        copy += 1
+    return scaled
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+def record(output_dir: str, portfolio_urls: List[str]):
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    os.makedirs(os.path.join(output_dir, "pages"), exist_ok=True)
+
+    def save(name: str, data: dict):
+        with open(os.path.join(output_dir, name), "w") as f:
+            json.dump(data, f)
+        logger.info(f"Recorded {name}")
+
+    if config.COINMARKETCAP_API_KEY:
+        headers = {"Accepts": "application/json", "X-CMC_PRO_API_KEY": config.COINMARKETCAP_API_KEY}
+        for name, path, params in (
+            ("global_metrics.json", "/v1/global-metrics/quotes/latest", None),
+            ("listings.json", "/v1/cryptocurrency/listings/latest", {"start": 1, "limit": 3500, "convert": "USD"}),
+        ):
+            response = session.get(f"{config.CMC_API_URL}{path}", headers=headers, params=params,
+                                   timeout=config.LISTINGS_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            save(name, response.json())
+    else:
+        logger.warning("COINMARKETCAP_API_KEY is not set, skipping CoinMarketCap responses")
+
+    response = session.get(f"{config.FEAR_GREED_API_URL}/fng/", timeout=config.MARKET_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    save("fear_and_greed.json", response.json())
+
+    recorded_pages = 0
+    for url in portfolio_urls:
+        try:
+            response = session.get(url, timeout=config.HTTP_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Failed to record portfolio page {url}: {e}")
+            continue
+
+        with open(os.path.join(output_dir, "pages", f"{recorded_pages:04d}.html"), "wb") as f:
+            f.write(response.content)
+        recorded_pages += 1
+
+    save("manifest.json", {"recorded_at": datetime.now().isoformat(timespec="seconds"), "pages": recorded_pages})
+
+def load_recording(path: str) -> dict:
+    recording = {}
+    for key in ("global_metrics", "listings", "fear_and_greed"):
+        file_path = os.path.join(path, f"{key}.json")
+        if os.path.exists(file_path):
+            with open(file_path, "r") as f:
+                recording[key] = json.load(f)
+
+    pages_dir = os.path.join(path, "pages")
+    pages = []
+    for filename in sorted(os.listdir(pages_dir)) if os.path.isdir(pages_dir) else []:
+        with open(os.path.join(pages_dir, filename), "rb") as f:
+            pages.append(f.read())
+    recording["pages"] = pages
+
+    logger.info(f"Loaded recording from {path}: {sorted(k for k, v in recording.items() if v)} ({len(pages)} pages)")
+    return recording
+
+def _instrument_async(loop: SimulatedEventLoop, recorder: LatencyRecorder, name: str, func):
+    async def wrapper(*args, **kwargs):
+        loop.active_jobs += 1
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            recorder.add(name, time.perf_counter() - started)
+            loop.active_jobs -= 1
+    return wrapper
+
+def _instrument(recorder: LatencyRecorder, name: str, func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            recorder.add(name, time.perf_counter() - started)
+    return wrapper
+
+async def _sample_memory(samples: List[tuple], interval: float):
+    while True:
+        samples.append((time.monotonic(), current_rss_mb()))
+        await asyncio.sleep(interval)
+
+async def run_scenario(settings: dict, hours: float, stand_in: StandInServer, api: FakeBotApi,
+                       sample_interval: float) -> dict:
+    from src.monitoring.crypto_monitor import CryptoMarketMonitor, schedule_market_updates
+    from src.monitoring.portfolio_monitor import PortfolioMonitor, schedule_portfolio_updates
+    from src.monitoring.price_alerts import price_alert_engine
+    from src.utils.checkpoint import StateCheckpoint
+    from src.utils.data_manager import DataManager
+    from src.utils.message_queue import outbound_queue
+    from src.utils.scheduler import Scheduler
+    from src.utils.subscriptions import subscription_registry
+    from src.utils.timeseries import schedule_history_compaction
+
+    loop = asyncio.get_running_loop()
+    loop.outbound_queue = outbound_queue
+    recorder = LatencyRecorder()
+
+    portfolios = synthetic_portfolios(settings["portfolios"], base_url=f"{stand_in.url}/p")
+    tickers = stand_in.symbols[:settings["tickers"]]
+    subscriptions = synthetic_subscriptions(settings["chats"], tickers, [p["name"] for p in portfolios])
+    chat_ids = [OWNER_CHAT_ID] + [s["chat_id"] for s in subscriptions]
+    config.ALLOWED_CHAT_IDS = chat_ids
+
+    await asyncio.to_thread(DataManager.save_data, portfolios, tickers)
+    subscription_registry.load(subscriptions)
+    price_alert_engine.load(synthetic_price_alerts(
+        settings["alerts"], stand_in.coins[:max(100, settings["tickers"])], chat_ids
+    ))
+    alerts_loaded = price_alert_engine.stats()["alerts"]
+
+    scheduler = Scheduler()
+    market_monitor = CryptoMarketMonitor(checkpoint=StateCheckpoint("market_monitor"))
+    portfolio_monitor = PortfolioMonitor(checkpoint=StateCheckpoint("portfolio_monitor"))
+
+    market_monitor.run_market_update = _instrument_async(loop, recorder, "market_update", market_monitor.run_market_update)
+    portfolio_monitor.update_portfolio = _instrument_async(loop, recorder, "portfolio_update", portfolio_monitor.update_portfolio)
+    portfolio_monitor.get_portfolio_data = _instrument(recorder, "portfolio_scrape", portfolio_monitor.get_portfolio_data)
+
+    memory_samples: List[tuple] = []
+    sampler = asyncio.create_task(_sample_memory(memory_samples, sample_interval))
+
+    schedule_market_updates(scheduler, market_monitor)
+    schedule_portfolio_updates(scheduler, portfolio_monitor)
+    schedule_history_compaction(scheduler)
+
+    simulated_start, wall_start = time.monotonic(), time.perf_counter()
+    scheduler.start()
+    await asyncio.sleep(hours * 3600)
+
+    wall_seconds = time.perf_counter() - wall_start
+    simulated_seconds = time.monotonic() - simulated_start
+    job_stats = scheduler.stats()
+    outbound_stats = outbound_queue.stats()
+
+    sampler.cancel()
+    await scheduler.stop()
+    await market_monitor.close()
+    await portfolio_monitor.shutdown()
+    await outbound_queue.stop(config.SHUTDOWN_FLUSH_TIMEOUT)
+
+    rss = [sample[1] for sample in memory_samples]
+    # Skip the first simulated hour so start-up allocations don't read as growth
+    steady = [sample for sample in memory_samples if sample[0] - simulated_start >= 3600] or memory_samples
+    growth = (
+        (steady[-1][1] - steady[0][1]) / ((steady[-1][0] - steady[0][0]) / 3600)
+        if len(steady) > 1 and steady[-1][0] > steady[0][0] else 0.0
+    )
+
+    return {
+        "settings": settings,
+        "simulated_hours": round(simulated_seconds / 3600, 2),
+        "wall_seconds": round(wall_seconds, 2),
+        "speedup": round(simulated_seconds / wall_seconds, 1) if wall_seconds else None,
+        "jobs": {
+            name: recorder.summary(name, wall_seconds)
+            for name in ("market_update", "portfolio_update", "portfolio_scrape")
+        },
+        "stand_in": stand_in.stats(wall_seconds),
+        "telegram": {
+            "api_calls": dict(api.calls),
+            "messages_per_second": round(api.calls.get("sendMessage", 0) / wall_seconds, 1) if wall_seconds else None,
+            "messages_per_simulated_hour": round(api.calls.get("sendMessage", 0) / (simulated_seconds / 3600), 1),
+            # The queue's own latency figures mix real rate-limit waits with simulated clock jumps
+            "outbound": {key: value for key, value in outbound_stats.items() if not key.endswith("_latency_seconds")},
+        },
+        "scheduler": {
+            "jobs": len(job_stats),
+            "runs": sum(job["runs"] for job in job_stats.values()),
+            "failures": sum(job["failures"] for job in job_stats.values()),
+            "overlaps_skipped": sum(job["overlaps_skipped"] for job in job_stats.values()),
+            "ticks_missed": sum(job["ticks_missed"] for job in job_stats.values()),
+            "max_lag_seconds": max((job["max_lag"] for job in job_stats.values()), default=0.0),
+        },
+        "extraction": portfolio_monitor.path_stats(),
+        "price_alerts": {"loaded": alerts_loaded, "remaining": price_alert_engine.stats()["alerts"]},
+        "memory": {
+            "rss_start_mb": round(rss[0], 1) if rss else None,
+            "rss_end_mb": round(current_rss_mb(), 1),
+            "rss_peak_mb": round(peak_rss_mb(), 1),
+            "rss_growth_mb_per_hour": round(growth, 2),
+        },
+    }
+
+def log_report(name: str, report: dict):
+    settings = report["settings"]
+    logger.info(
+        f"Scenario {name}: {settings['portfolios']} portfolios, {settings['tickers']} tickers, "
+        f"{settings['coins']} coins, {settings['chats']} chats, {settings['alerts']} price alerts"
+    )
+    logger.info(
+        f"Simulated {report['simulated_hours']}h in {report['wall_seconds']}s ({report['speedup']}x real time)"
+    )
+    for section in ("jobs", "stand_in"):
+        for route, summary in report[section].items():
+            logger.info(f"  {section}.{route}: {summary}")
+    for section in ("telegram", "scheduler", "extraction", "price_alerts", "memory"):
+        logger.info(f"  {section}: {report[section]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded or synthetic traffic through the monitors on a simulated clock")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record real API responses and portfolio pages for replay")
+    record_parser.add_argument("--output", default=os.path.join(RECORDINGS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S")))
+    record_parser.add_argument("--portfolio-url", action="append", help="page to record (defaults to the stored portfolios)")
+
+    run_parser = commands.add_parser("run", help="run a load scenario against local stand-in servers")
+    run_parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="smoke")
+    run_parser.add_argument("--hours", type=float, default=6, help="simulated hours to run")
+    run_parser.add_argument("--recording", help="directory written by the record command")
+    for key in ("portfolios", "tickers", "coins", "chats", "alerts"):
+        run_parser.add_argument(f"--{key}", type=int, help=f"override the scenario's {key} count")
+    run_parser.add_argument("--page-holdings", type=int, default=10, help="holdings rows in synthetic portfolio pages")
+    run_parser.add_argument("--page-volatility", type=float, default=0.01, help="stdev of portfolio value moves per fetch")
+    run_parser.add_argument("--api-latency-ms", type=float, default=0, help="real delay added to market API responses")
+    run_parser.add_argument("--page-latency-ms", type=float, default=0, help="real delay added to portfolio pages")
+    run_parser.add_argument("--quiet-period-ms", type=float, default=2,
+                            help="real idle time before the simulated clock skips ahead")
+    run_parser.add_argument("--telegram-rate-limits", action="store_true",
+                            help="keep the outbound queue's real-time rate limits (slows the simulation to Telegram's pace)")
+    run_parser.add_argument("--sample-interval", type=float, default=300, help="simulated seconds between memory samples")
+    run_parser.add_argument("--tracemalloc", action="store_true", help="also report the Python heap peak (slower)")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--json", help="write the report to this file")
+    run_parser.add_argument("--verbose", action="store_true", help="show the bot's own logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "record":
+        from src.utils.data_manager import DataManager
+        urls = args.portfolio_url or [portfolio["url"] for portfolio in DataManager.load_portfolios()]
+        record(args.output, urls)
+        return
+
+    if not args.verbose:
+        logging.getLogger("src").setLevel(logging.ERROR)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    settings = dict(SCENARIOS[args.scenario])
+    settings.update({key: getattr(args, key) for key in settings if getattr(args, key) is not None})
+    random.seed(args.seed)
+    recording = load_recording(args.recording) if args.recording else None
+
+    with tempfile.TemporaryDirectory(prefix="bot-load-") as workdir:
+        isolate_data_paths(workdir)
+
+        prepared = time.perf_counter()
+        stand_in = StandInServer(
+            "127.0.0.1", 0, settings["coins"], recording, seed=args.seed, page_holdings=args.page_holdings,
+            page_volatility=args.page_volatility, api_latency=args.api_latency_ms / 1000,
+            page_latency=args.page_latency_ms / 1000,
+        )
+        api = FakeBotApi("127.0.0.1", 0)
+        stand_in.start()
+        api.start()
+        logger.info(f"Stand-ins ready in {time.perf_counter() - prepared:.1f}s (market/pages {stand_in.url}, Bot API {api.url})")
+
+        config.CMC_API_URL = stand_in.url
+        config.FEAR_GREED_API_URL = stand_in.url
+        config.TELEGRAM_API_URL = api.url
+        config.TELEGRAM_BOT_TOKEN = "123456:standin"
+        config.COINMARKETCAP_API_KEY = "standin"
+        config.CHAT_ID = OWNER_CHAT_ID
+        if not args.telegram_rate_limits:
+            # Telegram's limits are real-time and can't be compressed; report the rate the run needed instead
+            config.TELEGRAM_GLOBAL_RATE = config.TELEGRAM_CHAT_RATE = config.TELEGRAM_GROUP_RATE = 1e6
+
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        clock = SimulatedClock()
+        clock.install()
+        loop = SimulatedEventLoop(clock, args.quiet_period_ms / 1000)
+        asyncio.set_event_loop(loop)
+        try:
+            report = loop.run_until_complete(run_scenario(settings, args.hours, stand_in, api, args.sample_interval))
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+            clock.uninstall()
+            stand_in.stop()
+            api.stop()
+
+        if args.tracemalloc:
+            report["memory"]["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            tracemalloc.stop()
+
+    report["scenario"] = args.scenario
+    log_report(args.scenario, report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.info(f"Wrote report to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import random
+import string
+from datetime import datetime, timezone
+from typing import Dict, List
+
+MAJOR_COINS = [
+    ("BTC", "Bitcoin", 67000.0), ("ETH", "Ethereum", 3500.0), ("USDT", "Tether USDt", 1.0),
+    ("BNB", "BNB", 580.0), ("SOL", "Solana", 150.0), ("XRP", "XRP", 0.52), ("DOGE", "Dogecoin", 0.15),
+    ("ADA", "Cardano", 0.45), ("TRX", "TRON", 0.12), ("AVAX", "Avalanche", 35.0), ("DOT", "Polkadot", 7.0),
+    ("LINK", "Chainlink", 15.0), ("MATIC", "Polygon", 0.7), ("LTC", "Litecoin", 80.0), ("ATOM", "Cosmos", 8.5),
+]
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+def _status(credits: int = 1) -> dict:
+    return {"timestamp": _timestamp(), "error_code": 0, "error_message": None, "elapsed": 12, "credit_count": credits}
+
+def synthetic_symbols(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    symbols = [symbol for symbol, _, _ in MAJOR_COINS[:count]]
+    seen = set(symbols)
+    while len(symbols) < count:
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 6)))
+        if symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols
+
+def synthetic_listings(count: int, seed: int = 0, drift: float = 0.0) -> dict:
+    rng = random.Random(seed)
+    symbols = synthetic_symbols(count, seed)
+    known = {symbol: (name, price) for symbol, name, price in MAJOR_COINS}
+    coins = []
+
+    for rank, symbol in enumerate(symbols, start=1):
+        name, price = known.get(symbol, (f"{symbol.title()} Token", 10 ** rng.uniform(-6, 3)))
+        price *= 1 + drift * rng.uniform(-1, 1)
+        change = rng.gauss(0, 6)
+        coins.append({
+            "id": rank,
+            "name": name,
+            "symbol": symbol,
+            "slug": name.lower().replace(" ", "-"),
+            "cmc_rank": rank,
+            "num_market_pairs": rng.randint(1, 900),
+            "circulating_supply": rng.uniform(1e5, 1e11),
+            "total_supply": rng.uniform(1e5, 1e11),
+            "max_supply": None,
+            "last_updated": _timestamp(),
+            "quote": {
+                "USD": {
+                    "price": price,
+                    "volume_24h": rng.uniform(1e3, 1e10),
+                    "percent_change_1h": rng.gauss(0, 1),
+                    # A few thinly traded coins come back without a 24h change
+                    "percent_change_24h": None if rng.random() < 0.01 else change,
+                    "percent_change_7d": rng.gauss(0, 12),
+                    "market_cap": price * rng.uniform(1e5, 1e10),
+                    "last_updated": _timestamp(),
+                }
+            },
+        })
+
+    return {"status": _status(credits=max(1, count // 200)), "data": coins}
+
+def synthetic_global_metrics(seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    btc_dominance = rng.uniform(45, 58)
+    eth_dominance = rng.uniform(12, 19)
+    return {
+        "status": _status(),
+        "data": {
+            "btc_dominance": btc_dominance,
+            "eth_dominance": eth_dominance,
+            "active_cryptocurrencies": 9800,
+            "quote": {"USD": {"total_market_cap": rng.uniform(2.0e12, 2.8e12), "total_volume_24h": rng.uniform(6e10, 1.2e11)}},
+        },
+    }
+
+def synthetic_fear_and_greed(seed: int = 0) -> dict:
+    value = random.Random(seed).randint(0, 100)
+    classification = (
+        "Extreme Fear" if value < 25 else "Fear" if value < 45 else "Neutral" if value < 56
+        else "Greed" if value < 76 else "Extreme Greed"
+    )
+    return {
+        "name": "Fear and Greed Index",
+        "data": [{"value": str(value), "value_classification": classification, "timestamp": str(int(datetime.now().timestamp()))}],
+        "metadata": {"error": None},
+    }
+
+def synthetic_portfolios(count: int, seed: int = 0, base_url: str = "https://coinstats.app/p") -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"portfolio-{index:05d}",
+            "url": f"{base_url}/{index:05d}{''.join(rng.choices(string.ascii_letters, k=6))}",
+            "threshold": round(rng.uniform(1_000, 250_000), 2) if rng.random() < 0.6 else 0,
+            "totalLostOrGainedSinceTheStartOfTheScript": round(rng.uniform(-5_000, 5_000), 2),
+        }
+        for index in range(count)
+    ]
+
+def synthetic_subscriptions(count: int, tickers: List[str], portfolio_names: List[str], seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    subscriptions = []
+    for index in range(count):
+        portfolios = None if rng.random() < 0.3 else rng.sample(portfolio_names, min(5, len(portfolio_names)))
+        subscriptions.append({
+            "chat_id": str(20_000 + index),
+            "topics": {
+                "market": None if rng.random() < 0.5 else rng.sample(tickers, min(10, len(tickers))),
+                "portfolios": portfolios,
+                "thresholds": portfolios,
+            },
+        })
+    return subscriptions
+
+def synthetic_price_alerts(count: int, coins: List[dict], chat_ids: List[str], seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    alerts = []
+    for alert_id in range(1, count + 1):
+        coin = rng.choice(coins)
+        price = coin["quote"]["USD"]["price"]
+        kind = rng.choice(("above", "below", "move"))
+        target = {
+            "above": price * (1 + rng.uniform(0.01, 0.2)),
+            "below": price * (1 - rng.uniform(0.01, 0.2)),
+            "move": rng.uniform(1, 15),
+        }[kind]
+        alerts.append({
+            "id": alert_id,
+            "symbol": coin["symbol"],
+            "kind": kind,
+            "target": target,
+            "reference": price,
+            "chat_id": rng.choice(chat_ids),
+            "created_at": datetime.now().timestamp(),
+        })
+    return alerts
+
+def portfolio_page(username: str, total_value: float, percentage_change: float, money_changed: float,
+                   holdings: int = 40, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    rows = "".join(
+        f'<tr class="PortfolioCoinsTable_row__Xk2Lp"><td><img src="/icons/{symbol}.png" alt=""><span>{symbol}</span></td>'
+        f'<td class="PortfolioCoinsTable_price__Tq1aZ">${rng.uniform(0.01, 5000):,.2f}</td>'
+        f'<td class="PortfolioCoinsTable_amount__L8w0x">{rng.uniform(0.1, 1000):,.4f}</td></tr>'
+        for symbol in synthetic_symbols(holdings, seed)
+    )
+    sign = "-" if money_changed < 0 else ""
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Portfolio | CoinStats</title>'
+        '<link rel="stylesheet" href="/_next/static/css/app.css"></head><body><div id="__next">'
+        '<header><nav><a href="/">CoinStats</a></nav></header><main>'
+        '<div class="UserInfoMenuItemWithTitleAndDesc_user-data-with-title-and-desc__c2iGU">'
+        f'<h1>{username}</h1><span>Portfolio</span></div>'
+        '<div class="PortfolioPriceInfo_PT-price-info__Rk3aQ">'
+        f'<span class="PortfolioPriceInfo_PT-price-info_price__yirGm" title="${total_value:,.2f}">${total_value:,.2f}</span></div>'
+        '<div class="PortfolioProfitInfo_PTProfitInfo__e1Vb2">'
+        f'<span class="PortfolioProfitInfo_percentText__kOZnu">{percentage_change:.2f}%</span>'
+        f'<span class="PortfolioProfitInfo_PTProfitInfoPrice__POYqf">{sign}${abs(money_changed):,.2f}</span></div>'
+        f'<table class="PortfolioCoinsTable_table__Bq9vF"><tbody>{rows}</tbody></table>'
+        '</main></div></body></html>'
+    )
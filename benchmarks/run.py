@@ -0,0 +1,365 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from benchmarks.payloads import (
+    portfolio_page, synthetic_global_metrics, synthetic_listings, synthetic_portfolios, synthetic_symbols,
+)
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+FIXTURE_EXPECTATIONS = {
+    "coinstats_nextjs.html": ("cryptowhale", 184532.17, 3.42, 6101.88),
+    "coinstats_state_only.html": ("hodl_queen", 52310.44, -1.87, -996.12),
+    "coinstats_legacy.html": ("satoshi_fan", 9874.03, -2.15, -216.9),
+}
+
+REGISTRY: Dict[str, Callable[[str], Callable[[], object]]] = {}
+
+def benchmark(name: str):
+    def register(factory: Callable[[str], Callable[[], object]]):
+        REGISTRY[name] = factory
+        return factory
+    return register
+
+def _market_monitor():
+    from src.monitoring.crypto_monitor import CryptoMarketMonitor
+    return CryptoMarketMonitor()
+
+def _portfolio_monitor():
+    from src.monitoring.portfolio_monitor import PortfolioMonitor
+    return PortfolioMonitor()
+
+def _process_market_data(coins: int):
+    def factory(workdir: str):
+        monitor = _market_monitor()
+        global_data = synthetic_global_metrics()
+        coins_data = synthetic_listings(coins)["data"]
+        symbols = synthetic_symbols(50)
+        return lambda: monitor._process_market_data(global_data, coins_data, symbols)
+    return factory
+
+benchmark("market.process_market_data[3500 coins]")(_process_market_data(3500))
+benchmark("market.process_market_data[10000 coins]")(_process_market_data(10000))
+
+@benchmark("market.build_market_fragments[500 tickers]")
+def bench_market_fragments(workdir: str):
+    monitor = _market_monitor()
+    market_data = monitor._process_market_data(synthetic_global_metrics(), synthetic_listings(3500)["data"], synthetic_symbols(500))
+    return lambda: monitor.build_market_fragments(market_data, "54", "Neutral")
+
+@benchmark("market.render_market_message[100 selections]")
+def bench_market_render(workdir: str):
+    monitor = _market_monitor()
+    symbols = synthetic_symbols(500)
+    market_data = monitor._process_market_data(synthetic_global_metrics(), synthetic_listings(3500)["data"], symbols)
+    fragments = monitor.build_market_fragments(market_data, "54", "Neutral")
+    rng = random.Random(0)
+    selections = [rng.sample(symbols, 20) for _ in range(100)]
+    return lambda: [monitor.render_market_message(fragments, selection) for selection in selections]
+
+@benchmark("portfolio.record_portfolio_update[1000 portfolios]")
+def bench_portfolio_update(workdir: str):
+    monitor = _portfolio_monitor()
+    portfolios = synthetic_portfolios(1000)
+    rng = random.Random(0)
+    # Keep every value under its threshold so the benchmark never queues a Telegram alert
+    values = {p["name"]: (p["threshold"] or 100_000) * rng.uniform(0.3, 0.8) for p in portfolios}
+
+    def run():
+        digest = {}
+        for portfolio in portfolios:
+            value = values[portfolio["name"]] * rng.uniform(0.99, 1.01)
+            monitor.record_portfolio_update(portfolio, portfolio["name"], value, 1.25, 312.5, digest=digest)
+        return digest
+    return run
+
+@benchmark("portfolio.pack_digest[1000 portfolios]")
+def bench_digest_pack(workdir: str):
+    from src.utils.telegram_client import pack_message_blocks
+    monitor = _portfolio_monitor()
+    digest = {}
+    for portfolio in synthetic_portfolios(1000):
+        monitor.record_portfolio_update(portfolio, portfolio["name"], 1234.5, 1.25, 312.5, digest=digest)
+    blocks = ["📊 <b>Portfolio Digest</b>"] + list(digest.values())
+    return lambda: pack_message_blocks(blocks)
+
+def _storage_benchmarks(backend_name: str, portfolio_count: int = 5000):
+    def backend(workdir: str):
+        from src.utils.storage import JsonStorage, SqliteStorage
+        directory = tempfile.mkdtemp(prefix=f"{backend_name}-", dir=workdir)
+        if backend_name == "sqlite":
+            return SqliteStorage(path=os.path.join(directory, "bot.db"))
+        return JsonStorage(
+            portfolios_file=os.path.join(directory, "portfolios.json"),
+            tickers_file=os.path.join(directory, "tickers.json"),
+            state_file=os.path.join(directory, "state.json"),
+            alerts_file=os.path.join(directory, "alerts.json"),
+            subscriptions_file=os.path.join(directory, "subscriptions.json"),
+        )
+
+    def seeded(workdir: str):
+        from src.utils.data_manager import DataManager
+        DataManager._backend = backend(workdir)
+        portfolios = synthetic_portfolios(portfolio_count)
+        DataManager.save_portfolios(portfolios)
+        return DataManager, portfolios
+
+    label = f"{portfolio_count} portfolios"
+
+    @benchmark(f"storage.{backend_name}.load_portfolios[{label}]")
+    def bench_load(workdir: str):
+        data_manager, _ = seeded(workdir)
+        return data_manager.load_portfolios
+
+    if backend_name == "json":
+        @benchmark(f"storage.json.load_portfolios_uncached[{label}]")
+        def bench_load_uncached(workdir: str):
+            data_manager, _ = seeded(workdir)
+            path = data_manager._backend.portfolios_file
+            return lambda: type(data_manager._backend)(portfolios_file=path).load_portfolios()
+
+    @benchmark(f"storage.{backend_name}.save_portfolios[{label}]")
+    def bench_save(workdir: str):
+        data_manager, portfolios = seeded(workdir)
+        return lambda: data_manager.save_portfolios(portfolios)
+
+    @benchmark(f"storage.{backend_name}.add_portfolio[{label}]")
+    def bench_upsert(workdir: str):
+        data_manager, portfolios = seeded(workdir)
+        rng = random.Random(0)
+
+        def run():
+            portfolio = dict(rng.choice(portfolios), threshold=round(rng.uniform(1_000, 250_000), 2))
+            data_manager.add_portfolio(portfolio)
+        return run
+
+    @benchmark(f"storage.{backend_name}.get_portfolio[{label}]")
+    def bench_get(workdir: str):
+        data_manager, portfolios = seeded(workdir)
+        names = [p["name"] for p in random.Random(0).sample(portfolios, 100)]
+        return lambda: [data_manager.get_portfolio(name) for name in names]
+
+_storage_benchmarks("json")
+_storage_benchmarks("sqlite")
+
+def _parser_benchmark(fixture: str):
+    def factory(workdir: str):
+        from src.monitoring.coinstats_parser import parse_portfolio_page
+        with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+            html = f.read()
+
+        parsed = parse_portfolio_page(html)
+        if parsed != FIXTURE_EXPECTATIONS[fixture]:
+            raise AssertionError(f"{fixture} parsed as {parsed}, expected {FIXTURE_EXPECTATIONS[fixture]}")
+        return lambda: parse_portfolio_page(html)
+    return factory
+
+for _fixture in FIXTURE_EXPECTATIONS:
+    benchmark(f"parser.parse_portfolio_page[{_fixture}]")(_parser_benchmark(_fixture))
+
+@benchmark("parser.parse_portfolio_page[synthetic, 1000 holdings]")
+def bench_parser_large(workdir: str):
+    from src.monitoring.coinstats_parser import parse_portfolio_page
+    html = portfolio_page("bigbag", 1_250_000.5, -4.2, -54_812.3, holdings=1000)
+    return lambda: parse_portfolio_page(html)
+
+@benchmark("parser.parse_amount[10000 values]")
+def bench_parse_amount(workdir: str):
+    from src.monitoring.coinstats_parser import parse_amount, parse_percentage
+    rng = random.Random(0)
+    amounts = [f"${rng.uniform(-1e6, 1e6):,.2f}" for _ in range(5000)]
+    percentages = [f"{rng.uniform(-50, 50):.2f}%" for _ in range(5000)]
+    return lambda: ([parse_amount(a) for a in amounts], [parse_percentage(p) for p in percentages])
+
+def isolate_data_paths(workdir: str):
+    config.PORTFOLIOS_FILE = os.path.join(workdir, "portfolios.json")
+    config.TICKERS_FILE = os.path.join(workdir, "tickers.json")
+    config.STATE_FILE = os.path.join(workdir, "state.json")
+    config.ALERTS_FILE = os.path.join(workdir, "alerts.json")
+    config.SUBSCRIPTIONS_FILE = os.path.join(workdir, "subscriptions.json")
+    config.SQLITE_PATH = os.path.join(workdir, "bot.db")
+    config.TIMESERIES_DIR = os.path.join(workdir, "history")
+    config.CHECKPOINT_DIR = os.path.join(workdir, "checkpoints")
+    config.SELECTOR_CACHE_FILE = os.path.join(workdir, "selector_cache.json")
+    config.RESPONSE_CACHE_FILE = os.path.join(workdir, "response_cache.json")
+
+    from src.utils.response_cache import response_cache
+    from src.utils.timeseries import history_store
+    response_cache.snapshot_file = config.RESPONSE_CACHE_FILE
+    history_store.root = config.TIMESERIES_DIR
+
+def measure(func: Callable[[], object], rounds: int, min_time: float) -> Dict[str, float]:
+    func()
+
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - started) / loops)
+
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "loops": loops,
+        "rounds": rounds,
+    }
+
+def current_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+def resolve_commit(ref: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", ref], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ref
+
+def load_run(results_dir: str, ref: str) -> Optional[dict]:
+    for name in (ref, resolve_commit(ref)):
+        path = os.path.join(results_dir, f"{name}.json")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                return json.load(f)
+    return None
+
+def latest_run(results_dir: str, exclude: str) -> Optional[dict]:
+    runs = []
+    for filename in os.listdir(results_dir) if os.path.isdir(results_dir) else []:
+        if filename.endswith(".json") and filename[:-5] != exclude:
+            with open(os.path.join(results_dir, filename), "r") as f:
+                runs.append(json.load(f))
+    return max(runs, key=lambda run: run["recorded_at"], default=None)
+
+def save_run(results_dir: str, run: dict) -> str:
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{run['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(run, f, indent=4)
+    return path
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    regressions = []
+    logger.info(f"Comparing against {baseline['commit']} recorded at {baseline['recorded_at']}")
+
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            logger.info(f"  {name}: new benchmark")
+            continue
+
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  << REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            marker = "  (faster)"
+        logger.info(f"  {name}: {_format_seconds(previous['median'])} -> {_format_seconds(result['median'])} ({ratio:.2f}x){marker}")
+
+    return regressions
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.1f}µs"
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline hot-path benchmarks and compare them across commits")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this substring")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per round")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="commit or result name to compare with (defaults to the latest stored run)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="median slowdown that counts as a regression")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for noisy in ("src", "httpx"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    selected = [name for name in REGISTRY if args.filter in name]
+    if args.list:
+        for name in selected:
+            print(name)
+        return
+
+    commit = current_commit()
+    run = {
+        "commit": commit,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bot-bench-") as workdir:
+        isolate_data_paths(workdir)
+        for name in selected:
+            func = REGISTRY[name](workdir)
+            result = measure(func, args.rounds, args.min_time)
+            run["results"][name] = result
+            logger.info(
+                f"{name}: median {_format_seconds(result['median'])}, min {_format_seconds(result['min'])} "
+                f"± {_format_seconds(result['stdev'])} ({result['loops']} loops x {result['rounds']} rounds)"
+            )
+
+    baseline = load_run(args.results_dir, args.baseline) if args.baseline else latest_run(args.results_dir, commit)
+    if args.baseline and baseline is None:
+        logger.error(f"No stored benchmark run for {args.baseline} in {args.results_dir}")
+        sys.exit(2)
+
+    if not args.no_save:
+        logger.info(f"Saved results to {save_run(args.results_dir, run)}")
+
+    if baseline is not None:
+        regressions = compare(baseline, run, args.threshold)
+        if regressions:
+            logger.error(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,124 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 from dotenv import load_dotenv
 
 load_dotenv()
 
+DEFAULT_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*intercom.io*", "*segment.io*", "*amplitude.com*",
+]
+
+def _env_list(name: str, default: List[str]) -> List[str]:
+    value = os.getenv(name)
+    if not value:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
 @dataclass
 class Config:
     TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN")
     CHAT_ID: str = os.getenv("CHAT_ID")
+    ALLOWED_CHAT_IDS: List[str] = field(default_factory=lambda: _env_list("ALLOWED_CHAT_IDS", []))
     COINMARKETCAP_API_KEY: str = os.getenv("COINMARKETCAP_API_KEY")
     CHROME_DRIVER_PATH: str = os.getenv("CHROME_DRIVER_PATH")
+    TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+    CMC_API_URL: str = os.getenv("CMC_API_URL", "https://pro-api.coinmarketcap.com").rstrip("/")
+    FEAR_GREED_API_URL: str = os.getenv("FEAR_GREED_API_URL", "https://api.alternative.me").rstrip("/")
+
+    BOT_MODE: str = os.getenv("BOT_MODE", "polling").lower()
+    WEBHOOK_LISTEN: str = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+    WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8443"))
+    WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "telegram")
+    WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_SECRET_TOKEN: str = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+    RUN_MONITORS: bool = os.getenv("RUN_MONITORS", "true").lower() == "true"
+    SHARED_STATE_RELOAD_INTERVAL: int = int(os.getenv("SHARED_STATE_RELOAD_INTERVAL", "0"))
     
     PORTFOLIOS_FILE: str = "data/portfolios.json"
     TICKERS_FILE: str = "data/tickers.json"
+    STATE_FILE: str = "data/state.json"
+    ALERTS_FILE: str = "data/alerts.json"
+    SUBSCRIPTIONS_FILE: str = "data/subscriptions.json"
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "json")
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "data/bot.db")
+    TIMESERIES_DIR: str = os.getenv("TIMESERIES_DIR", "data/history")
+    TIMESERIES_RAW_RETENTION_DAYS: int = 7
+    TIMESERIES_HOURLY_RETENTION_DAYS: int = 365
+    TIMESERIES_COMPACT_INTERVAL: int = 3600
+    CHECKPOINT_DIR: str = os.getenv("CHECKPOINT_DIR", "data/checkpoints")
+    CHECKPOINT_COMPACT_EVERY: int = 200
+    SELECTOR_CACHE_FILE: str = "data/selector_cache.json"
+    RESPONSE_CACHE_FILE: str = os.getenv("RESPONSE_CACHE_FILE", "data/response_cache.json")
     
     CRYPTO_UPDATE_INTERVAL: int = 1800
     PORTFOLIO_UPDATE_INTERVAL: int = 600
+    PORTFOLIO_SYNC_INTERVAL: int = 60
+    PORTFOLIO_DIGEST_WINDOW: int = 10
+    PORTFOLIO_ROUND_TIMEOUT: int = 300
+    ADAPTIVE_POLLING: bool = os.getenv("ADAPTIVE_POLLING", "true").lower() == "true"
+    ADAPTIVE_MIN_INTERVAL: int = 60
+    ADAPTIVE_MAX_INTERVAL: int = 3600
+    ADAPTIVE_NEAR_THRESHOLD_PCT: float = 5.0
+    ADAPTIVE_VOLATILE_MOVE_PCT: float = 2.0
+    ADAPTIVE_STABLE_MOVE_PCT: float = 0.2
+    ALERT_HYSTERESIS_PCT: float = 2.0
+    ALERT_COOLDOWN: int = 1800
+    ALERT_ESCALATION_STEP_PCT: float = float(os.getenv("ALERT_ESCALATION_STEP_PCT", "5"))
+    MARKET_RETRY_DELAY: int = 60
+    SCHEDULER_JITTER: float = float(os.getenv("SCHEDULER_JITTER", "5"))
+
+    TOP_MOVERS_COUNT: int = 5
+
+    MARKET_REQUEST_TIMEOUT: int = 10
+    LISTINGS_REQUEST_TIMEOUT: int = 20
+
+    TELEGRAM_GLOBAL_RATE: float = 30
+    TELEGRAM_CHAT_RATE: float = 1
+    TELEGRAM_GROUP_RATE: float = 20 / 60
+    OUTBOUND_QUEUE_SIZE: int = int(os.getenv("OUTBOUND_QUEUE_SIZE", "1000"))
+    OUTBOUND_PUT_TIMEOUT: float = 30
+    OUTBOUND_MAX_ATTEMPTS: int = 5
+    OUTBOUND_RETRY_BACKOFF: float = 2
+    SHUTDOWN_FLUSH_TIMEOUT: float = 15
+
+    # The scheduled market cycle refreshes once per interval; these TTLs let on-demand commands reuse that fetch
+    CMC_GLOBAL_TTL: int = CRYPTO_UPDATE_INTERVAL - 60
+    CMC_LISTINGS_TTL: int = CRYPTO_UPDATE_INTERVAL - 60
+    FEAR_GREED_TTL: int = 3600
+    CACHE_STALE_TTL: int = 600
+    CMC_MONTHLY_CREDIT_LIMIT: int = int(os.getenv("CMC_MONTHLY_CREDIT_LIMIT", "10000"))
+    CMC_CREDIT_WARNING_RATIO: float = 0.8
     
     SELENIUM_TIMEOUT: int = 15
-    PAGE_LOAD_DELAY: int = 5
+    PAGE_READY_TIMEOUT: int = int(os.getenv("PAGE_READY_TIMEOUT", "20"))
+
+    PORTFOLIO_FAST_PATH: bool = os.getenv("PORTFOLIO_FAST_PATH", "true").lower() == "true"
+    HTTP_TIMEOUT: int = 10
+
+    PORTFOLIO_MESSAGE_MODE: str = os.getenv("PORTFOLIO_MESSAGE_MODE", "digest")
+
+    PORTFOLIO_WORKERS: int = int(os.getenv("PORTFOLIO_WORKERS", "4"))
+    PORTFOLIO_MAX_PER_HOST: int = int(os.getenv("PORTFOLIO_MAX_PER_HOST", "3"))
+
+    SCRAPE_MODE: str = os.getenv("SCRAPE_MODE", "local").lower()
+    SCRAPE_WORKERS: int = int(os.getenv("SCRAPE_WORKERS", "2"))
+    SCRAPE_BROKER_HOST: str = os.getenv("SCRAPE_BROKER_HOST", "127.0.0.1")
+    SCRAPE_BROKER_PORT: int = int(os.getenv("SCRAPE_BROKER_PORT", "50000"))
+    SCRAPE_BROKER_AUTHKEY: str = os.getenv("SCRAPE_BROKER_AUTHKEY", "")
+    SCRAPE_LEASE_SECONDS: int = 120
+    SCRAPE_MAX_ATTEMPTS: int = 3
+    DRIVER_POOL_SIZE: int = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+    DRIVER_MAX_NAVIGATIONS: int = int(os.getenv("DRIVER_MAX_NAVIGATIONS", "50"))
+    DRIVER_MAX_MEMORY_GROWTH_MB: int = int(os.getenv("DRIVER_MAX_MEMORY_GROWTH_MB", "512"))
+
+    BLOCK_RESOURCES: bool = os.getenv("BLOCK_RESOURCES", "true").lower() == "true"
+    BLOCKED_URL_PATTERNS: List[str] = field(
+        default_factory=lambda: _env_list("BLOCKED_URL_PATTERNS", DEFAULT_BLOCKED_URL_PATTERNS)
+    )
 
 config = Config()
@@ -0,0 +1,21 @@
+import argparse
+from config.settings import config
+from src.monitoring.scrape_cluster import run_worker
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m scripts.scrape_worker",
+        description="Run a portfolio scrape worker against a coordinator's broker. Run it from the repository root.",
+    )
+    parser.add_argument("--host", default=config.SCRAPE_BROKER_HOST)
+    parser.add_argument("--port", type=int, default=config.SCRAPE_BROKER_PORT)
+    parser.add_argument("--worker-id", default=None)
+    args = parser.parse_args()
+
+    if not config.SCRAPE_BROKER_AUTHKEY:
+        parser.error("SCRAPE_BROKER_AUTHKEY must be set to the coordinator's broker key")
+
+    run_worker((args.host, args.port), config.SCRAPE_BROKER_AUTHKEY.encode(), args.worker_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import logging
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs
+import requests
+
+logger = logging.getLogger(__name__)
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Stand-in", "username": "standin_bot"}
+
+class FakeBotApi:
+    def __init__(self, host: str, port: int):
+        self.sent: Dict[int, float] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._message_id = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+
+    def handle(self, method: str, params: dict) -> dict:
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            if method == "getMe":
+                return BOT_USER
+            if method in ("sendMessage", "editMessageText"):
+                self._message_id += 1
+                chat_id = int(params.get("chat_id", 0))
+                self.sent.setdefault(chat_id, time.monotonic())
+                return {
+                    "message_id": self._message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": params.get("text", ""),
+                }
+            return True
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    params = json.loads(body or "{}")
+                else:
+                    params = {key: values[0] for key, values in parse_qs(body).items()}
+
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                payload = json.dumps({"ok": True, "result": api.handle(method, params)}).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def synthetic_update(update_id: int, chat_id: int, text: str) -> dict:
+    command = text.split()[0]
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}] if command.startswith("/") else [],
+        },
+    }
+
+def wait_for_webhook(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.post(url, json={}, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Webhook at {url} did not come up within {timeout}s")
+
+def post_updates(api: FakeBotApi, webhook_url: str, secret: str, count: int, text: str, timeout: float) -> List[float]:
+    session = requests.Session()
+    posted: Dict[int, float] = {}
+
+    for update_id in range(1, count + 1):
+        chat_id = 10_000 + update_id
+        posted[chat_id] = time.monotonic()
+        response = session.post(
+            webhook_url,
+            json=synthetic_update(update_id, chat_id, text),
+            headers={"X-Telegram-Bot-Api-Secret-Token": secret},
+            timeout=5,
+        )
+        response.raise_for_status()
+
+    deadline = time.monotonic() + timeout
+    while len(api.sent.keys() & posted.keys()) < count and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    return sorted(api.sent[chat_id] - posted[chat_id] for chat_id in posted if chat_id in api.sent)
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise webhook mode against a local stand-in for the Bot API")
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--webhook-port", type=int, default=8443)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--text", default="/start")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--no-spawn", action="store_true", help="post to an already running bot instead of starting one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    api = FakeBotApi("127.0.0.1", args.api_port)
+    api.start()
+
+    secret = os.getenv("WEBHOOK_SECRET_TOKEN") or secrets.token_urlsafe(24)
+    webhook_url = f"http://127.0.0.1:{args.webhook_port}/{os.getenv('WEBHOOK_PATH', 'telegram')}"
+
+    bot = None
+    if not args.no_spawn:
+        env = dict(
+            os.environ,
+            TELEGRAM_BOT_TOKEN=os.getenv("TELEGRAM_BOT_TOKEN", "123456:standin"),
+            TELEGRAM_API_URL=api.url,
+            BOT_MODE="webhook",
+            WEBHOOK_LISTEN="127.0.0.1",
+            WEBHOOK_PORT=str(args.webhook_port),
+            WEBHOOK_URL=webhook_url,
+            WEBHOOK_SECRET_TOKEN=secret,
+            RUN_MONITORS="false",
+        )
+        bot = subprocess.Popen([sys.executable, "main.py"], env=env)
+
+    try:
+        wait_for_webhook(webhook_url, args.timeout)
+
+        rejected = requests.post(
+            webhook_url, json=synthetic_update(0, 1, args.text),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"}, timeout=5,
+        )
+        logger.info(f"Update with wrong secret token answered with HTTP {rejected.status_code}")
+
+        started = time.monotonic()
+        latencies = post_updates(api, webhook_url, secret, args.updates, args.text, args.timeout)
+        elapsed = time.monotonic() - started
+
+        if not latencies:
+            logger.error(f"No replies received; Bot API calls seen: {api.calls}")
+            sys.exit(1)
+
+        logger.info(
+            f"{len(latencies)}/{args.updates} updates answered in {elapsed:.2f}s "
+            f"({len(latencies) / elapsed:.1f}/s), reply latency "
+            f"p50={percentile(latencies, 0.5) * 1000:.1f}ms p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+            f"max={latencies[-1] * 1000:.1f}ms"
+        )
+    finally:
+        if bot is not None:
+            bot.terminate()
+            bot.wait(timeout=30)
+        api.stop()
+
+if __name__ == "__main__":
+    main()
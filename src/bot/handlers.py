@@ -1,10 +1,23 @@
+import asyncio
+import html
 import logging
+import math
+import time
 from telegram import Update
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 from src.bot.keyboards import KeyboardFactory
+from src.monitoring.crypto_monitor import CryptoMarketMonitor, schedule_market_updates
+from src.monitoring.price_alerts import ALERT_KINDS, describe_alert, price_alert_engine
+from src.monitoring.portfolio_monitor import PortfolioMonitor, schedule_portfolio_updates
+from src.monitoring.scrape_cluster import ScrapeCoordinator
+from src.utils.checkpoint import StateCheckpoint
 from src.utils.constants import CallbackData, UserDataKeys
 from src.utils.data_manager import DataManager
 from src.utils.decorators import handle_exceptions
+from src.utils.message_queue import outbound_queue
+from src.utils.scheduler import Scheduler
+from src.utils.subscriptions import PRIVATE_TOPICS, TOPICS, is_authorized, subscription_registry
+from src.utils.timeseries import history_store, parse_window, schedule_history_compaction
 from config.settings import config
 
 logger = logging.getLogger(__name__)
@@ -14,6 +27,9 @@ class BotHandlers:
         self.data_manager = DataManager()
         self.keyboards = KeyboardFactory()
 
+    def _market_monitor(self, context: ContextTypes.DEFAULT_TYPE) -> CryptoMarketMonitor:
+        return context.application.bot_data["market_monitor"]
+
     @handle_exceptions
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("Welcome! Use /commands to access the menu.")
@@ -23,6 +39,212 @@ class BotHandlers:
         reply_markup = self.keyboards.main_menu()
         await update.message.reply_text("Choose an option:", reply_markup=reply_markup)
 
+    @handle_exceptions
+    async def market(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        symbols = self.data_manager.load_tickers()
+        market_monitor = self._market_monitor(context)
+        market_data, fear_and_greed_index, sentiment = await market_monitor.fetch_market_update(symbols)
+
+        if not market_data:
+            await update.message.reply_text("Market data is currently unavailable. Please try again later.")
+            return
+
+        # Show changes since the last scheduled update without moving its baseline
+        message = market_monitor.build_market_message(market_data, fear_and_greed_index, sentiment, track_changes=False)
+        await update.message.reply_text(message, parse_mode="HTML", disable_web_page_preview=True)
+
+    @handle_exceptions
+    async def refresh(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        chat_id = str(update.effective_chat.id)
+        if not is_authorized(chat_id):
+            logger.warning(f"Refused /refresh from unauthorized chat {chat_id}")
+            await update.message.reply_text("Refreshing monitors is only available to authorized chats.")
+            return
+
+        scheduler = context.application.bot_data.get("scheduler")
+        if scheduler is None:
+            await update.message.reply_text("Monitoring is not running.")
+            return
+
+        target = " ".join(context.args)
+        if not target:
+            job_names = scheduler.job_names("market") + scheduler.job_names("portfolio:")
+        else:
+            job_name = "market" if target.lower() == "market" else f"portfolio:{target}"
+            job_names = [job_name] if scheduler.has_job(job_name) else []
+
+        if not job_names:
+            await update.message.reply_text(f"Nothing scheduled for '{target}'.")
+            return
+
+        triggered = [name for name in job_names if scheduler.run_now(name)]
+        skipped = [name for name in job_names if name not in triggered]
+
+        message = f"🔄 Triggered {len(triggered)} update(s)."
+        if skipped:
+            message += f"\n⏳ Already running: {', '.join(skipped)}"
+        await update.message.reply_text(message)
+
+    @handle_exceptions
+    async def alert(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        usage = "Usage: /alert <TICKER> above|below <PRICE> or /alert <TICKER> move <PERCENT>"
+        if len(context.args) != 3 or context.args[1].lower() not in ALERT_KINDS:
+            await update.message.reply_text(usage)
+            return
+
+        symbol, kind = context.args[0].upper(), context.args[1].lower()
+        try:
+            target = float(context.args[2].replace("$", "").replace("%", "").replace(",", ""))
+        except ValueError:
+            await update.message.reply_text(usage)
+            return
+        if not math.isfinite(target) or target <= 0:
+            await update.message.reply_text("The alert value must be a positive number.")
+            return
+
+        market_data = await self._market_monitor(context).fetch_crypto_market_data([symbol])
+        coin = (market_data or {}).get("filtered_data", {}).get(symbol)
+        if not coin or coin["price"] is None:
+            await update.message.reply_text(f"No market price found for {symbol}.")
+            return
+
+        price = coin["price"]
+        if (kind == "above" and price >= target) or (kind == "below" and price <= target):
+            price_format = ".4f" if price < 1 else ".2f"
+            await update.message.reply_text(
+                f"{symbol} is already at ${price:{price_format}}, {kind} your target. Pick a price it hasn't reached yet."
+            )
+            return
+
+        alert = {
+            "symbol": symbol,
+            "kind": kind,
+            "target": target,
+            "reference": price,
+            "chat_id": str(update.effective_chat.id),
+            "created_at": time.time(),
+        }
+        alert["id"] = await asyncio.to_thread(self.data_manager.add_alert, alert)
+        price_alert_engine.add(alert)
+        await update.message.reply_text(f"🔔 Alert #{alert['id']} set: {describe_alert(alert)}")
+
+    @handle_exceptions
+    async def alerts(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        alerts = price_alert_engine.alerts_for_chat(str(update.effective_chat.id))
+        if not alerts:
+            await update.message.reply_text("No active price alerts.")
+            return
+
+        lines = [f"#{alert['id']}: {describe_alert(alert)}" for alert in sorted(alerts, key=lambda a: a["id"])]
+        await update.message.reply_text("🔔 Active price alerts:\n\n" + "\n".join(lines))
+
+    @handle_exceptions
+    async def unalert(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if len(context.args) != 1 or not context.args[0].lstrip("#").isdigit():
+            await update.message.reply_text("Usage: /unalert <ALERT ID>")
+            return
+
+        alert_id = int(context.args[0].lstrip("#"))
+        alert = price_alert_engine.get(alert_id)
+        if alert is None or str(alert["chat_id"]) != str(update.effective_chat.id):
+            await update.message.reply_text(f"Alert #{alert_id} not found.")
+            return
+
+        price_alert_engine.remove(alert_id)
+        await asyncio.to_thread(self.data_manager.remove_alert, alert_id)
+        await update.message.reply_text(f"Alert #{alert_id} removed.")
+
+    @handle_exceptions
+    async def subscribe(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if not context.args or context.args[0].lower() not in TOPICS:
+            await update.message.reply_text(
+                "Usage: /subscribe market [TICKERS...] | portfolios [name, name...] | thresholds [name, name...]"
+            )
+            return
+
+        topic = context.args[0].lower()
+        chat_id = str(update.effective_chat.id)
+        if topic in PRIVATE_TOPICS and not is_authorized(chat_id):
+            logger.warning(f"Refused {topic} subscription from unauthorized chat {chat_id}")
+            await update.message.reply_text(
+                f"This chat is not allowed to receive {topic} updates. You can still /subscribe market."
+            )
+            return
+
+        rest = " ".join(context.args[1:])
+        if topic == "market":
+            keys = [ticker.upper() for ticker in rest.replace(",", " ").split()]
+        else:
+            keys = [name.strip() for name in rest.split(",") if name.strip()]
+            known = {portfolio.get("name") for portfolio in await asyncio.to_thread(self.data_manager.load_portfolios)}
+            unknown = [name for name in keys if name not in known]
+            if unknown:
+                await update.message.reply_text(f"Unknown portfolio(s): {', '.join(unknown)}")
+                return
+
+        subscription = subscription_registry.subscribe(chat_id, topic, keys or None)
+        await asyncio.to_thread(self.data_manager.save_subscription, subscription)
+        await update.message.reply_text(f"✅ Subscribed to {topic}: {', '.join(keys) if keys else 'all'}")
+
+    @handle_exceptions
+    async def unsubscribe(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        topic = context.args[0].lower() if context.args else None
+        if topic not in TOPICS + ("all",):
+            await update.message.reply_text("Usage: /unsubscribe market|portfolios|thresholds|all")
+            return
+
+        chat_id = str(update.effective_chat.id)
+        subscription = subscription_registry.unsubscribe(chat_id, None if topic == "all" else topic)
+        await asyncio.to_thread(self.data_manager.save_subscription, subscription)
+        await update.message.reply_text(f"🔕 Unsubscribed from {topic}.")
+
+    @handle_exceptions
+    async def subscriptions(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        topics = subscription_registry.topics_for(str(update.effective_chat.id))
+        if not topics:
+            await update.message.reply_text("This chat has no subscriptions. Use /subscribe to add one.")
+            return
+
+        lines = [f"• {topic}: {', '.join(keys) if keys else 'all'}" for topic, keys in topics.items()]
+        await update.message.reply_text("📬 Subscriptions:\n\n" + "\n".join(lines))
+
+    @handle_exceptions
+    async def history(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if not context.args:
+            await update.message.reply_text("Usage: /history <TICKER or portfolio name> [24h|7d|30d]")
+            return
+
+        window_text = "24h"
+        args = list(context.args)
+        if len(args) > 1 and parse_window(args[-1]):
+            window_text = args.pop()
+        window = parse_window(window_text)
+        target = " ".join(args)
+
+        if self.data_manager.get_portfolio(target):
+            if not is_authorized(str(update.effective_chat.id)):
+                await update.message.reply_text("Portfolio history is only available to authorized chats.")
+                return
+            series, label = f"portfolio:{target}", target
+        else:
+            series, label = f"price:{target.upper()}", target.upper()
+
+        summary = await asyncio.to_thread(history_store.summary, series, time.time() - window)
+        if not summary:
+            await update.message.reply_text(f"No history recorded for {label} in the last {window_text}.")
+            return
+
+        price_format = ".4f" if summary["last"] < 1 else ".2f"
+        await update.message.reply_text(
+            f"📜 <b>{html.escape(label)}</b> — last {window_text}\n\n"
+            f"Now: ${summary['last']:{price_format}}\n"
+            f"Change: {summary['change']:+{price_format}} ({summary['change_pct']:+.2f}%)\n"
+            f"High: ${summary['max']:{price_format}}\n"
+            f"Low: ${summary['min']:{price_format}}\n"
+            f"Samples: {summary['points']}",
+            parse_mode="HTML",
+        )
+
     @handle_exceptions
     async def handle_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         query = update.callback_query
@@ -66,21 +288,14 @@ class BotHandlers:
 
     async def _handle_ticker_removal(self, query):
         ticker_to_remove = query.data.split("_")[1]
-        portfolios = self.data_manager.load_portfolios()
-        tickers = self.data_manager.load_tickers()
         
-        if ticker_to_remove in tickers:
-            tickers.remove(ticker_to_remove)
-            self.data_manager.save_data(portfolios, tickers)
+        if self.data_manager.remove_ticker(ticker_to_remove):
             await query.edit_message_text(f"Ticker '{ticker_to_remove}' removed successfully!")
         else:
             await query.edit_message_text(f"Ticker '{ticker_to_remove}' not found.")
 
     @handle_exceptions
     async def handle_user_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        portfolios = self.data_manager.load_portfolios()
-        tickers = self.data_manager.load_tickers()
-        
         current_field = context.user_data.get(UserDataKeys.CURRENT_FIELD.value)
 
         if current_field == CallbackData.NAME.value:
@@ -88,9 +303,9 @@ class BotHandlers:
         elif current_field == CallbackData.URL.value:
             await self._handle_url_input(update, context)
         elif current_field == CallbackData.THRESHOLD.value:
-            await self._handle_threshold_input(update, context, portfolios, tickers)
+            await self._handle_threshold_input(update, context)
         elif current_field == CallbackData.TICKER_NAME.value:
-            await self._handle_ticker_input(update, portfolios, tickers)
+            await self._handle_ticker_input(update)
 
     async def _handle_name_input(self, update, context):
         context.user_data[UserDataKeys.PORTFOLIO_NAME.value] = update.message.text
@@ -106,14 +321,14 @@ class BotHandlers:
         reply_markup = self.keyboards.portfolio_fields()
         await update.message.reply_text("Add Portfolio - Choose a field to set:", reply_markup=reply_markup)
 
-    async def _handle_threshold_input(self, update, context, portfolios, tickers):
+    async def _handle_threshold_input(self, update, context):
         try:
             threshold_value = float(update.message.text)
             context.user_data[UserDataKeys.PORTFOLIO_THRESHOLD.value] = threshold_value
             await update.message.reply_text(f"Portfolio threshold set to: {threshold_value}")
 
             if self._all_portfolio_fields_set(context.user_data):
-                await self._create_portfolio(update, context, portfolios, tickers)
+                await self._create_portfolio(update, context)
 
         except ValueError:
             await update.message.reply_text("Invalid threshold value. Please enter a number.")
@@ -121,12 +336,10 @@ class BotHandlers:
         reply_markup = self.keyboards.portfolio_fields()
         await update.message.reply_text("Add Portfolio - Choose a field to set:", reply_markup=reply_markup)
 
-    async def _handle_ticker_input(self, update, portfolios, tickers):
+    async def _handle_ticker_input(self, update):
         ticker_name = update.message.text.upper()
 
-        if ticker_name not in tickers:
-            tickers.append(ticker_name)
-            self.data_manager.save_data(portfolios, tickers)
+        if self.data_manager.add_ticker(ticker_name):
             await update.message.reply_text(f"Ticker '{ticker_name}' added successfully!")
         else:
             await update.message.reply_text(f"Ticker '{ticker_name}' already exists.")
@@ -139,25 +352,105 @@ class BotHandlers:
         ]
         return all(field in user_data for field in required_fields)
 
-    async def _create_portfolio(self, update, context, portfolios, tickers):
+    async def _create_portfolio(self, update, context):
         new_portfolio = {
             "name": context.user_data.get(UserDataKeys.PORTFOLIO_NAME.value),
             "url": context.user_data.get(UserDataKeys.PORTFOLIO_URL.value),
             "threshold": context.user_data.get(UserDataKeys.PORTFOLIO_THRESHOLD.value),
             "totalLostOrGainedSinceTheStartOfTheScript": 0,
         }
-        portfolios.append(new_portfolio)
-        self.data_manager.save_data(portfolios, tickers)
+        self.data_manager.add_portfolio(new_portfolio)
         await update.message.reply_text(f"Portfolio '{new_portfolio['name']}' added successfully!")
 
+async def _reload_shared_state() -> None:
+    price_alert_engine.load(await asyncio.to_thread(DataManager.load_alerts))
+    subscription_registry.load(await asyncio.to_thread(DataManager.load_subscriptions))
+    logger.info(f"Loaded price alerts {price_alert_engine.stats()} and subscriptions {subscription_registry.stats()}")
+
+async def _start_background_tasks(application: Application) -> None:
+    await _reload_shared_state()
+
+    if not config.RUN_MONITORS:
+        # Commands like /market and /alert still need a monitor for on-demand lookups
+        application.bot_data["market_monitor"] = CryptoMarketMonitor()
+        logger.info("Monitoring disabled on this instance, serving bot commands only")
+        return
+
+    scheduler = Scheduler()
+    if config.SHARED_STATE_RELOAD_INTERVAL > 0:
+        scheduler.add_job(
+            "shared-state", _reload_shared_state, config.SHARED_STATE_RELOAD_INTERVAL,
+            delay=config.SHARED_STATE_RELOAD_INTERVAL,
+        )
+    market_monitor = CryptoMarketMonitor(checkpoint=StateCheckpoint("market_monitor"))
+    coordinator = None
+    if config.SCRAPE_MODE == "coordinator":
+        coordinator = ScrapeCoordinator()
+        await coordinator.start()
+    portfolio_monitor = PortfolioMonitor(checkpoint=StateCheckpoint("portfolio_monitor"), coordinator=coordinator)
+
+    schedule_market_updates(scheduler, market_monitor)
+    schedule_portfolio_updates(scheduler, portfolio_monitor)
+    schedule_history_compaction(scheduler)
+    scheduler.start()
+
+    application.bot_data["scheduler"] = scheduler
+    application.bot_data["market_monitor"] = market_monitor
+    application.bot_data["portfolio_monitor"] = portfolio_monitor
+    logger.info("Market and portfolio monitoring scheduled")
+
+async def _stop_background_tasks(application: Application) -> None:
+    scheduler = application.bot_data.get("scheduler")
+    if scheduler is not None:
+        await scheduler.stop()
+
+    if "market_monitor" in application.bot_data:
+        await application.bot_data["market_monitor"].close()
+    if "portfolio_monitor" in application.bot_data:
+        await application.bot_data["portfolio_monitor"].shutdown()
+
+    await outbound_queue.stop(config.SHUTDOWN_FLUSH_TIMEOUT)
+
 def setup_bot():
     handlers = BotHandlers()
     
-    application = Application.builder().token(config.TELEGRAM_BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(config.TELEGRAM_BOT_TOKEN)
+        .base_url(f"{config.TELEGRAM_API_URL}/bot")
+        .post_init(_start_background_tasks)
+        .post_stop(_stop_background_tasks)
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", handlers.start))
     application.add_handler(CommandHandler("commands", handlers.commands))
+    application.add_handler(CommandHandler("market", handlers.market))
+    application.add_handler(CommandHandler("history", handlers.history))
+    application.add_handler(CommandHandler("refresh", handlers.refresh))
+    application.add_handler(CommandHandler("alert", handlers.alert))
+    application.add_handler(CommandHandler("alerts", handlers.alerts))
+    application.add_handler(CommandHandler("unalert", handlers.unalert))
+    application.add_handler(CommandHandler("subscribe", handlers.subscribe))
+    application.add_handler(CommandHandler("unsubscribe", handlers.unsubscribe))
+    application.add_handler(CommandHandler("subscriptions", handlers.subscriptions))
     application.add_handler(CallbackQueryHandler(handlers.handle_menu))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handlers.handle_user_input))
 
-    application.run_polling()
+    if config.BOT_MODE == "webhook":
+        if not config.WEBHOOK_SECRET_TOKEN:
+            raise ValueError("WEBHOOK_SECRET_TOKEN must be set when BOT_MODE is 'webhook'")
+
+        logger.info(f"Receiving updates via webhook on {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT}/{config.WEBHOOK_PATH}")
+        application.run_webhook(
+            listen=config.WEBHOOK_LISTEN,
+            port=config.WEBHOOK_PORT,
+            url_path=config.WEBHOOK_PATH,
+            webhook_url=config.WEBHOOK_URL or None,
+            secret_token=config.WEBHOOK_SECRET_TOKEN,
+            max_connections=config.WEBHOOK_MAX_CONNECTIONS,
+        )
+    elif config.BOT_MODE == "polling":
+        application.run_polling()
+    else:
+        raise ValueError(f"Unknown BOT_MODE: {config.BOT_MODE}")
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Dict, Optional
+from config.settings import config
+
+class _PortfolioActivity:
+    def __init__(self, value: float, observed_at: float):
+        self.value = value
+        self.observed_at = observed_at
+        self.rate: Optional[float] = None
+
+class AdaptivePollingPolicy:
+    def __init__(self, min_interval: float = None, max_interval: float = None, smoothing: float = 0.3):
+        self.min_interval = min_interval or config.ADAPTIVE_MIN_INTERVAL
+        self.max_interval = max_interval or config.ADAPTIVE_MAX_INTERVAL
+        self.smoothing = smoothing
+        self._activity: Dict[str, _PortfolioActivity] = {}
+        self._intervals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, portfolio_name: str, value: float, observed_at: float = None):
+        observed_at = time.monotonic() if observed_at is None else observed_at
+
+        with self._lock:
+            activity = self._activity.get(portfolio_name)
+            if activity is None:
+                self._activity[portfolio_name] = _PortfolioActivity(value, observed_at)
+                return
+
+            elapsed = observed_at - activity.observed_at
+            if elapsed <= 0 or not activity.value:
+                return
+
+            rate = abs(value - activity.value) / abs(activity.value) / elapsed
+            if activity.rate is None:
+                activity.rate = rate
+            else:
+                activity.rate = self.smoothing * rate + (1 - self.smoothing) * activity.rate
+            activity.value = value
+            activity.observed_at = observed_at
+
+    def interval_for(self, portfolio: dict, base_interval: float) -> float:
+        with self._lock:
+            activity = self._activity.get(portfolio["name"])
+            # observe() runs on worker threads, so read both fields in one consistent snapshot
+            observed = (activity.value, activity.rate) if activity is not None else None
+
+        interval = base_interval
+        if observed is not None:
+            value, observed_rate = observed
+            rate = observed_rate or 0.0
+            expected_move = rate * base_interval * 100
+
+            if observed_rate is not None:
+                if expected_move >= config.ADAPTIVE_VOLATILE_MOVE_PCT:
+                    interval = base_interval / 2
+                elif expected_move <= config.ADAPTIVE_STABLE_MOVE_PCT:
+                    interval = base_interval * 2
+
+            threshold = portfolio.get("threshold") or 0
+            if threshold > 0 and value < threshold:
+                distance = (threshold - value) / threshold
+                if distance * 100 <= config.ADAPTIVE_NEAR_THRESHOLD_PCT:
+                    interval = min(interval, base_interval / 4)
+                if rate > 0:
+                    interval = min(interval, distance / rate / 2)
+
+        floor = min(self.min_interval, base_interval)
+        ceiling = max(self.max_interval, base_interval)
+        interval = max(floor, min(ceiling, interval))
+        with self._lock:
+            self._intervals[portfolio["name"]] = interval
+        return interval
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(interval) for name, interval in self._intervals.items()}
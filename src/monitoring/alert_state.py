@@ -0,0 +1,61 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+ARMED = "armed"
+FIRED = "fired"
+ESCALATED = "escalated"
+
+class ThresholdAlertMachine:
+    def __init__(self, hysteresis_pct: float = None, cooldown: float = None, escalation_step_pct: float = None):
+        self.hysteresis_pct = config.ALERT_HYSTERESIS_PCT if hysteresis_pct is None else hysteresis_pct
+        self.cooldown = config.ALERT_COOLDOWN if cooldown is None else cooldown
+        self.escalation_step_pct = config.ALERT_ESCALATION_STEP_PCT if escalation_step_pct is None else escalation_step_pct
+        self._states: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def restore(self, states: Dict[str, dict]):
+        with self._lock:
+            self._states = {key: dict(state) for key, state in states.items() if isinstance(state, dict)}
+
+    def evaluate(self, key: str, value: float, threshold: float, now: float = None) -> Optional[str]:
+        now = time.time() if now is None else now
+
+        with self._lock:
+            if not threshold or threshold <= 0:
+                self._states.pop(key, None)
+                return None
+
+            state = self._states.get(key)
+            if state is None or state.get("threshold") != threshold:
+                state = self._states[key] = {"state": ARMED, "threshold": threshold, "notified_at": None, "notified_value": None}
+
+            if state["state"] == ARMED:
+                if value < threshold:
+                    return None
+                if state["notified_at"] is not None and now - state["notified_at"] < self.cooldown:
+                    return None
+                state.update(state=FIRED, notified_at=now, notified_value=value)
+                return FIRED
+
+            if value < threshold * (1 - self.hysteresis_pct / 100):
+                state["state"] = ARMED
+                logger.info(f"Threshold alert for {key} re-armed at {value:.2f}")
+                return None
+
+            if (
+                self.escalation_step_pct > 0
+                and value >= state["notified_value"] * (1 + self.escalation_step_pct / 100)
+                and now - state["notified_at"] >= self.cooldown
+            ):
+                state.update(notified_at=now, notified_value=value)
+                return ESCALATED
+            return None
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {key: dict(state) for key, state in self._states.items()}
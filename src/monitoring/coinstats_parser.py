@@ -0,0 +1,208 @@
+import json
+import logging
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# (tag, attribute, substring, descendant tag) in priority order, mirroring the Selenium CSS selectors
+FIELD_MATCHERS: Dict[str, List[Tuple[Optional[str], str, str, Optional[str]]]] = {
+    "username": [
+        (None, "class", "user-data-with-title", "h1"),
+        (None, "class", "user-data-with-title", "span"),
+        ("h1", "class", "user", None),
+        (None, "class", "username", None),
+        (None, "data-testid", "username", None),
+    ],
+    "total_value": [
+        (None, "class", "PT-price-info_price", None),
+        (None, "class", "price-info", None),
+        (None, "class", "portfolio-value", None),
+        (None, "data-testid", "portfolio-value", None),
+    ],
+    "percentage_change": [
+        (None, "class", "percentText", None),
+        (None, "class", "percent", None),
+        (None, "class", "percentage-change", None),
+        (None, "data-testid", "percentage-change", None),
+    ],
+    "money_changed": [
+        (None, "class", "PTProfitInfoPrice", None),
+        (None, "class", "PortfolioProfitInfo", None),
+        (None, "data-testid", "money-change", None),
+        (None, "class", "money-change", None),
+    ],
+}
+
+STATE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "total_value": ("totalValue", "portfolioValue", "totalPrice"),
+    "percentage_change": ("profitPercent", "percentChange", "totalProfitPercent"),
+    "money_changed": ("profit", "profitValue", "totalProfit"),
+}
+
+def parse_amount(text: Union[str, float, int], strip: Tuple[str, ...] = ("$", ",")) -> float:
+    if isinstance(text, (int, float)):
+        return float(text)
+
+    clean = text
+    for token in strip:
+        clean = clean.replace(token, "")
+    clean = clean.strip()
+
+    if clean.startswith("(") and clean.endswith(")"):
+        clean = "-" + clean[1:-1]
+    return float(clean)
+
+def parse_percentage(text: Union[str, float, int]) -> float:
+    return parse_amount(text, strip=("%",))
+
+class _FieldCollector(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[str] = []
+        self.containers: List[Tuple[int, str, int]] = []
+        self.captures: List[Dict[str, Any]] = []
+        self.found: Dict[str, Tuple[int, str]] = {}
+        self.state_json: Optional[str] = None
+        self._in_state_script = False
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+
+        if tag == "script" and attributes.get("id") == "__NEXT_DATA__":
+            self._in_state_script = True
+            self.state_json = ""
+
+        for field, matchers in FIELD_MATCHERS.items():
+            for priority, (required_tag, attr, fragment, descendant) in enumerate(matchers):
+                if self._has_match(field, priority):
+                    continue
+
+                if descendant and tag == descendant and self._inside_container(field, priority):
+                    self._start_capture(field, priority, attributes)
+                elif required_tag in (None, tag) and fragment in (attributes.get(attr) or ""):
+                    if descendant:
+                        self.containers.append((len(self.stack), field, priority))
+                    else:
+                        self._start_capture(field, priority, attributes)
+
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+        else:
+            self._close_captures(len(self.stack) + 1)
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_state_script = False
+
+        if tag in VOID_TAGS or tag not in self.stack:
+            return
+
+        while self.stack:
+            depth = len(self.stack)
+            closed = self.stack.pop()
+            self._close_captures(depth)
+            self.containers = [c for c in self.containers if c[0] < depth - 1]
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_state_script:
+            self.state_json += data
+            return
+
+        for capture in self.captures:
+            capture["text"] += data
+
+    def _has_match(self, field: str, priority: int) -> bool:
+        best = self.found.get(field)
+        return best is not None and best[0] <= priority
+
+    def _inside_container(self, field: str, priority: int) -> bool:
+        return any(f == field and p == priority for _, f, p in self.containers)
+
+    def _start_capture(self, field: str, priority: int, attributes: Dict[str, Optional[str]]):
+        self.captures.append({
+            "depth": len(self.stack) + 1,
+            "field": field,
+            "priority": priority,
+            "title": attributes.get("title"),
+            "text": "",
+        })
+
+    def _close_captures(self, depth: int):
+        remaining = []
+        for capture in self.captures:
+            if capture["depth"] < depth:
+                remaining.append(capture)
+                continue
+
+            text = capture["title"] or " ".join(capture["text"].split())
+            if text and not self._has_match(capture["field"], capture["priority"]):
+                self.found[capture["field"]] = (capture["priority"], text)
+        self.captures = remaining
+
+def _find_state_value(node: Any, keys: Tuple[str, ...]) -> Optional[Any]:
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            for key in keys:
+                value = current.get(key)
+                if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+                    return value
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+    return None
+
+def _collect_fields(html: str) -> _FieldCollector:
+    collector = _FieldCollector()
+    collector.feed(html)
+    collector.close()
+    return collector
+
+def _decode_state(state_json: Optional[str]) -> Optional[Any]:
+    if not state_json:
+        return None
+    try:
+        return json.loads(state_json)
+    except json.JSONDecodeError as e:
+        logger.debug(f"Failed to decode embedded page state: {e}")
+        return None
+
+def parse_portfolio_page(html: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
+    collector = _collect_fields(html)
+    state = []
+
+    def convert(field, parser):
+        raw = collector.found.get(field, (None, None))[1]
+        if raw is not None:
+            try:
+                return parser(raw)
+            except ValueError:
+                logger.debug(f"Failed to parse {field} '{raw}' from page HTML")
+
+        # The embedded page state only gets decoded when the markup is missing or unparseable
+        if not state:
+            state.append(_decode_state(collector.state_json))
+        if state[0] is None:
+            return None
+
+        raw = _find_state_value(state[0], STATE_KEYS[field])
+        if raw is None:
+            return None
+        try:
+            return parser(raw)
+        except ValueError:
+            logger.debug(f"Failed to parse {field} '{raw}' from page state")
+            return None
+
+    username = collector.found.get("username", (None, "Unknown"))[1]
+    total_value = convert("total_value", parse_amount)
+    percentage_change = convert("percentage_change", parse_percentage)
+    money_changed = convert("money_changed", parse_amount)
+
+    return username, total_value, percentage_change, money_changed
@@ -1,34 +1,89 @@
-import time
-import requests
+import asyncio
 import logging
+import httpx
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+from src.monitoring.market_snapshot import MarketSnapshot
+from src.monitoring.price_alerts import describe_alert, price_alert_engine
+from src.utils.checkpoint import StateCheckpoint
+from src.utils.response_cache import response_cache, cmc_credits
+from src.utils.scheduler import Scheduler
+from src.utils.subscriptions import subscription_registry
 from src.utils.telegram_client import TelegramClient
+from src.utils.timeseries import history_store
 from src.utils.data_manager import DataManager
 from config.settings import config
 
 logger = logging.getLogger(__name__)
 
 class CryptoMarketMonitor:
-    def __init__(self):
+    def __init__(self, checkpoint: Optional[StateCheckpoint] = None):
         self.telegram_client = TelegramClient()
         self.data_manager = DataManager()
         self.previous_dominance = {"btc_dominance": None}
         self.previous_prices = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.checkpoint = checkpoint
 
-    def fetch_crypto_market_data(self, symbols: list) -> Optional[Dict[str, Any]]:
+        if checkpoint is not None:
+            state = checkpoint.restore()
+            self.previous_prices.update(state.get("previous_prices", {}))
+            self.previous_dominance.update(state.get("previous_dominance", {}))
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(config.MARKET_REQUEST_TIMEOUT),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=60),
+            )
+        return self._http_client
+
+    async def close(self):
+        await asyncio.to_thread(self.checkpoint_state)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+    async def run_market_update(self):
+        default_symbols = await asyncio.to_thread(self.data_manager.load_tickers)
+        symbols = list(dict.fromkeys(default_symbols + subscription_registry.selected_keys("market")))
+        # Scheduled cycles must broadcast fresh data, so they never accept a stale cache entry
+        market_data, fear_and_greed_index, sentiment = await self.fetch_market_update(symbols, stale_ttl=0)
+
+        if market_data:
+            triggered = price_alert_engine.evaluate(market_data["snapshot"])
+            if triggered:
+                await self.send_price_alerts(triggered)
+
+            await self.send_crypto_market_update(market_data, fear_and_greed_index, sentiment, default_symbols)
+            await asyncio.to_thread(self.checkpoint_state)
+            await asyncio.to_thread(self.record_history, market_data)
+
+        logger.info(f"Response cache stats: {response_cache.stats()}, CMC credits: {cmc_credits.stats()}")
+        logger.info(f"Telegram outbound stats: {self.telegram_client.stats()}")
+
+    async def fetch_market_update(self, symbols: list, stale_ttl: float = None) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
+        market_data, (fear_and_greed_index, sentiment) = await asyncio.gather(
+            self.fetch_crypto_market_data(symbols, stale_ttl),
+            self.fetch_fear_and_greed_index(),
+        )
+        return market_data, fear_and_greed_index, sentiment
+
+    async def fetch_crypto_market_data(self, symbols: list, stale_ttl: float = None) -> Optional[Dict[str, Any]]:
         try:
             headers = {
                 'Accepts': 'application/json',
-                'X-CMC_PRO_API_KEY': config.COINMARKETCAP_API_KEY,
+                'X-CMC_PRO_API_KEY': config.COINMARKETCAP_API_KEY or '',
             }
 
-            global_data = self._fetch_global_metrics(headers)
-            if not global_data:
-                return None
-
-            coins_data = self._fetch_coins_data(headers)
-            if not coins_data:
+            global_data, coins_data = await asyncio.gather(
+                response_cache.get_or_fetch(
+                    "cmc_global_metrics", lambda: self._fetch_global_metrics(headers), config.CMC_GLOBAL_TTL, stale_ttl
+                ),
+                response_cache.get_or_fetch(
+                    "cmc_listings", lambda: self._fetch_coins_data(headers), config.CMC_LISTINGS_TTL, stale_ttl
+                ),
+            )
+            if not global_data or not coins_data:
                 return None
 
             return self._process_market_data(global_data, coins_data, symbols)
@@ -37,32 +92,40 @@ class CryptoMarketMonitor:
             logger.error(f"Failed to fetch crypto market data: {e}")
             return None
 
-    def _fetch_global_metrics(self, headers: dict) -> Optional[dict]:
+    async def _fetch_global_metrics(self, headers: dict) -> Optional[dict]:
+        if not await asyncio.to_thread(cmc_credits.allows, "global-metrics"):
+            return None
         try:
-            url = "https://pro-api.coinmarketcap.com/v1/global-metrics/quotes/latest"
-            response = requests.get(url, headers=headers, timeout=10)
+            url = f"{config.CMC_API_URL}/v1/global-metrics/quotes/latest"
+            response = await self._client().get(url, headers=headers)
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            data = response.json()
+            await asyncio.to_thread(self._record_credits, "global-metrics", data)
+            return data
+        except httpx.HTTPError as e:
             logger.error(f"Failed to fetch global metrics: {e}")
             return None
 
-    def _fetch_coins_data(self, headers: dict) -> Optional[list]:
+    async def _fetch_coins_data(self, headers: dict) -> Optional[list]:
+        if not await asyncio.to_thread(cmc_credits.allows, "listings"):
+            return None
         try:
-            url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
+            url = f"{config.CMC_API_URL}/v1/cryptocurrency/listings/latest"
             params = {"start": 1, "limit": 3500, "convert": "USD"}
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = await self._client().get(
+                url, headers=headers, params=params, timeout=config.LISTINGS_REQUEST_TIMEOUT
+            )
             response.raise_for_status()
-            return response.json()["data"]
-        except requests.RequestException as e:
+            data = response.json()
+            await asyncio.to_thread(self._record_credits, "listings", data)
+            return data["data"]
+        except httpx.HTTPError as e:
             logger.error(f"Failed to fetch coins data: {e}")
             return None
 
     def _process_market_data(self, global_data: dict, coins_data: list, symbols: list) -> dict:
-        valid_coins = [coin for coin in coins_data if coin["quote"]["USD"].get("percent_change_24h") is not None]
-        
-        top_gainer = max(valid_coins, key=lambda x: x["quote"]["USD"]["percent_change_24h"], default=None)
-        top_loser = min(valid_coins, key=lambda x: x["quote"]["USD"]["percent_change_24h"], default=None)
+        snapshot = MarketSnapshot(coins_data)
+        movers = snapshot.top_movers(config.TOP_MOVERS_COUNT)
 
         global_quote = global_data["data"]["quote"]["USD"]
         total_market_cap = global_quote["total_market_cap"]
@@ -72,90 +135,153 @@ class CryptoMarketMonitor:
 
         filtered_data = {}
         for symbol in symbols:
-            coin_data = next((coin for coin in coins_data if coin["symbol"] == symbol), None)
+            coin_data = snapshot.lookup(symbol)
             if coin_data:
-                filtered_data[symbol] = {
-                    "name": coin_data["name"],
-                    "price": coin_data["quote"]["USD"].get("price"),
-                    "change_24h": coin_data["quote"]["USD"].get("percent_change_24h"),
-                }
+                filtered_data[symbol] = coin_data
 
         return {
             "filtered_data": filtered_data,
-            "top_gainer": self._format_coin_data(top_gainer) if top_gainer else None,
-            "top_loser": self._format_coin_data(top_loser) if top_loser else None,
+            "top_gainer": movers["gainers"][0] if movers["gainers"] else None,
+            "top_loser": movers["losers"][0] if movers["losers"] else None,
+            "top_gainers": movers["gainers"],
+            "top_losers": movers["losers"],
+            "change_percentiles": snapshot.change_percentiles(),
+            "breadth": snapshot.breadth(),
             "total_market_cap": total_market_cap,
             "bitcoin_dominance": bitcoin_dominance,
             "ethereum_dominance": ethereum_dominance,
             "altcoin_dominance": altcoin_dominance,
+            "snapshot": snapshot,
         }
 
-    def _format_coin_data(self, coin: dict) -> dict:
-        return {
-            "name": coin["name"],
-            "symbol": coin["symbol"],
-            "change": coin["quote"]["USD"]["percent_change_24h"]
-        }
+    def _record_credits(self, endpoint: str, data: dict):
+        credits = (data.get("status") or {}).get("credit_count")
+        if credits is not None:
+            cmc_credits.record(endpoint, credits)
 
-    def fetch_fear_and_greed_index(self) -> Tuple[Optional[str], Optional[str]]:
-        try:
-            url = "https://api.alternative.me/fng/"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+    async def fetch_fear_and_greed_index(self) -> Tuple[Optional[str], Optional[str]]:
+        data = await response_cache.get_or_fetch(
+            "fear_and_greed", self._fetch_fear_and_greed_data, config.FEAR_GREED_TTL
+        )
+        if not data:
+            return None, None
 
+        try:
             fear_and_greed_index = data["data"][0]["value"]
             sentiment = data["data"][0]["value_classification"]
-
             return fear_and_greed_index, sentiment
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch Fear & Greed Index: {e}")
+        except (KeyError, IndexError) as e:
+            logger.error(f"Unexpected Fear & Greed Index payload: {e}")
             return None, None
 
-    def send_crypto_market_update(self, market_data: dict, fear_and_greed_index: str, sentiment: str):
+    async def _fetch_fear_and_greed_data(self) -> Optional[dict]:
+        try:
+            url = f"{config.FEAR_GREED_API_URL}/fng/"
+            response = await self._client().get(url)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to fetch Fear & Greed Index: {e}")
+            return None
+
+    async def send_crypto_market_update(self, market_data: dict, fear_and_greed_index: str, sentiment: str,
+                                        default_symbols: Optional[List[str]] = None):
         if not market_data:
             return
 
-        current_time = datetime.now().strftime('%H:%M')
-        
-        crypto_updates = self._build_crypto_updates(market_data["filtered_data"])
+        messages = await asyncio.to_thread(
+            self.render_market_update, market_data, fear_and_greed_index, sentiment, default_symbols
+        )
+        for message, chat_ids in messages:
+            await self.telegram_client.broadcast(message, chat_ids)
+
+    def render_market_update(self, market_data: dict, fear_and_greed_index: str, sentiment: str,
+                             default_symbols: Optional[List[str]] = None) -> List[Tuple[str, List[str]]]:
+        fragments = self.build_market_fragments(market_data, fear_and_greed_index, sentiment)
+        audiences = subscription_registry.audiences("market")
+
+        messages = []
+        for selection, chat_ids in audiences.items():
+            symbols = list(selection) if selection is not None else default_symbols
+            messages.append((self.render_market_message(fragments, symbols), chat_ids))
+
+        logger.info(f"Rendered market update for {len(audiences)} ticker selections, {sum(map(len, audiences.values()))} chats")
+        return messages
+
+    async def send_price_alerts(self, triggered: List[Tuple[dict, float]]):
+        for alert, price in triggered:
+            await asyncio.to_thread(self.data_manager.remove_alert, alert["id"])
+            price_format = ".4f" if price < 1 else ".2f"
+            await self.telegram_client.send_message(
+                f"🔔 <b>Price Alert</b>\n"
+                f"{describe_alert(alert)}\n\n"
+                f"💰 Current Price: ${price:{price_format}}",
+                chat_id=alert["chat_id"],
+            )
+        logger.info(f"Sent {len(triggered)} price alerts ({price_alert_engine.stats()})")
+
+    def build_market_message(self, market_data: dict, fear_and_greed_index: str, sentiment: str,
+                             track_changes: bool = True) -> str:
+        return self.render_market_message(
+            self.build_market_fragments(market_data, fear_and_greed_index, sentiment, track_changes)
+        )
+
+    def build_market_fragments(self, market_data: dict, fear_and_greed_index: str, sentiment: str,
+                               track_changes: bool = True) -> dict:
+        ticker_lines = self._build_ticker_lines(market_data["filtered_data"], track_changes)
         
         gainer_text, loser_text = self._build_gainer_loser_text(market_data)
         
         dominance_text = self._build_dominance_text(market_data["bitcoin_dominance"])
         
-        message = (
-            f"📈 <b>Crypto Market Update</b>\n\n"
-            f"{crypto_updates}\n\n"
+        breadth_text = self._build_breadth_text(market_data.get("breadth"))
+        
+        summary = (
             f"{gainer_text}"
             f"{loser_text}"
             f"🌐 Total Market Cap: ${market_data['total_market_cap'] / 1e12:.2f}T\n"
             f"📊 BTC Dominance: {dominance_text}%\n"
             f"📊 ETH Dominance: {market_data['ethereum_dominance']:.2f}%\n"
             f"📊 Altcoin Dominance: {market_data['altcoin_dominance']:.2f}%\n"
-            f"😨 Fear & Greed Index: {fear_and_greed_index} ({sentiment})\n\n"
-            f"🕒 Sent at: {current_time}"
+            f"{breadth_text}"
+            f"😨 Fear & Greed Index: {fear_and_greed_index} ({sentiment})"
         )
 
-        self.telegram_client.send_message(message)
+        return {
+            "ticker_lines": ticker_lines,
+            "summary": summary,
+            "sent_at": datetime.now().strftime('%H:%M'),
+        }
+
+    def render_market_message(self, fragments: dict, symbols: Optional[List[str]] = None) -> str:
+        ticker_lines = fragments["ticker_lines"]
+        symbols = ticker_lines.keys() if symbols is None else symbols
+        crypto_updates = "\n".join(ticker_lines[symbol] for symbol in symbols if symbol in ticker_lines)
 
-    def _build_crypto_updates(self, filtered_data: dict) -> str:
-        crypto_updates = []
+        return (
+            f"📈 <b>Crypto Market Update</b>\n\n"
+            f"{crypto_updates}\n\n"
+            f"{fragments['summary']}\n\n"
+            f"🕒 Sent at: {fragments['sent_at']}"
+        )
+
+    def _build_ticker_lines(self, filtered_data: dict, track_changes: bool = True) -> Dict[str, str]:
+        ticker_lines = {}
         
         for symbol, data in filtered_data.items():
             if data['price'] is not None:
                 link = self._construct_hyperlink(data['name'])
                 price_format = f"${data['price']:.4f}" if data['price'] < 1 else f"${data['price']:.2f}"
                 
-                emoji, formatted_difference = self._get_price_change_info(symbol, data['price'])
+                emoji, formatted_difference = self._get_price_change_info(symbol, data['price'], track_changes)
                 
-                crypto_updates.append(
+                ticker_lines[symbol] = (
                     f"{emoji} <a href='{link}'>{data['name']} ({symbol})</a>: {price_format} {formatted_difference}"
                 )
         
-        return "\n".join(crypto_updates)
+        return ticker_lines
 
-    def _get_price_change_info(self, symbol: str, current_price: float) -> Tuple[str, str]:
+    def _get_price_change_info(self, symbol: str, current_price: float, track_changes: bool = True) -> Tuple[str, str]:
         emoji = "💰"
         formatted_difference = ""
         
@@ -172,7 +298,8 @@ class CryptoMarketMonitor:
             
             formatted_difference = f"({price_difference:+.4f})" if current_price < 1 else f"({price_difference:+.2f})"
         
-        self.previous_prices[symbol] = current_price
+        if track_changes:
+            self.previous_prices[symbol] = current_price
         return emoji, formatted_difference
 
     def _construct_hyperlink(self, name: str) -> str:
@@ -213,23 +340,37 @@ class CryptoMarketMonitor:
         self.previous_dominance["btc_dominance"] = bitcoin_dominance
         return dominance_text
 
-def monitor_market_updates():
-    monitor = CryptoMarketMonitor()
-    
-    while True:
-        try:
-            symbols = monitor.data_manager.load_tickers()
-            market_data = monitor.fetch_crypto_market_data(symbols)
-            fear_and_greed_index, sentiment = monitor.fetch_fear_and_greed_index()
+    def checkpoint_state(self):
+        if self.checkpoint is None:
+            return
 
-            if market_data:
-                monitor.send_crypto_market_update(market_data, fear_and_greed_index, sentiment)
+        for symbol, price in self.previous_prices.items():
+            self.checkpoint.record("previous_prices", symbol, price)
+        for key, value in self.previous_dominance.items():
+            self.checkpoint.record("previous_dominance", key, value)
+        self.checkpoint.flush()
 
-            for remaining in range(config.CRYPTO_UPDATE_INTERVAL, 0, -10):
-                minutes, seconds = divmod(remaining, 60)
-                logger.info(f"Next market update in: {minutes:02d}:{seconds:02d}")
-                time.sleep(10)
+    def record_history(self, market_data: dict):
+        points = {
+            f"price:{symbol}": data["price"]
+            for symbol, data in market_data["filtered_data"].items()
+            if data["price"] is not None
+        }
+        points["dominance:btc"] = market_data["bitcoin_dominance"]
+        points["dominance:eth"] = market_data["ethereum_dominance"]
+        points["market_cap:total"] = market_data["total_market_cap"]
+        history_store.append_many(points)
 
-        except Exception as e:
-            logger.error(f"Error in market monitoring: {e}")
-            time.sleep(60)
+    def _build_breadth_text(self, breadth: Optional[dict]) -> str:
+        if not breadth or not (breadth["advancing"] + breadth["declining"]):
+            return ""
+        return (
+            f"⚖️ Market Breadth: {breadth['advancing']}▲ / {breadth['declining']}▼ "
+            f"({breadth['advancing_pct']:.0f}% advancing)\n"
+        )
+
+def schedule_market_updates(scheduler: Scheduler, monitor: CryptoMarketMonitor):
+    scheduler.add_job(
+        "market", monitor.run_market_update, config.CRYPTO_UPDATE_INTERVAL, retry_delay=config.MARKET_RETRY_DELAY
+    )
+    logger.info(f"Scheduled market updates every {config.CRYPTO_UPDATE_INTERVAL}s")
@@ -0,0 +1,211 @@
+import time
+import logging
+import threading
+import psutil
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class PooledDriver:
+    def __init__(self, driver: webdriver.Chrome, driver_id: int):
+        self.driver = driver
+        self.driver_id = driver_id
+        self.created_at = time.monotonic()
+        self.navigations = 0
+        self.baseline_rss_mb: Optional[float] = None
+
+    def get(self, url: str):
+        self.navigations += 1
+        self.driver.get(url)
+
+class ChromeDriverPool:
+    def __init__(self, driver_factory: Callable[[], webdriver.Chrome], size: int = None,
+                 max_navigations: int = None, max_memory_growth_mb: int = None):
+        self.driver_factory = driver_factory
+        self.size = size or config.DRIVER_POOL_SIZE
+        self.max_navigations = max_navigations or config.DRIVER_MAX_NAVIGATIONS
+        self.max_memory_growth_mb = max_memory_growth_mb or config.DRIVER_MAX_MEMORY_GROWTH_MB
+
+        self._lock = threading.Condition()
+        self._idle: List[PooledDriver] = []
+        self._in_use = 0
+        self._next_id = 1
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "recycled_navigations": 0,
+            "recycled_memory": 0,
+            "replaced_crashed": 0,
+            "discarded_crashed": 0,
+            "acquisitions": 0,
+            "acquire_wait_seconds": 0.0,
+            "startup_seconds": 0.0,
+        }
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        pooled = self.acquire(timeout)
+        healthy = True
+        try:
+            yield pooled
+        except Exception:
+            healthy = self._is_healthy(pooled)
+            raise
+        finally:
+            self.release(pooled, healthy=healthy)
+
+    def acquire(self, timeout: float = None) -> PooledDriver:
+        started = time.monotonic()
+        deadline = started + timeout if timeout else None
+
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise WebDriverException("Driver pool is closed")
+
+                if self._idle:
+                    pooled = self._idle.pop()
+                    self._in_use += 1
+                    break
+
+                if self._in_use < self.size:
+                    pooled = None
+                    self._in_use += 1
+                    break
+
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise WebDriverException("Timed out waiting for a free Chrome driver")
+                self._lock.wait(remaining)
+
+        try:
+            if pooled is not None and not self._is_healthy(pooled):
+                logger.warning(f"Chrome driver #{pooled.driver_id} failed health check, replacing it")
+                self._quit(pooled)
+                self._increment("replaced_crashed")
+                pooled = None
+
+            if pooled is None:
+                pooled = self._create()
+            else:
+                self._increment("reused")
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        with self._lock:
+            self._stats["acquisitions"] += 1
+            self._stats["acquire_wait_seconds"] += time.monotonic() - started
+
+        return pooled
+
+    def release(self, pooled: PooledDriver, healthy: bool = True):
+        keep = healthy and not self._closed
+
+        if keep and pooled.navigations >= self.max_navigations:
+            logger.info(f"Recycling Chrome driver #{pooled.driver_id} after {pooled.navigations} navigations")
+            self._increment("recycled_navigations")
+            keep = False
+
+        if keep and self._memory_growth_mb(pooled) > self.max_memory_growth_mb:
+            logger.info(f"Recycling Chrome driver #{pooled.driver_id} due to memory growth")
+            self._increment("recycled_memory")
+            keep = False
+
+        if not healthy:
+            self._increment("discarded_crashed")
+
+        if not keep:
+            self._quit(pooled)
+
+        with self._lock:
+            self._in_use -= 1
+            if keep:
+                self._idle.append(pooled)
+            self._lock.notify()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+
+        for pooled in idle:
+            self._quit(pooled)
+
+        logger.info(f"Chrome driver pool closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._in_use
+            stats["size"] = self.size
+
+        acquisitions = stats["acquisitions"] or 1
+        stats["reuse_ratio"] = stats["reused"] / acquisitions
+        stats["avg_acquire_seconds"] = stats["acquire_wait_seconds"] / acquisitions
+        return stats
+
+    def _create(self) -> PooledDriver:
+        started = time.monotonic()
+        driver = self.driver_factory()
+
+        with self._lock:
+            driver_id = self._next_id
+            self._next_id += 1
+            self._stats["created"] += 1
+            self._stats["startup_seconds"] += time.monotonic() - started
+
+        pooled = PooledDriver(driver, driver_id)
+        pooled.baseline_rss_mb = self._process_tree_rss_mb(pooled)
+        logger.info(f"Started Chrome driver #{driver_id} in {time.monotonic() - started:.2f}s")
+        return pooled
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logger.debug(f"Chrome driver #{pooled.driver_id} health check failed: {e}")
+            return False
+
+    def _memory_growth_mb(self, pooled: PooledDriver) -> float:
+        current = self._process_tree_rss_mb(pooled)
+        if current is None or pooled.baseline_rss_mb is None:
+            return 0.0
+        return current - pooled.baseline_rss_mb
+
+    def _process_tree_rss_mb(self, pooled: PooledDriver) -> Optional[float]:
+        # chromedriver spawns the browser and its renderers, so sum the RSS of the whole process tree
+        try:
+            root = psutil.Process(pooled.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return None
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing Chrome driver #{pooled.driver_id}: {e}")
+
+    def _increment(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
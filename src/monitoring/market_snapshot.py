@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional
+import numpy as np
+
+class MarketSnapshot:
+    def __init__(self, coins_data: list):
+        count = len(coins_data)
+        self.symbols: List[str] = [None] * count
+        self.names: List[str] = [None] * count
+        self.prices = np.full(count, np.nan)
+        self.changes_24h = np.full(count, np.nan)
+        self.market_caps = np.full(count, np.nan)
+        self.index: Dict[str, int] = {}
+
+        for row, coin in enumerate(coins_data):
+            quote = coin["quote"]["USD"]
+            symbol = coin["symbol"]
+            self.symbols[row] = symbol
+            self.names[row] = coin["name"]
+            self.prices[row] = _to_float(quote.get("price"))
+            self.changes_24h[row] = _to_float(quote.get("percent_change_24h"))
+            self.market_caps[row] = _to_float(quote.get("market_cap"))
+            self.index.setdefault(symbol, row)
+
+        self._valid_rows = np.flatnonzero(~np.isnan(self.changes_24h))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def lookup(self, symbol: str) -> Optional[dict]:
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+        return {
+            "name": self.names[row],
+            "price": _to_optional(self.prices[row]),
+            "change_24h": _to_optional(self.changes_24h[row]),
+        }
+
+    def price(self, symbol: str) -> Optional[float]:
+        row = self.index.get(symbol)
+        return None if row is None else _to_optional(self.prices[row])
+
+    def top_movers(self, count: int = 5) -> Dict[str, List[dict]]:
+        valid = self._valid_rows
+        if valid.size == 0:
+            return {"gainers": [], "losers": []}
+
+        changes = self.changes_24h[valid]
+        count = min(count, valid.size)
+
+        # Stable sort keeps the listing (rank) order for ties, like max()/min() did
+        ascending = valid[np.argsort(changes, kind="stable")]
+        descending = valid[np.argsort(-changes, kind="stable")]
+
+        return {
+            "gainers": [self._mover(row) for row in descending[:count]],
+            "losers": [self._mover(row) for row in ascending[:count]],
+        }
+
+    def change_percentiles(self, percentiles=(10, 25, 50, 75, 90)) -> Dict[int, float]:
+        changes = self.changes_24h[self._valid_rows]
+        if changes.size == 0:
+            return {}
+        values = np.percentile(changes, percentiles)
+        return {p: float(v) for p, v in zip(percentiles, values)}
+
+    def breadth(self) -> Dict[str, float]:
+        changes = self.changes_24h[self._valid_rows]
+        advancing = int(np.count_nonzero(changes > 0))
+        declining = int(np.count_nonzero(changes < 0))
+        total = int(changes.size)
+        return {
+            "advancing": advancing,
+            "declining": declining,
+            "unchanged": total - advancing - declining,
+            "advancing_pct": advancing / total * 100 if total else 0.0,
+        }
+
+    def _mover(self, row: int) -> dict:
+        return {
+            "name": self.names[row],
+            "symbol": self.symbols[row],
+            "change": float(self.changes_24h[row]),
+        }
+
+def _to_float(value) -> float:
+    return float(value) if value is not None else np.nan
+
+def _to_optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
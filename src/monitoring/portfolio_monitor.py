@@ -1,225 +1,215 @@
-import time
+import asyncio
 import logging
-import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
-from typing import Optional, Tuple, Dict, List
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from src.utils.telegram_client import TelegramClient
+from typing import Optional, Tuple, Dict, List, Set
+from src.monitoring.adaptive_polling import AdaptivePollingPolicy
+from src.monitoring.alert_state import ESCALATED, ThresholdAlertMachine
+from src.monitoring.portfolio_scraper import PortfolioScraper
+from src.monitoring.resource_blocker import describe_network_usage
+from src.monitoring.scrape_cluster import ScrapeCoordinator
+from src.utils.checkpoint import StateCheckpoint
+from src.utils.scheduler import Scheduler
+from src.utils.subscriptions import subscription_registry
+from src.utils.telegram_client import TelegramClient, pack_message_blocks
+from src.utils.timeseries import history_store
 from src.utils.data_manager import DataManager
 from config.settings import config
 
 logger = logging.getLogger(__name__)
 
 class PortfolioMonitor:
-    def __init__(self):
+    def __init__(self, checkpoint: Optional[StateCheckpoint] = None, coordinator: Optional[ScrapeCoordinator] = None):
         self.telegram_client = TelegramClient()
         self.data_manager = DataManager()
         self.previous_values = {}
         self.total_gain_loss = {}
-        self.max_retries = 3
-        self.retry_delay = 5
-
-    def _setup_chrome_driver(self) -> webdriver.Chrome:
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-search-engine-choice-screen')
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
+        self.checkpoint = checkpoint
+        self.coordinator = coordinator
+        self.workers = max(1, config.PORTFOLIO_WORKERS)
+        self.scraper = PortfolioScraper(pool_size=max(config.DRIVER_POOL_SIZE, self.workers))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="portfolio-scraper")
+        self.polling_policy = AdaptivePollingPolicy()
+        self.threshold_alerts = ThresholdAlertMachine()
+        self.scheduler: Optional[Scheduler] = None
+        self.max_consecutive_failures = 5
+        self._portfolios: Dict[str, dict] = {}
+        self._failures: Dict[str, int] = {}
+        self._digest: Dict[str, str] = {}
+        self._round: Set[str] = set()
+        self._round_done = asyncio.Event()
+        self._round_updates = 0
+        self._round_task: Optional[asyncio.Task] = None
+        self._update_lock = asyncio.Lock()
 
-        try:
-               chrome_driver_path = os.getenv('CHROME_DRIVER_PATH')
-        
-               if chrome_driver_path and chrome_driver_path.strip() and os.path.exists(chrome_driver_path):
-                   logger.info(f"Using ChromeDriver from environment path: {chrome_driver_path}")
-                   service = Service(chrome_driver_path)
-               else:
-                   logger.info("No ChromeDriver path in environment, using WebDriverManager")
-                   
-                   # Fix for the THIRD_PARTY_NOTICES issue
-                   chrome_install = ChromeDriverManager().install()
-                   folder = os.path.dirname(chrome_install)
-                   chromedriver_path = os.path.join(folder, "chromedriver.exe")
-                   service = Service(chromedriver_path)
-        
-               driver = webdriver.Chrome(service=service, options=options)
-               driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-               return driver
-        except Exception as e:
-           logger.error(f"Failed to setup Chrome driver: {e}")
-           raise WebDriverException(f"Chrome driver setup failed: {e}")
-
-    def _safe_extract_text(self, driver: webdriver.Chrome, selectors: List[str], 
-                          element_name: str, timeout: int = None) -> Optional[str]:
-        timeout = timeout or config.SELENIUM_TIMEOUT
-        
-        for i, selector in enumerate(selectors):
-            try:
-                logger.debug(f"Trying {element_name} selector {i+1}/{len(selectors)}: {selector}")
-                element = WebDriverWait(driver, timeout).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                
-                text = element.get_attribute("title") or element.text.strip()
-                if text:
-                    logger.info(f"Successfully extracted {element_name}: {text}")
-                    return text
-                    
-            except (TimeoutException, NoSuchElementException) as e:
-                logger.debug(f"{element_name} selector {selector} failed: {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"Unexpected error with {element_name} selector {selector}: {e}")
+        if coordinator is not None:
+            coordinator.on_stats = self.scraper.merge_stats
+
+        if checkpoint is not None:
+            state = checkpoint.restore()
+            self.previous_values.update(state.get("previous_values", {}))
+            self.total_gain_loss.update(state.get("total_gain_loss", {}))
+            self.threshold_alerts.restore(state.get("threshold_alerts", {}))
+
+    def get_portfolio_data(self, portfolio_url: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
+        return self.scraper.get_portfolio_data(portfolio_url)
+
+    def path_stats(self) -> Dict[str, int]:
+        return self.scraper.path_stats()
+
+    def readiness_stats(self) -> Dict[str, float]:
+        return self.scraper.readiness_stats()
+
+    def job_name(self, portfolio_name: str) -> str:
+        return f"portfolio:{portfolio_name}"
+
+    def interval_for(self, portfolio: dict) -> float:
+        base_interval = portfolio.get("interval") or config.PORTFOLIO_UPDATE_INTERVAL
+        if not config.ADAPTIVE_POLLING:
+            return base_interval
+        return self.polling_policy.interval_for(portfolio, base_interval)
+
+    async def sync_jobs(self):
+        portfolios = await asyncio.to_thread(self.data_manager.load_portfolios)
+        if not portfolios:
+            logger.warning("No portfolios found to monitor")
+
+        self._portfolios = {}
+        for portfolio in portfolios:
+            if not isinstance(portfolio, dict) or not portfolio.get("name") or not portfolio.get("url"):
+                logger.error(f"Skipping malformed portfolio entry: {portfolio}")
                 continue
-        
-        logger.error(f"Failed to extract {element_name} with any selector")
-        return None
-
-    def _extract_username(self, driver: webdriver.Chrome) -> str:
-        selectors = [
-            '.UserInfoMenuItemWithTitleAndDesc_user-data-with-title-and-desc__c2iGU h1',
-            '.UserInfoMenuItemWithTitleAndDesc_user-data-with-title-and-desc__c2iGU span',
-            '[class*="user-data-with-title"] h1',
-            '[class*="user-data-with-title"] span',
-            'h1[class*="user"]',
-            '.username',
-            '[data-testid="username"]'
-        ]
-        
-        username = self._safe_extract_text(driver, selectors, "username")
-        return username if username else "Unknown"
-
-    def _extract_total_value(self, driver: webdriver.Chrome) -> Optional[float]:
-        selectors = [
-            '.PortfolioPriceInfo_PT-price-info_price__yirGm',
-            '.PortfolioPriceInfo_PT-price-info_price__xjt40',
-            '[class^="PortfolioPriceInfo_PT-price-info_price__"]',
-            '[class*="PT-price-info_price"]',
-            '[class*="price-info"]',
-            '.portfolio-value',
-            '[data-testid="portfolio-value"]'
-        ]
-
-        value_text = self._safe_extract_text(driver, selectors, "total value")
-        if not value_text:
-            return None
-            
-        try:
-            clean_value = value_text.replace("$", "").replace(",", "").strip()
-            if clean_value.startswith("(") and clean_value.endswith(")"):
-                clean_value = "-" + clean_value[1:-1]
-            return float(clean_value)
-        except ValueError as e:
-            logger.error(f"Failed to parse total value '{value_text}': {e}")
-            return None
-
-    def _extract_percentage_change(self, driver: webdriver.Chrome) -> Optional[float]:
-        selectors = [
-            '.PortfolioProfitInfo_percentText__kOZnu',
-            '.PortfolioProfitInfo_percentText__3NKUK',
-            '[class^="PortfolioProfitInfo_percentText__"]',
-            '[class*="percentText"]',
-            '[class*="percent"]',
-            '.percentage-change',
-            '[data-testid="percentage-change"]'
-        ]
-        
-        percentage_text = self._safe_extract_text(driver, selectors, "percentage change")
-        if not percentage_text:
-            return None
-            
-        try:
-            clean_percentage = percentage_text.replace("%", "").strip()
-            if clean_percentage.startswith("(") and clean_percentage.endswith(")"):
-                clean_percentage = "-" + clean_percentage[1:-1]
-            return float(clean_percentage)
-        except ValueError as e:
-            logger.error(f"Failed to parse percentage change '{percentage_text}': {e}")
-            return None
-    
-    def _extract_money_changed(self, driver: webdriver.Chrome) -> Optional[float]:
-        selectors = [
-            '.PortfolioProfitInfo_PTProfitInfoPrice__POYqf',
-            '.PortfolioProfitInfo_PTProfitInfoPrice__79_kR',
-            '[class^="PortfolioProfitInfo_PTProfitInfoPrice__"]',
-            '[class*="PTProfitInfoPrice"]',
-            '[class*="PortfolioProfitInfo"]',
-            '[data-testid="money-change"]',
-            '.money-change'
-        ]
-        
-        money_text = self._safe_extract_text(driver, selectors, "money changed")
-        if not money_text:
-            return None
-            
+            self._portfolios[portfolio["name"]] = portfolio
+
+        for name, portfolio in self._portfolios.items():
+            job_name = self.job_name(name)
+            if self.scheduler.has_job(job_name):
+                self.scheduler.set_interval(job_name, self.interval_for(portfolio))
+            else:
+                self.scheduler.add_job(job_name, partial(self.update_portfolio, name), self.interval_for(portfolio))
+                logger.info(f"Scheduled portfolio {name} every {self.interval_for(portfolio)}s")
+
+        for job_name in self.scheduler.job_names(self.job_name("")):
+            if job_name[len(self.job_name("")):] not in self._portfolios:
+                self.scheduler.remove_job(job_name)
+                self._leave_round(job_name[len(self.job_name("")):])
+                logger.info(f"Unscheduled removed portfolio job {job_name}")
+
+    async def update_portfolio(self, portfolio_name: str):
+        portfolio = self._portfolios.get(portfolio_name)
+        if portfolio is None:
+            return
+
+        self._join_round(portfolio_name)
         try:
-            clean_money = money_text.replace("$", "").replace(",", "").strip()
-            if clean_money.startswith("(") and clean_money.endswith(")"):
-                clean_money = "-" + clean_money[1:-1]
-            return float(clean_money)
-        except ValueError as e:
-            logger.error(f"Failed to parse money changed '{money_text}': {e}")
-            return None
-
-    def get_portfolio_data_selenium(self, portfolio_url: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
-        for attempt in range(self.max_retries):
-            driver = None
-            try:
-                logger.info(f"Attempt {attempt + 1}/{self.max_retries} for {portfolio_url}")
-                driver = self._setup_chrome_driver()
-                driver.get(portfolio_url)
-                
-                time.sleep(config.PAGE_LOAD_DELAY)
-                
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+            username, total_value, percentage_change, money_changed = await self.fetch_portfolio_data(portfolio["url"])
+
+            if total_value is None:
+                logger.warning(f"Failed to get data for portfolio: {portfolio_name}")
+                self._record_failure(portfolio_name)
+                return
+
+            self._failures.pop(portfolio_name, None)
+            async with self._update_lock:
+                digest = self._digest if config.PORTFOLIO_MESSAGE_MODE == "digest" else None
+                await self.send_portfolio_update(
+                    portfolio, username, total_value, percentage_change, money_changed, digest
                 )
+                self._round_updates += 1
+
+            self.scheduler.set_interval(self.job_name(portfolio_name), self.interval_for(portfolio))
+        finally:
+            self._leave_round(portfolio_name)
+
+    async def fetch_portfolio_data(self, portfolio_url: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
+        if self.coordinator is not None:
+            return await self.coordinator.scrape(portfolio_url)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.get_portfolio_data, portfolio_url)
+
+    def _record_failure(self, portfolio_name: str):
+        failures = self._failures.get(portfolio_name, 0) + 1
+        self._failures[portfolio_name] = failures
+
+        if failures >= self.max_consecutive_failures:
+            logger.critical(f"Too many consecutive failures ({failures}) for {portfolio_name}. Taking longer break.")
+            self.scheduler.delay(self.job_name(portfolio_name), 300)
+            self._failures.pop(portfolio_name)
+
+    def _join_round(self, portfolio_name: str):
+        if self._round_task is None or self._round_task.done() or self._round_done.is_set():
+            # A round is every portfolio job due within the digest window of the first one to start
+            prefix = self.job_name("")
+            due = self.scheduler.jobs_due_within(config.PORTFOLIO_DIGEST_WINDOW, prefix)
+            self._round = {job_name[len(prefix):] for job_name in due}
+            self._round_done.clear()
+            self._round_task = asyncio.create_task(self._finish_round())
+        self._round.add(portfolio_name)
 
-                username = self._extract_username(driver)
-                total_value = self._extract_total_value(driver)
-                percentage_change = self._extract_percentage_change(driver)
-                money_changed = self._extract_money_changed(driver)
-
-                if total_value is not None:
-                    return username, total_value, percentage_change, money_changed
-                else:
-                    logger.warning(f"Failed to get essential data on attempt {attempt + 1}")
-                    
-            except WebDriverException as e:
-                logger.error(f"WebDriver error on attempt {attempt + 1}: {e}")
+    def _leave_round(self, portfolio_name: str):
+        if portfolio_name not in self._round:
+            return
+        self._round.discard(portfolio_name)
+        if not self._round:
+            self._round_done.set()
+
+    async def _finish_round(self):
+        try:
+            await asyncio.wait_for(self._round_done.wait(), config.PORTFOLIO_ROUND_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Portfolio round timed out waiting for: {', '.join(sorted(self._round))}")
+
+        async with self._update_lock:
+            digest, self._digest = self._digest, {}
+            updates, self._round_updates = self._round_updates, 0
+
+            if digest:
+                await self.send_portfolio_digest(digest)
+            await asyncio.to_thread(self.checkpoint_state)
+
+        logger.info(f"Portfolio round finished ({updates} updated)")
+        logger.info(f"Extraction path stats: {self.path_stats()}")
+        logger.info(f"Selector stats: {self.scraper.selector_cache.report()}")
+        logger.info(f"Page readiness stats: {self.readiness_stats()}")
+        if self.scraper.resource_blocker.enabled:
+            logger.info(f"Resource blocking stats: {describe_network_usage(self.scraper.resource_blocker.stats())}")
+        logger.info(f"Telegram outbound stats: {self.telegram_client.stats()}")
+        logger.info(f"Driver pool stats: {self.scraper.driver_pool.stats()}")
+        logger.info(f"Polling intervals: {self.polling_policy.stats()}")
+        if self.coordinator is not None:
+            logger.info(f"Scrape cluster stats: {self.coordinator.stats()}")
+
+    async def shutdown(self):
+        if self._round_task is not None:
+            self._round_task.cancel()
+        if self.coordinator is not None:
+            await self.coordinator.close()
+        await asyncio.to_thread(self.close)
+
+    def close(self):
+        self.checkpoint_state()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.scraper.close()
+
+    async def send_portfolio_update(self, portfolio: dict, username: str, total_value: float,
+                                    percentage_change: Optional[float], money_changed: Optional[float],
+                                    digest: Optional[Dict[str, str]] = None):
+        outgoing = await asyncio.to_thread(
+            self.record_portfolio_update, portfolio, username, total_value, percentage_change, money_changed, digest
+        )
+        for message, chat_ids in outgoing:
+            try:
+                await self.telegram_client.broadcast(message, chat_ids)
             except Exception as e:
-                logger.error(f"Unexpected error on attempt {attempt + 1}: {e}")
-            finally:
-                if driver:
-                    try:
-                        driver.quit()
-                    except Exception as e:
-                        logger.warning(f"Error closing driver: {e}")
-            
-            if attempt < self.max_retries - 1:
-                logger.info(f"Retrying in {self.retry_delay} seconds...")
-                time.sleep(self.retry_delay)
-        
-        logger.error(f"Failed to fetch portfolio data after {self.max_retries} attempts")
-        return None, None, None, None
+                logger.error(f"Failed to send portfolio update: {e}")
 
-    def send_portfolio_update(self, portfolio: dict, username: str, total_value: float, 
-                            percentage_change: Optional[float], money_changed: Optional[float]):
+    def record_portfolio_update(self, portfolio: dict, username: str, total_value: float, 
+                                percentage_change: Optional[float], money_changed: Optional[float],
+                                digest: Optional[Dict[str, str]] = None) -> List[Tuple[str, List[str]]]:
         current_time = datetime.now().strftime('%H:%M')
         portfolio_name = portfolio["name"]
-        portfolio_url = portfolio["url"]
         threshold = portfolio.get("threshold", 0)
 
         previous_value = self.previous_values.get(portfolio_name)
@@ -229,9 +219,13 @@ class PortfolioMonitor:
             difference_text = f" ({'+' if value_difference > 0 else ''}{value_difference:.2f})"
         else:
             difference_text = ""
-            self.total_gain_loss[portfolio_name] = 0
+            self.total_gain_loss.setdefault(
+                portfolio_name, portfolio.get("totalLostOrGainedSinceTheStartOfTheScript", 0)
+            )
 
         self.previous_values[portfolio_name] = total_value
+        self.polling_policy.observe(portfolio_name, total_value)
+        history_store.append(f"portfolio:{portfolio_name}", total_value)
 
         change_emoji = "📈" if (money_changed or 0) > 0 else "📉"
         
@@ -247,100 +241,83 @@ class PortfolioMonitor:
         if money_changed is not None:
             update_message += f"💵 Money Changed: ${money_changed:.2f}\n"
             
-        update_message += (
-            f"📊 Total Gain/Loss: ${self.total_gain_loss[portfolio_name]:.2f}\n\n"
-            f"🕒 Updated at: {current_time}"
-        )
+        update_message += f"📊 Total Gain/Loss: ${self.total_gain_loss[portfolio_name]:.2f}"
 
-        try:
-            self.telegram_client.send_message(update_message)
-            
-            if threshold > 0 and total_value >= threshold:
-                self.send_threshold_alert(username, portfolio_name, total_value, threshold, current_time)
-                
-        except Exception as e:
-            logger.error(f"Failed to send portfolio update: {e}")
-
-    def send_threshold_alert(self, username: str, portfolio_name: str, 
-                           total_value: float, threshold: float, current_time: str):
+        outgoing = []
+        if digest is not None:
+            digest[portfolio_name] = update_message
+        else:
+            outgoing.append((
+                f"{update_message}\n\n🕒 Updated at: {current_time}",
+                subscription_registry.subscribers("portfolios", portfolio_name),
+            ))
+
+        transition = self.threshold_alerts.evaluate(portfolio_name, total_value, threshold)
+        if transition:
+            outgoing.append((
+                self.threshold_alert_message(
+                    username, portfolio_name, total_value, threshold, current_time, escalated=transition == ESCALATED
+                ),
+                subscription_registry.subscribers("thresholds", portfolio_name),
+            ))
+        return outgoing
+
+    def checkpoint_state(self):
+        if self.checkpoint is None:
+            return
+
+        for name, value in self.previous_values.items():
+            self.checkpoint.record("previous_values", name, value)
+        for name, value in self.total_gain_loss.items():
+            self.checkpoint.record("total_gain_loss", name, value)
+        for name, state in self.threshold_alerts.snapshot().items():
+            self.checkpoint.record("threshold_alerts", name, state)
+        self.checkpoint.flush()
+
+    async def send_portfolio_digest(self, updates: Dict[str, str]):
+        if not updates:
+            return
+
+        messages = await asyncio.to_thread(self.render_portfolio_digest, updates)
+        sent = 0
+        for message, chat_ids in messages:
+            sent += await self.telegram_client.broadcast(message, chat_ids)
+
+        logger.info(f"Sent digest of {len(updates)} portfolio updates in {len(messages)} messages ({sent} queued)")
+
+    def render_portfolio_digest(self, updates: Dict[str, str]) -> List[Tuple[str, List[str]]]:
+        current_time = datetime.now().strftime('%H:%M')
+        audiences = subscription_registry.audiences("portfolios")
+        rendered = []
+
+        for selection, chat_ids in audiences.items():
+            names = list(updates) if selection is None else [name for name in selection if name in updates]
+            if not names:
+                continue
+
+            header = f"📊 <b>Portfolio Digest</b> ({len(names)} portfolios, {current_time})"
+            messages = pack_message_blocks([header] + [updates[name] for name in names])
+
+            for index, message in enumerate(messages):
+                if len(messages) > 1:
+                    message = f"{message}\n\n<i>Part {index + 1}/{len(messages)}</i>"
+                rendered.append((message, chat_ids))
+        return rendered
+
+    def threshold_alert_message(self, username: str, portfolio_name: str, total_value: float,
+                                threshold: float, current_time: str, escalated: bool = False) -> str:
+        title = "📈 <b>THRESHOLD ALERT — STILL RISING</b>" if escalated else "🚀 <b>THRESHOLD ALERT</b>"
         alert_message = (
-            f"🚀 <b>THRESHOLD ALERT</b>\n"
+            f"{title}\n"
             f"👤 <b>User:</b> {username}\n"
             f"📊 <b>Portfolio:</b> {portfolio_name}\n\n"
             f"💰 Current Value: ${total_value:.2f}\n"
             f"⚠️ Threshold of ${threshold:.2f} reached!\n"
             f"🕒 Alert time: {current_time}"
         )
-        
-        try:
-            for i in range(3):
-                self.telegram_client.send_message(alert_message)
-                if i < 2:
-                    time.sleep(1)
-        except Exception as e:
-            logger.error(f"Failed to send threshold alert: {e}")
-
-def monitor_portfolios():
-    monitor = PortfolioMonitor()
-    consecutive_failures = 0
-    max_consecutive_failures = 5
-    
+        return alert_message
+
+def schedule_portfolio_updates(scheduler: Scheduler, monitor: PortfolioMonitor):
+    monitor.scheduler = scheduler
+    scheduler.add_job("portfolio-sync", monitor.sync_jobs, config.PORTFOLIO_SYNC_INTERVAL, jitter=0)
     logger.info("Starting portfolio monitoring...")
-    
-    while True:
-        try:
-            portfolios = monitor.data_manager.load_portfolios()
-            
-            if not portfolios:
-                logger.warning("No portfolios found to monitor")
-                time.sleep(60)
-                continue
-            
-            successful_updates = 0
-            
-            for portfolio in portfolios:
-                try:
-                    portfolio_url = portfolio["url"]
-                    portfolio_name = portfolio["name"]
-                    
-                    logger.info(f"Checking portfolio: {portfolio_name}")
-                    
-                    username, total_value, percentage_change, money_changed = monitor.get_portfolio_data_selenium(portfolio_url)
-
-                    if total_value is not None:
-                        monitor.send_portfolio_update(
-                            portfolio, username, total_value, percentage_change, money_changed
-                        )
-                        successful_updates += 1
-                    else:
-                        logger.warning(f"Failed to get data for portfolio: {portfolio_name}")
-
-                except Exception as e:
-                    logger.error(f"Error monitoring portfolio {portfolio.get('name', 'Unknown')}: {e}")
-                
-                time.sleep(2)
-            
-            if successful_updates > 0:
-                consecutive_failures = 0
-            else:
-                consecutive_failures += 1
-                
-            if consecutive_failures >= max_consecutive_failures:
-                logger.critical(f"Too many consecutive failures ({consecutive_failures}). Taking longer break.")
-                time.sleep(300)
-                consecutive_failures = 0
-
-            for remaining in range(config.PORTFOLIO_UPDATE_INTERVAL, 0, -10):
-                minutes, seconds = divmod(remaining, 60)
-                logger.info(f"Next update in: {minutes:02d}:{seconds:02d}")
-                time.sleep(10)
-
-        except KeyboardInterrupt:
-            logger.info("Monitoring stopped by user")
-            break
-        except Exception as e:
-            logger.error(f"Critical error in portfolio monitoring: {e}")
-            time.sleep(60)
-
-if __name__ == "__main__":
-    monitor_portfolios()
@@ -0,0 +1,374 @@
+import time
+import logging
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Tuple, Dict, List
+from urllib.parse import urlparse
+import requests
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+from src.monitoring.coinstats_parser import parse_amount, parse_percentage, parse_portfolio_page
+from src.monitoring.driver_pool import ChromeDriverPool
+from src.monitoring.resource_blocker import ResourceBlocker
+from src.monitoring.selector_cache import SelectorCache
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+USERNAME_SELECTORS = [
+    '.UserInfoMenuItemWithTitleAndDesc_user-data-with-title-and-desc__c2iGU h1',
+    '.UserInfoMenuItemWithTitleAndDesc_user-data-with-title-and-desc__c2iGU span',
+    '[class*="user-data-with-title"] h1',
+    '[class*="user-data-with-title"] span',
+    'h1[class*="user"]',
+    '.username',
+    '[data-testid="username"]'
+]
+
+TOTAL_VALUE_SELECTORS = [
+    '.PortfolioPriceInfo_PT-price-info_price__yirGm',
+    '.PortfolioPriceInfo_PT-price-info_price__xjt40',
+    '[class^="PortfolioPriceInfo_PT-price-info_price__"]',
+    '[class*="PT-price-info_price"]',
+    '[class*="price-info"]',
+    '.portfolio-value',
+    '[data-testid="portfolio-value"]'
+]
+
+PERCENTAGE_CHANGE_SELECTORS = [
+    '.PortfolioProfitInfo_percentText__kOZnu',
+    '.PortfolioProfitInfo_percentText__3NKUK',
+    '[class^="PortfolioProfitInfo_percentText__"]',
+    '[class*="percentText"]',
+    '[class*="percent"]',
+    '.percentage-change',
+    '[data-testid="percentage-change"]'
+]
+
+MONEY_CHANGED_SELECTORS = [
+    '.PortfolioProfitInfo_PTProfitInfoPrice__POYqf',
+    '.PortfolioProfitInfo_PTProfitInfoPrice__79_kR',
+    '[class^="PortfolioProfitInfo_PTProfitInfoPrice__"]',
+    '[class*="PTProfitInfoPrice"]',
+    '[class*="PortfolioProfitInfo"]',
+    '[data-testid="money-change"]',
+    '.money-change'
+]
+
+READY_SELECTORS = [s for s in TOTAL_VALUE_SELECTORS if s != '[class*="price-info"]']
+
+READY_SCRIPT = """
+const [selector, timeoutMs, done] = arguments;
+const ready = () => Array.from(document.querySelectorAll(selector)).some(
+    el => (el.getAttribute('title') || el.textContent || '').trim().length > 0
+);
+if (ready()) { done(true); return; }
+const observer = new MutationObserver(() => {
+    if (ready()) { observer.disconnect(); clearTimeout(timer); done(true); }
+});
+const timer = setTimeout(() => { observer.disconnect(); done(false); }, timeoutMs);
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true, attributes: true});
+"""
+
+class PortfolioScraper:
+    def __init__(self, pool_size: int = None, selector_cache: Optional[SelectorCache] = None):
+        self.max_retries = 3
+        self.retry_delay = 5
+        self.resource_blocker = ResourceBlocker()
+        self.driver_pool = ChromeDriverPool(self._setup_chrome_driver, size=pool_size or config.DRIVER_POOL_SIZE)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        # requests.Session isn't thread-safe, so each scraper thread gets its own
+        self._local = threading.local()
+        self._http_sessions: List[requests.Session] = []
+        self._http_sessions_lock = threading.Lock()
+        self._path_stats = {"fast_path": 0, "fast_path_failed": 0, "selenium": 0, "selenium_failed": 0}
+        self._path_stats_lock = threading.Lock()
+        self.selector_cache = selector_cache or SelectorCache()
+        self._ready_times = deque(maxlen=500)
+        self._ready_timeouts = 0
+        self._ready_lock = threading.Lock()
+
+    def _setup_chrome_driver(self) -> webdriver.Chrome:
+        options = Options()
+        options.add_argument('--headless')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-search-engine-choice-screen')
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument(f'--user-agent={USER_AGENT}')
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        options.page_load_strategy = 'eager'
+        self.resource_blocker.configure_options(options)
+
+        try:
+               chrome_driver_path = os.getenv('CHROME_DRIVER_PATH')
+        
+               if chrome_driver_path and chrome_driver_path.strip() and os.path.exists(chrome_driver_path):
+                   logger.info(f"Using ChromeDriver from environment path: {chrome_driver_path}")
+                   service = Service(chrome_driver_path)
+               else:
+                   logger.info("No ChromeDriver path in environment, using WebDriverManager")
+                   
+                   # Fix for the THIRD_PARTY_NOTICES issue
+                   chrome_install = ChromeDriverManager().install()
+                   folder = os.path.dirname(chrome_install)
+                   chromedriver_path = os.path.join(folder, "chromedriver.exe")
+                   service = Service(chromedriver_path)
+        
+               driver = webdriver.Chrome(service=service, options=options)
+               driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+               driver.set_script_timeout(config.PAGE_READY_TIMEOUT + 5)
+               self.resource_blocker.apply(driver)
+               return driver
+        except Exception as e:
+           logger.error(f"Failed to setup Chrome driver: {e}")
+           raise WebDriverException(f"Chrome driver setup failed: {e}")
+
+    def _safe_extract_text(self, driver: webdriver.Chrome, selectors: List[str], 
+                          element_name: str, timeout: int = None) -> Optional[str]:
+        timeout = timeout or config.SELENIUM_TIMEOUT
+        ordered = self.selector_cache.order(element_name, selectors)
+
+        def first_match(current_driver):
+            for selector in ordered:
+                elements = current_driver.find_elements(By.CSS_SELECTOR, selector)
+                if not elements:
+                    continue
+
+                text = elements[0].get_attribute("title") or elements[0].text.strip()
+                if text:
+                    return selector, text
+            return False
+
+        started = time.monotonic()
+        try:
+            selector, text = WebDriverWait(
+                driver, timeout, ignored_exceptions=(StaleElementReferenceException,)
+            ).until(first_match)
+        except TimeoutException:
+            self.selector_cache.record(element_name, None, time.monotonic() - started)
+            logger.error(f"Failed to extract {element_name} with any selector")
+            return None
+        except Exception as e:
+            self.selector_cache.record(element_name, None, time.monotonic() - started)
+            logger.warning(f"Unexpected error extracting {element_name}: {e}")
+            return None
+
+        self.selector_cache.record(element_name, selector, time.monotonic() - started)
+        logger.info(f"Successfully extracted {element_name} via {selector}: {text}")
+        return text
+
+    def _wait_until_ready(self, driver: webdriver.Chrome, portfolio_url: str) -> bool:
+        started = time.monotonic()
+        try:
+            ready = driver.execute_async_script(
+                READY_SCRIPT, ", ".join(READY_SELECTORS), config.PAGE_READY_TIMEOUT * 1000
+            )
+        except TimeoutException:
+            ready = False
+
+        elapsed = time.monotonic() - started
+        with self._ready_lock:
+            self._ready_times.append(elapsed)
+            if not ready:
+                self._ready_timeouts += 1
+
+        if ready:
+            logger.info(f"Page ready in {elapsed:.2f}s: {portfolio_url}")
+        else:
+            logger.warning(f"Page not ready after {elapsed:.2f}s, extracting anyway: {portfolio_url}")
+        return ready
+
+    def readiness_stats(self) -> Dict[str, float]:
+        with self._ready_lock:
+            samples = sorted(self._ready_times)
+            timeouts = self._ready_timeouts
+
+        if not samples:
+            return {"pages": 0, "timeouts": timeouts}
+
+        def percentile(fraction):
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+        return {
+            "pages": len(samples),
+            "timeouts": timeouts,
+            "p50_seconds": round(percentile(0.5), 2),
+            "p90_seconds": round(percentile(0.9), 2),
+            "max_seconds": round(samples[-1], 2),
+        }
+
+    def _extract_username(self, driver: webdriver.Chrome) -> str:
+        username = self._safe_extract_text(driver, USERNAME_SELECTORS, "username")
+        return username if username else "Unknown"
+
+    def _extract_total_value(self, driver: webdriver.Chrome) -> Optional[float]:
+        value_text = self._safe_extract_text(driver, TOTAL_VALUE_SELECTORS, "total value")
+        if not value_text:
+            return None
+            
+        try:
+            return parse_amount(value_text)
+        except ValueError as e:
+            logger.error(f"Failed to parse total value '{value_text}': {e}")
+            return None
+
+    def _extract_percentage_change(self, driver: webdriver.Chrome) -> Optional[float]:
+        percentage_text = self._safe_extract_text(driver, PERCENTAGE_CHANGE_SELECTORS, "percentage change")
+        if not percentage_text:
+            return None
+            
+        try:
+            return parse_percentage(percentage_text)
+        except ValueError as e:
+            logger.error(f"Failed to parse percentage change '{percentage_text}': {e}")
+            return None
+    
+    def _extract_money_changed(self, driver: webdriver.Chrome) -> Optional[float]:
+        money_text = self._safe_extract_text(driver, MONEY_CHANGED_SELECTORS, "money changed")
+        if not money_text:
+            return None
+            
+        try:
+            return parse_amount(money_text)
+        except ValueError as e:
+            logger.error(f"Failed to parse money changed '{money_text}': {e}")
+            return None
+
+    def get_portfolio_data(self, portfolio_url: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
+        if config.PORTFOLIO_FAST_PATH:
+            result = self.get_portfolio_data_http(portfolio_url)
+            if result[1] is not None:
+                self._count_path("fast_path")
+                return result
+
+            self._count_path("fast_path_failed")
+            logger.info(f"Fast path failed for {portfolio_url}, falling back to Selenium")
+
+        result = self.get_portfolio_data_selenium(portfolio_url)
+        self._count_path("selenium" if result[1] is not None else "selenium_failed")
+        return result
+
+    def get_portfolio_data_http(self, portfolio_url: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
+        try:
+            with self._host_slot(portfolio_url):
+                response = self._http_session().get(portfolio_url, timeout=config.HTTP_TIMEOUT)
+            response.raise_for_status()
+            return parse_portfolio_page(response.text)
+        except requests.RequestException as e:
+            logger.warning(f"Failed to fetch portfolio page {portfolio_url}: {e}")
+        except Exception as e:
+            logger.warning(f"Failed to parse portfolio page {portfolio_url}: {e}")
+        return None, None, None, None
+
+    def path_stats(self) -> Dict[str, int]:
+        with self._path_stats_lock:
+            return dict(self._path_stats)
+
+    def _count_path(self, key: str):
+        with self._path_stats_lock:
+            self._path_stats[key] += 1
+
+    def take_stats(self) -> dict:
+        with self._path_stats_lock:
+            paths = dict(self._path_stats)
+            self._path_stats = dict.fromkeys(paths, 0)
+        with self._ready_lock:
+            ready_times, timeouts = list(self._ready_times), self._ready_timeouts
+            self._ready_times.clear()
+            self._ready_timeouts = 0
+
+        return {
+            "paths": paths,
+            "ready_times": ready_times,
+            "ready_timeouts": timeouts,
+            "selectors": self.selector_cache.take_stats(),
+            "network": self.resource_blocker.take_stats(),
+        }
+
+    def merge_stats(self, stats: dict):
+        with self._path_stats_lock:
+            for key, value in stats.get("paths", {}).items():
+                self._path_stats[key] = self._path_stats.get(key, 0) + value
+        with self._ready_lock:
+            self._ready_times.extend(stats.get("ready_times", []))
+            self._ready_timeouts += stats.get("ready_timeouts", 0)
+
+        self.selector_cache.merge_stats(stats.get("selectors", {}))
+        self.resource_blocker.merge_stats(stats.get("network", {}))
+
+    def get_portfolio_data_selenium(self, portfolio_url: str) -> Tuple[Optional[str], Optional[float], Optional[float], Optional[float]]:
+        for attempt in range(self.max_retries):
+            try:
+                logger.info(f"Attempt {attempt + 1}/{self.max_retries} for {portfolio_url}")
+
+                with self._host_slot(portfolio_url), self.driver_pool.session() as pooled:
+                    driver = pooled.driver
+                    with self.resource_blocker.track_page(driver, portfolio_url):
+                        pooled.get(portfolio_url)
+
+                        self._wait_until_ready(driver, portfolio_url)
+
+                        username = self._extract_username(driver)
+                        total_value = self._extract_total_value(driver)
+                        percentage_change = self._extract_percentage_change(driver)
+                        money_changed = self._extract_money_changed(driver)
+
+                if total_value is not None:
+                    return username, total_value, percentage_change, money_changed
+                else:
+                    logger.warning(f"Failed to get essential data on attempt {attempt + 1}")
+                    
+            except WebDriverException as e:
+                logger.error(f"WebDriver error on attempt {attempt + 1}: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error on attempt {attempt + 1}: {e}")
+            
+            if attempt < self.max_retries - 1:
+                logger.info(f"Retrying in {self.retry_delay} seconds...")
+                time.sleep(self.retry_delay)
+        
+        logger.error(f"Failed to fetch portfolio data after {self.max_retries} attempts")
+        return None, None, None, None
+
+    def _http_session(self) -> requests.Session:
+        session = getattr(self._local, "http_session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": USER_AGENT})
+            self._local.http_session = session
+            with self._http_sessions_lock:
+                self._http_sessions.append(session)
+        return session
+
+    @contextmanager
+    def _host_slot(self, url: str):
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(max(1, config.PORTFOLIO_MAX_PER_HOST))
+                self._host_slots[host] = slot
+
+        with slot:
+            yield
+
+    def close(self):
+        self.driver_pool.close()
+        with self._http_sessions_lock:
+            sessions, self._http_sessions = self._http_sessions, []
+        for session in sessions:
+            session.close()
@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from src.monitoring.market_snapshot import MarketSnapshot
+
+ALERT_KINDS = ("above", "below", "move")
+
+def alert_bounds(alert: dict) -> List[Tuple[str, float]]:
+    kind, target = alert["kind"], float(alert["target"])
+    if kind == "above":
+        return [("above", target)]
+    if kind == "below":
+        return [("below", target)]
+    if kind == "move":
+        reference = float(alert["reference"])
+        return [("above", reference * (1 + target / 100)), ("below", reference * (1 - target / 100))]
+    raise ValueError(f"Unknown alert kind: {kind}")
+
+def describe_alert(alert: dict) -> str:
+    price_format = ".4f" if float(alert.get("reference") or alert["target"]) < 1 else ".2f"
+    if alert["kind"] == "move":
+        return f"{alert['symbol']} moves ±{alert['target']:g}% from ${alert['reference']:{price_format}}"
+    return f"{alert['symbol']} {alert['kind']} ${alert['target']:{price_format}}"
+
+class _SymbolBook:
+    def __init__(self):
+        self.levels = {"above": [], "below": []}
+        self.ids = {"above": [], "below": []}
+
+    def insert(self, side: str, level: float, alert_id: int):
+        index = bisect_right(self.levels[side], level)
+        self.levels[side].insert(index, level)
+        self.ids[side].insert(index, alert_id)
+
+    def discard(self, side: str, level: float, alert_id: int):
+        levels, ids = self.levels[side], self.ids[side]
+        index = bisect_left(levels, level)
+        while index < len(levels) and levels[index] == level:
+            if ids[index] == alert_id:
+                del levels[index]
+                del ids[index]
+                return
+            index += 1
+
+    def crossed(self, price: float) -> List[int]:
+        above_end = bisect_right(self.levels["above"], price)
+        below_start = bisect_left(self.levels["below"], price)
+        return self.ids["above"][:above_end] + self.ids["below"][below_start:]
+
+    def __len__(self) -> int:
+        return len(self.ids["above"]) + len(self.ids["below"])
+
+class PriceAlertEngine:
+    def __init__(self):
+        self._alerts: Dict[int, dict] = {}
+        self._books: Dict[str, _SymbolBook] = {}
+        self._lock = threading.Lock()
+
+    def load(self, alerts: List[dict]):
+        with self._lock:
+            self._alerts.clear()
+            self._books.clear()
+            for alert in alerts:
+                self._index(alert)
+
+    def add(self, alert: dict):
+        with self._lock:
+            self._index(alert)
+
+    def remove(self, alert_id: int) -> Optional[dict]:
+        with self._lock:
+            return self._unindex(alert_id)
+
+    def get(self, alert_id: int) -> Optional[dict]:
+        return self._alerts.get(alert_id)
+
+    def alerts_for_chat(self, chat_id: str) -> List[dict]:
+        with self._lock:
+            return [dict(alert) for alert in self._alerts.values() if str(alert["chat_id"]) == str(chat_id)]
+
+    def evaluate(self, snapshot: MarketSnapshot) -> List[Tuple[dict, float]]:
+        triggered = []
+        with self._lock:
+            for symbol in list(self._books):
+                price = snapshot.price(symbol)
+                if price is None:
+                    continue
+                for alert_id in dict.fromkeys(self._books[symbol].crossed(price)):
+                    alert = self._unindex(alert_id)
+                    if alert is not None:
+                        triggered.append((alert, price))
+        return triggered
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"alerts": len(self._alerts), "symbols": len(self._books)}
+
+    def _index(self, alert: dict):
+        # Re-adding an id must replace its old levels, or they would later fire the new alert
+        self._unindex(alert["id"])
+        book = self._books.get(alert["symbol"])
+        if book is None:
+            book = self._books[alert["symbol"]] = _SymbolBook()
+        for side, level in alert_bounds(alert):
+            book.insert(side, level, alert["id"])
+        self._alerts[alert["id"]] = dict(alert)
+
+    def _unindex(self, alert_id: int) -> Optional[dict]:
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+
+        book = self._books[alert["symbol"]]
+        for side, level in alert_bounds(alert):
+            book.discard(side, level, alert_id)
+        if not len(book):
+            del self._books[alert["symbol"]]
+        return alert
+
+price_alert_engine = PriceAlertEngine()
@@ -0,0 +1,123 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+# Rough transfer sizes used to estimate what a blocked request would have cost. Chrome never fetches a
+# blocked request, so its real size is unknown and "estimated_bytes_saved" is never a measurement.
+ESTIMATED_BYTES_BY_TYPE = {
+    "Image": 40_000,
+    "Font": 45_000,
+    "Script": 60_000,
+    "Media": 250_000,
+    "Stylesheet": 20_000,
+    "XHR": 5_000,
+    "Fetch": 5_000,
+    "Other": 10_000,
+}
+
+class ResourceBlocker:
+    def __init__(self, patterns: List[str] = None, enabled: bool = None):
+        self.patterns = patterns if patterns is not None else config.BLOCKED_URL_PATTERNS
+        self.enabled = config.BLOCK_RESOURCES if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._totals = {
+            "pages": 0,
+            "blocked_requests": 0,
+            "loaded_requests": 0,
+            "loaded_bytes": 0,
+            "estimated_bytes_saved": 0,
+        }
+
+    def configure_options(self, options: Options):
+        if not self.enabled:
+            return
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    def apply(self, driver: webdriver.Chrome):
+        if not self.enabled:
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        self._drain(driver)
+        logger.info(f"Blocking {len(self.patterns)} URL patterns in Chrome session")
+
+    @contextmanager
+    def track_page(self, driver: webdriver.Chrome, url: str):
+        try:
+            yield
+        finally:
+            # Drain even when navigation fails, otherwise this page's requests are billed to the next one
+            page_stats = self.collect_page_stats(driver)
+            if page_stats:
+                logger.info(f"Network usage for {url}: {describe_network_usage(page_stats)}")
+
+    def collect_page_stats(self, driver: webdriver.Chrome) -> Dict[str, int]:
+        if not self.enabled:
+            return {}
+
+        resource_types: Dict[str, str] = {}
+        page = {"blocked_requests": 0, "loaded_requests": 0, "loaded_bytes": 0, "estimated_bytes_saved": 0}
+
+        for entry in self._drain(driver):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                resource_types[params.get("requestId")] = params.get("type", "Other")
+            elif method == "Network.loadingFinished":
+                page["loaded_requests"] += 1
+                page["loaded_bytes"] += int(params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                resource_type = params.get("type") or resource_types.get(params.get("requestId"), "Other")
+                page["blocked_requests"] += 1
+                page["estimated_bytes_saved"] += ESTIMATED_BYTES_BY_TYPE.get(
+                    resource_type, ESTIMATED_BYTES_BY_TYPE["Other"]
+                )
+
+        with self._lock:
+            self._totals["pages"] += 1
+            for key, value in page.items():
+                self._totals[key] += value
+
+        return page
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._totals)
+
+    def take_stats(self) -> Dict[str, int]:
+        with self._lock:
+            totals = dict(self._totals)
+            self._totals = dict.fromkeys(totals, 0)
+        return totals
+
+    def merge_stats(self, stats: Dict[str, int]):
+        with self._lock:
+            for key, value in stats.items():
+                self._totals[key] = self._totals.get(key, 0) + value
+
+    def _drain(self, driver: webdriver.Chrome) -> list:
+        try:
+            return driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"Failed to read Chrome performance log: {e}")
+            return []
+
+def describe_network_usage(stats: Dict[str, int]) -> str:
+    pages = f"{stats['pages']} pages, " if "pages" in stats else ""
+    return (
+        f"{pages}{stats['loaded_requests']} requests loaded ({stats['loaded_bytes']:,} bytes measured), "
+        f"{stats['blocked_requests']} blocked (~{stats['estimated_bytes_saved']:,} bytes saved, estimated)"
+    )
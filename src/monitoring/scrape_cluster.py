@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import secrets
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing.managers import BaseManager
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+FAILED_RESULT = (None, None, None, None)
+
+class ScrapeBroker:
+    def __init__(self, lease_seconds: float = None, max_attempts: int = None):
+        self.lease_seconds = lease_seconds or config.SCRAPE_LEASE_SECONDS
+        self.max_attempts = max_attempts or config.SCRAPE_MAX_ATTEMPTS
+        self._condition = threading.Condition()
+        self._queue: Deque[str] = deque()
+        self._jobs: Dict[str, dict] = {}
+        self._results: Deque[Tuple[str, tuple, Optional[dict]]] = deque()
+        self._workers: Dict[str, float] = {}
+        self._stats = {"submitted": 0, "completed": 0, "redispatched": 0, "abandoned": 0, "stale_results": 0}
+
+    def submit(self, job_id: str, url: str):
+        with self._condition:
+            self._jobs[job_id] = {"url": url, "attempts": 0, "worker": None, "expires_at": None}
+            self._queue.append(job_id)
+            self._stats["submitted"] += 1
+            self._condition.notify_all()
+
+    def cancel(self, job_id: str):
+        with self._condition:
+            self._jobs.pop(job_id, None)
+
+    def lease(self, worker_id: str, timeout: float) -> Optional[Tuple[str, str]]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._workers[worker_id] = now
+                self._expire_leases(now)
+
+                while self._queue:
+                    job_id = self._queue.popleft()
+                    job = self._jobs.get(job_id)
+                    if job is None:
+                        continue
+                    job.update(attempts=job["attempts"] + 1, worker=worker_id, expires_at=now + self.lease_seconds)
+                    return job_id, job["url"]
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                self._condition.wait(min(remaining, self.lease_seconds))
+
+    def heartbeat(self, worker_id: str, job_id: str) -> bool:
+        with self._condition:
+            now = time.monotonic()
+            self._workers[worker_id] = now
+            job = self._jobs.get(job_id)
+            if job is None or job["worker"] != worker_id:
+                return False
+            job["expires_at"] = now + self.lease_seconds
+            return True
+
+    def complete(self, worker_id: str, job_id: str, result: tuple, stats: dict = None) -> bool:
+        with self._condition:
+            self._workers[worker_id] = time.monotonic()
+            job = self._jobs.get(job_id)
+            if job is None or job["worker"] != worker_id:
+                self._stats["stale_results"] += 1
+                return False
+
+            del self._jobs[job_id]
+            self._results.append((job_id, tuple(result), stats))
+            self._stats["completed"] += 1
+            self._condition.notify_all()
+            return True
+
+    def collect(self, timeout: float) -> List[Tuple[str, tuple, Optional[dict]]]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not self._results:
+                now = time.monotonic()
+                self._expire_leases(now)
+                if self._results or now >= deadline:
+                    break
+                self._condition.wait(deadline - now)
+
+            results = list(self._results)
+            self._results.clear()
+            return results
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            now = time.monotonic()
+            stats = dict(self._stats)
+            stats["queued"] = len(self._queue)
+            stats["leased"] = sum(1 for job in self._jobs.values() if job["worker"] is not None)
+            stats["workers"] = sum(1 for seen in self._workers.values() if now - seen < self.lease_seconds)
+            return stats
+
+    def _expire_leases(self, now: float):
+        for job_id, job in list(self._jobs.items()):
+            if job["worker"] is None or job["expires_at"] > now:
+                continue
+
+            if job["attempts"] >= self.max_attempts:
+                logger.error(f"Scrape of {job['url']} abandoned after {job['attempts']} expired leases")
+                del self._jobs[job_id]
+                self._results.append((job_id, FAILED_RESULT, None))
+                self._stats["abandoned"] += 1
+            else:
+                logger.warning(f"Lease on {job['url']} held by {job['worker']} expired, re-dispatching")
+                job.update(worker=None, expires_at=None)
+                self._queue.appendleft(job_id)
+                self._stats["redispatched"] += 1
+            self._condition.notify_all()
+
+class BrokerClient(BaseManager):
+    pass
+
+BrokerClient.register("broker")
+
+class ScrapeCoordinator:
+    def __init__(self, host: str = None, port: int = None, authkey: str = None, local_workers: int = None):
+        self.address = (host or config.SCRAPE_BROKER_HOST, config.SCRAPE_BROKER_PORT if port is None else port)
+        self.authkey = (authkey or config.SCRAPE_BROKER_AUTHKEY or secrets.token_hex(16)).encode()
+        self.local_workers = config.SCRAPE_WORKERS if local_workers is None else local_workers
+        self.broker = ScrapeBroker()
+        self._server = None
+        self._workers: List[multiprocessing.Process] = []
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self._collector: Optional[threading.Thread] = None
+        self.on_stats: Optional[Callable[[dict], None]] = None
+        self._context = multiprocessing.get_context("spawn")
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await asyncio.to_thread(self._start)
+
+    def _start(self):
+        server_class = type("ScrapeBrokerServer", (BaseManager,), {})
+        server_class.register("broker", callable=lambda: self.broker)
+        self._server = server_class(address=self.address, authkey=self.authkey).get_server()
+        self.address = self._server.address
+        threading.Thread(target=self._server.serve_forever, name="scrape-broker", daemon=True).start()
+
+        self._running = True
+        for index in range(self.local_workers):
+            self._workers.append(self._spawn_worker(index))
+
+        self._collector = threading.Thread(target=self._collect_loop, name="scrape-collector", daemon=True)
+        self._collector.start()
+        logger.info(f"Scrape broker listening on {self.address[0]}:{self.address[1]} with {self.local_workers} local workers")
+
+    async def scrape(self, url: str) -> tuple:
+        job_id = uuid.uuid4().hex
+        future = self._loop.create_future()
+        self._waiters[job_id] = future
+        self.broker.submit(job_id, url)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self.broker.cancel(job_id)
+            raise
+        finally:
+            self._waiters.pop(job_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.broker.stats()
+        stats["local_workers_alive"] = sum(1 for worker in self._workers if worker.is_alive())
+        return stats
+
+    async def close(self):
+        await asyncio.to_thread(self._close)
+
+    def _close(self):
+        self._running = False
+        for worker in self._workers:
+            worker.terminate()
+        for worker in self._workers:
+            worker.join(10)
+        if self._collector is not None:
+            self._collector.join(5)
+        if self._server is not None:
+            self._server.stop_event.set()
+            self._server.listener.close()
+
+    def _spawn_worker(self, index: int) -> multiprocessing.Process:
+        worker = self._context.Process(
+            target=run_worker,
+            args=(self.address, self.authkey, f"{socket.gethostname()}:local-{index}"),
+            name=f"scrape-worker-{index}",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _collect_loop(self):
+        while self._running:
+            for job_id, result, stats in self.broker.collect(timeout=1.0):
+                if stats and self.on_stats is not None:
+                    self.on_stats(stats)
+                self._loop.call_soon_threadsafe(self._resolve, job_id, result)
+
+            for index, worker in enumerate(self._workers):
+                if self._running and not worker.is_alive():
+                    logger.warning(f"Scrape worker {worker.name} exited with code {worker.exitcode}, restarting")
+                    self._workers[index] = self._spawn_worker(index)
+
+    def _resolve(self, job_id: str, result: tuple):
+        future = self._waiters.get(job_id)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+def run_worker(address: Tuple[str, int], authkey: bytes, worker_id: str = None):
+    from src.monitoring.portfolio_scraper import PortfolioScraper
+
+    # Spawned workers start with a fresh interpreter, so nothing has configured logging yet
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    client = BrokerClient(address=tuple(address), authkey=authkey)
+    client.connect()
+    broker = client.broker()
+    # Workers only scrape, so they skip the Telegram client and executor and keep a single browser
+    scraper = PortfolioScraper(pool_size=1)
+    logger.info(f"Scrape worker {worker_id} connected to broker at {address[0]}:{address[1]}")
+
+    try:
+        while True:
+            job = broker.lease(worker_id, 5.0)
+            if job is None:
+                continue
+
+            job_id, url = job
+            finished = threading.Event()
+            heartbeat = threading.Thread(target=_heartbeat, args=(broker, worker_id, job_id, finished), daemon=True)
+            heartbeat.start()
+
+            try:
+                result = scraper.get_portfolio_data(url)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to scrape {url}: {e}")
+                result = FAILED_RESULT
+            finally:
+                finished.set()
+                heartbeat.join()
+
+            broker.complete(worker_id, job_id, result, scraper.take_stats())
+    except (EOFError, ConnectionError) as e:
+        logger.warning(f"Scrape worker {worker_id} lost the broker connection: {e}")
+    finally:
+        scraper.close()
+
+def _heartbeat(broker, worker_id: str, job_id: str, finished: threading.Event):
+    interval = config.SCRAPE_LEASE_SECONDS / 3
+    while not finished.wait(interval):
+        try:
+            if not broker.heartbeat(worker_id, job_id):
+                return
+        except (EOFError, ConnectionError):
+            return
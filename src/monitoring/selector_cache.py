@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class SelectorCache:
+    def __init__(self, path: str = None):
+        self.path = path or config.SELECTOR_CACHE_FILE
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._version = 0
+        self._saved_version = 0
+        self._preferred: Dict[str, str] = self._load()
+        self._field_stats: Dict[str, Dict[str, float]] = {}
+        self._selector_stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def order(self, field: str, selectors: List[str]) -> List[str]:
+        with self._lock:
+            preferred = self._preferred.get(field)
+
+        if preferred in selectors:
+            return [preferred] + [s for s in selectors if s != preferred]
+        return list(selectors)
+
+    def record(self, field: str, selector: Optional[str], elapsed: float):
+        with self._lock:
+            field_stats = self._field_stats.setdefault(field, {"lookups": 0, "misses": 0, "seconds": 0.0})
+            field_stats["lookups"] += 1
+            field_stats["seconds"] += elapsed
+
+            if selector is None:
+                field_stats["misses"] += 1
+                return
+
+            selector_stats = self._selector_stats.setdefault(field, {}).setdefault(
+                selector, {"hits": 0, "seconds": 0.0}
+            )
+            selector_stats["hits"] += 1
+            selector_stats["seconds"] += elapsed
+
+            changed = self._preferred.get(field) != selector
+            self._preferred[field] = selector
+            if changed:
+                self._version += 1
+            snapshot = (self._version, dict(self._preferred)) if changed else None
+
+        if snapshot is not None:
+            logger.info(f"Preferred {field} selector is now: {selector}")
+            self._save(*snapshot)
+
+    def report(self) -> Dict[str, dict]:
+        with self._lock:
+            report = {}
+            for field, field_stats in self._field_stats.items():
+                lookups = field_stats["lookups"] or 1
+                report[field] = {
+                    "lookups": field_stats["lookups"],
+                    "miss_rate": field_stats["misses"] / lookups,
+                    "avg_seconds": field_stats["seconds"] / lookups,
+                    "selectors": {
+                        selector: {
+                            "hit_rate": stats["hits"] / lookups,
+                            "avg_seconds": stats["seconds"] / stats["hits"],
+                        }
+                        for selector, stats in self._selector_stats.get(field, {}).items()
+                    },
+                }
+            return report
+
+    def take_stats(self) -> dict:
+        with self._lock:
+            stats = {"fields": self._field_stats, "selectors": self._selector_stats}
+            self._field_stats, self._selector_stats = {}, {}
+        return stats
+
+    def merge_stats(self, stats: dict):
+        with self._lock:
+            for field, field_stats in stats.get("fields", {}).items():
+                totals = self._field_stats.setdefault(field, {"lookups": 0, "misses": 0, "seconds": 0.0})
+                for key, value in field_stats.items():
+                    totals[key] += value
+
+            for field, selectors in stats.get("selectors", {}).items():
+                for selector, selector_stats in selectors.items():
+                    totals = self._selector_stats.setdefault(field, {}).setdefault(
+                        selector, {"hits": 0, "seconds": 0.0}
+                    )
+                    for key, value in selector_stats.items():
+                        totals[key] += value
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, version: int, preferred: Dict[str, str]):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Scrape workers in other processes save the same file, so each needs its own temp file
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with self._save_lock:
+                # A slower thread holding an older snapshot must not overwrite a newer preference
+                if version <= self._saved_version:
+                    return
+                with open(temp_path, "w") as f:
+                    json.dump(preferred, f, indent=4)
+                os.replace(temp_path, self.path)
+                self._saved_version = version
+        except OSError as e:
+            logger.warning(f"Failed to persist selector cache: {e}")
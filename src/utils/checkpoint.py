@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class StateCheckpoint:
+    def __init__(self, name: str, directory: str = None, compact_every: int = None):
+        directory = directory or config.CHECKPOINT_DIR
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot.json")
+        self.journal_path = os.path.join(directory, f"{name}.journal")
+        self.compact_every = compact_every or config.CHECKPOINT_COMPACT_EVERY
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._journal_entries = 0
+
+    def restore(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._state = self._read_snapshot()
+
+            try:
+                with open(self.journal_path, "r") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning(f"Skipping torn checkpoint journal line in {self.journal_path}")
+                            continue
+                        self._apply(entry)
+                        self._journal_entries += 1
+            except FileNotFoundError:
+                pass
+
+            restored = {namespace: dict(values) for namespace, values in self._state.items()}
+
+        if restored:
+            logger.info(f"Restored checkpoint {self.snapshot_path} ({self._journal_entries} journal entries)")
+        return restored
+
+    def record(self, namespace: str, key: str, value: Any):
+        with self._lock:
+            if self._state.get(namespace, {}).get(key, _MISSING) == value:
+                return
+            self._state.setdefault(namespace, {})[key] = value
+            self._dirty.setdefault(namespace, {})[key] = value
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+
+            try:
+                os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+                with open(self.journal_path, "a") as f:
+                    for namespace, values in dirty.items():
+                        f.write(json.dumps({"ns": namespace, "values": values}) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_entries += len(dirty)
+            except (OSError, TypeError) as e:
+                logger.error(f"Failed to write checkpoint journal: {e}")
+                for namespace, values in dirty.items():
+                    self._dirty.setdefault(namespace, {}).update(values)
+                return
+
+            if self._journal_entries >= self.compact_every:
+                self._compact()
+
+    def _compact(self):
+        try:
+            temp_path = f"{self.snapshot_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self._state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            open(self.journal_path, "w").close()
+            self._journal_entries = 0
+            logger.info(f"Compacted checkpoint into {self.snapshot_path}")
+        except (OSError, TypeError) as e:
+            logger.error(f"Failed to compact checkpoint: {e}")
+
+    def _apply(self, entry: dict):
+        namespace = entry.get("ns")
+        values = entry.get("values")
+        if isinstance(namespace, str) and isinstance(values, dict):
+            self._state.setdefault(namespace, {}).update(values)
+
+    def _read_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.snapshot_path, "r") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
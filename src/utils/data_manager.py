@@ -1,37 +1,98 @@
-import json
 import os
-from typing import List, Dict, Any
-from config.settings import config
+import threading
+from typing import List, Dict, Any, Optional
+from src.utils.storage import StorageBackend, create_storage
 
 class DataManager:
+    _backend: Optional[StorageBackend] = None
+    _backend_lock = threading.Lock()
+
     @staticmethod
     def ensure_data_directory():
         os.makedirs("data", exist_ok=True)
-    
+
+    @staticmethod
+    def backend() -> StorageBackend:
+        if DataManager._backend is None:
+            with DataManager._backend_lock:
+                if DataManager._backend is None:
+                    DataManager.ensure_data_directory()
+                    DataManager._backend = create_storage()
+        return DataManager._backend
+
     @staticmethod
     def load_portfolios() -> List[Dict[str, Any]]:
-        DataManager.ensure_data_directory()
-        try:
-            with open(config.PORTFOLIOS_FILE, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
+        return DataManager.backend().load_portfolios()
+
     @staticmethod
     def load_tickers() -> List[str]:
-        DataManager.ensure_data_directory()
-        try:
-            with open(config.TICKERS_FILE, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
+        return DataManager.backend().load_tickers()
+
+    @staticmethod
+    def get_portfolio(name: str) -> Optional[Dict[str, Any]]:
+        return DataManager.backend().get_portfolio(name)
+
+    @staticmethod
+    def has_ticker(ticker: str) -> bool:
+        return DataManager.backend().has_ticker(ticker)
+
+    @staticmethod
+    def add_portfolio(portfolio: Dict[str, Any]):
+        DataManager.backend().upsert_portfolio(portfolio)
+
+    @staticmethod
+    def remove_portfolio(name: str) -> bool:
+        return DataManager.backend().delete_portfolio(name)
+
+    @staticmethod
+    def add_ticker(ticker: str) -> bool:
+        return DataManager.backend().add_ticker(ticker)
+
+    @staticmethod
+    def remove_ticker(ticker: str) -> bool:
+        return DataManager.backend().remove_ticker(ticker)
+
+    @staticmethod
+    def load_alerts() -> List[Dict[str, Any]]:
+        return DataManager.backend().load_alerts()
+
+    @staticmethod
+    def add_alert(alert: Dict[str, Any]) -> int:
+        return DataManager.backend().add_alert(alert)
+
+    @staticmethod
+    def remove_alert(alert_id: int) -> bool:
+        return DataManager.backend().remove_alert(alert_id)
+
+    @staticmethod
+    def load_subscriptions() -> List[Dict[str, Any]]:
+        return DataManager.backend().load_subscriptions()
+
+    @staticmethod
+    def save_subscription(subscription: Dict[str, Any]):
+        DataManager.backend().save_subscription(subscription)
+
+    @staticmethod
+    def delete_subscription(chat_id: str) -> bool:
+        return DataManager.backend().delete_subscription(chat_id)
+
+    @staticmethod
+    def get_state(key: str, default: Any = None) -> Any:
+        return DataManager.backend().get_state(key, default)
+
+    @staticmethod
+    def set_state(key: str, value: Any):
+        DataManager.backend().set_state(key, value)
+
+    @staticmethod
+    def save_portfolios(portfolios: List[Dict]):
+        DataManager.backend().save_portfolios(portfolios)
+
+    @staticmethod
+    def save_tickers(tickers: List[str]):
+        DataManager.backend().save_tickers(tickers)
+
     @staticmethod
     def save_data(portfolios: List[Dict], tickers: List[str]):
-        DataManager.ensure_data_directory()
-        
-        with open(config.PORTFOLIOS_FILE, "w") as f:
-            json.dump(portfolios, f, indent=4)
-        
-        with open(config.TICKERS_FILE, "w") as f:
-            json.dump(tickers, f, indent=4)
+        DataManager.save_portfolios(portfolios)
+        DataManager.save_tickers(tickers)
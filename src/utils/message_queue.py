@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+import httpx
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def ready_in(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    async def acquire(self):
+        while True:
+            wait = self.ready_in(time.monotonic())
+            if wait <= 0:
+                self.consume(time.monotonic())
+                return
+            await asyncio.sleep(wait)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+class OutboundMessage:
+    def __init__(self, chat_id: str, payload: dict):
+        self.chat_id = chat_id
+        self.payload = payload
+        self.enqueued_at = time.monotonic()
+        self.not_before = 0.0
+        self.attempts = 0
+
+class _ChatState:
+    def __init__(self, chat_id: str):
+        is_group = str(chat_id).startswith("-")
+        rate = config.TELEGRAM_GROUP_RATE if is_group else config.TELEGRAM_CHAT_RATE
+        self.bucket = TokenBucket(rate, capacity=1)
+        self.blocked_until = 0.0
+        self.sending = False
+        self.pending: Deque[OutboundMessage] = deque()
+
+class OutboundQueue:
+    def __init__(self, max_size: int = None, client: httpx.AsyncClient = None):
+        self.max_size = max_size or config.OUTBOUND_QUEUE_SIZE
+        self._client = client
+        self._owns_client = client is None
+        self._chats: Dict[str, _ChatState] = {}
+        self._global_bucket = TokenBucket(config.TELEGRAM_GLOBAL_RATE, capacity=config.TELEGRAM_GLOBAL_RATE)
+        self._depth = 0
+        self._in_flight = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._intake: Optional[asyncio.Queue] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "rate_limited": 0,
+            "rejected": 0,
+            "max_depth": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return self._depth + self._in_flight
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+
+        self._loop = loop
+        self._intake = asyncio.Queue()
+        self._changed = asyncio.Condition()
+        if self._owns_client and (self._client is None or self._client.is_closed):
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(10))
+        self._task = loop.create_task(self._run())
+
+    async def stop(self, timeout: float = None) -> bool:
+        if self._task is None:
+            return True
+
+        flushed = await self.flush(timeout)
+        self._task.cancel()
+        for send in list(self._sends):
+            send.cancel()
+        await asyncio.gather(self._task, *self._sends, return_exceptions=True)
+        self._drain_intake()
+        self._task = None
+
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+        return flushed
+
+    async def flush(self, timeout: float = None) -> bool:
+        if self._task is None:
+            return not self._depth
+
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: not self.pending), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def put(self, chat_id: str, payload: dict, timeout: float = None) -> bool:
+        timeout = config.OUTBOUND_PUT_TIMEOUT if timeout is None else timeout
+
+        self.start()
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self._depth < self.max_size), timeout)
+            except asyncio.TimeoutError:
+                self._stats["rejected"] += 1
+                logger.error(f"Outbound queue full ({self._depth} messages), rejecting message for {chat_id}")
+                return False
+
+            self._depth += 1
+            self._stats["enqueued"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._depth)
+
+        self._intake.put_nowait(OutboundMessage(chat_id, payload))
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        stats = dict(self._stats)
+        stats["depth"] = self._depth
+        samples = sorted(self._latencies)
+
+        if samples:
+            stats["p50_latency_seconds"] = round(samples[len(samples) // 2], 3)
+            stats["p95_latency_seconds"] = round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3)
+        return stats
+
+    async def _run(self):
+        while True:
+            self._drain_intake()
+            chat, wait = self._next_chat(time.monotonic())
+
+            if chat is None or wait > 0:
+                # Sleep until a new message or a finished send arrives, or until the next chat is ready
+                try:
+                    message = await asyncio.wait_for(self._intake.get(), None if chat is None else wait)
+                except asyncio.TimeoutError:
+                    continue
+                self._accept(message)
+                continue
+
+            await self._global_bucket.acquire()
+            chat.bucket.consume(time.monotonic())
+            message = chat.pending.popleft()
+            chat.sending = True
+            self._depth -= 1
+            self._in_flight += 1
+
+            send = asyncio.create_task(self._deliver(message, chat))
+            self._sends.add(send)
+            send.add_done_callback(self._sends.discard)
+            await self._notify()
+
+    def _drain_intake(self):
+        while self._intake is not None and not self._intake.empty():
+            self._accept(self._intake.get_nowait())
+
+    def _accept(self, message: Optional[OutboundMessage]):
+        # None is only a wake-up: a chat finished sending and may be ready again
+        if message is None:
+            return
+
+        chat = self._chats.get(message.chat_id)
+        if chat is None:
+            chat = self._chats[message.chat_id] = _ChatState(message.chat_id)
+        chat.pending.append(message)
+
+    def _next_chat(self, now: float) -> Tuple[Optional[_ChatState], Optional[float]]:
+        best_chat, best_wait = None, None
+
+        for chat in self._chats.values():
+            if not chat.pending or chat.sending:
+                continue
+            wait = max(chat.bucket.ready_in(now), chat.blocked_until - now, chat.pending[0].not_before - now, 0.0)
+            if best_wait is None or wait < best_wait:
+                best_chat, best_wait = chat, wait
+
+        return best_chat, best_wait
+
+    async def _deliver(self, message: OutboundMessage, chat: _ChatState):
+        message.attempts += 1
+        url = f"{config.TELEGRAM_API_URL}/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage"
+
+        try:
+            response = await self._client.post(url, json=message.payload)
+
+            if response.status_code == 429:
+                retry_after = self._retry_after(response)
+                logger.warning(f"Telegram rate limited chat {message.chat_id}, retrying after {retry_after}s")
+                message.attempts -= 1
+                self._stats["rate_limited"] += 1
+                chat.blocked_until = time.monotonic() + retry_after
+                self._requeue(message, chat, delay=0, count_retry=False)
+                return
+
+            if 400 <= response.status_code < 500:
+                logger.error(
+                    f"Telegram rejected message for chat {message.chat_id} "
+                    f"({response.status_code}): {self._description(response)}"
+                )
+                self._stats["failed"] += 1
+                return
+
+            response.raise_for_status()
+            self._stats["sent"] += 1
+            self._latencies.append(time.monotonic() - message.enqueued_at)
+
+        except httpx.HTTPError as e:
+            if message.attempts < config.OUTBOUND_MAX_ATTEMPTS:
+                delay = config.OUTBOUND_RETRY_BACKOFF * 2 ** (message.attempts - 1)
+                logger.warning(f"Failed to send Telegram message (attempt {message.attempts}), retrying in {delay}s: {e}")
+                self._requeue(message, chat, delay=delay)
+            else:
+                logger.error(f"Failed to send Telegram message to chat {message.chat_id} after {message.attempts} attempts: {e}")
+                self._stats["failed"] += 1
+        finally:
+            chat.sending = False
+            self._in_flight -= 1
+            self._intake.put_nowait(None)
+            await self._notify()
+
+    def _requeue(self, message: OutboundMessage, chat: _ChatState, delay: float, count_retry: bool = True):
+        message.not_before = time.monotonic() + delay
+        chat.pending.appendleft(message)
+        self._depth += 1
+        if count_retry:
+            self._stats["retried"] += 1
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _retry_after(self, response: httpx.Response) -> float:
+        try:
+            return float(response.json().get("parameters", {}).get("retry_after", 1))
+        except (ValueError, AttributeError):
+            return float(response.headers.get("Retry-After", 1))
+
+    def _description(self, response: httpx.Response) -> str:
+        try:
+            return response.json().get("description") or response.text
+        except (ValueError, AttributeError):
+            return response.text
+
+outbound_queue = OutboundQueue()
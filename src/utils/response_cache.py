@@ -0,0 +1,243 @@
+import asyncio
+import calendar
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from src.utils.data_manager import DataManager
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    def __init__(self, snapshot_file: str = None):
+        self.snapshot_file = config.RESPONSE_CACHE_FILE if snapshot_file is None else snapshot_file
+        self._lock = threading.Lock()
+        self._fetch_locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._entries: Dict[str, Tuple[Any, float]] = self._load_snapshot()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refresh_failures": 0}
+
+    async def get_or_fetch(self, key: str, fetcher: Callable[[], Awaitable[Any]], ttl: float,
+                           stale_ttl: float = None) -> Optional[Any]:
+        stale_ttl = config.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        entry = self._get_entry(key)
+
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+
+            if age < ttl:
+                self._count("hits")
+                return value
+
+            if age < ttl + stale_ttl:
+                self._count("stale_hits")
+                self._refresh_in_background(key, fetcher)
+                return value
+
+        self._count("misses")
+        return await self._fetch(key, fetcher)
+
+    def peek(self, key: str) -> Optional[Any]:
+        entry = self._get_entry(key)
+        return entry[0] if entry else None
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+    def _get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    async def _fetch(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        fetch_lock = self._fetch_locks.setdefault(key, asyncio.Lock())
+
+        requested_at = time.time()
+        async with fetch_lock:
+            entry = self._get_entry(key)
+            if entry is not None and entry[1] >= requested_at:
+                return entry[0]
+
+            started = time.time()
+            value = await fetcher()
+
+            if value is None:
+                self._count("refresh_failures")
+                return entry[0] if entry else None
+
+            with self._lock:
+                self._entries[key] = (value, started)
+            await asyncio.to_thread(self._save_snapshot)
+            return value
+
+    def _refresh_in_background(self, key: str, fetcher: Callable[[], Awaitable[Any]]):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch(key, fetcher)
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(refresh())
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _load_snapshot(self) -> Dict[str, Tuple[Any, float]]:
+        if not self.snapshot_file:
+            return {}
+        try:
+            with open(self.snapshot_file, "r") as f:
+                data = json.load(f)
+            return {key: (entry["value"], entry["fetched_at"]) for key, entry in data.items()}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def _save_snapshot(self):
+        if not self.snapshot_file:
+            return
+
+        with self._lock:
+            data = {key: {"value": value, "fetched_at": fetched_at} for key, (value, fetched_at) in self._entries.items()}
+
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_file) or ".", exist_ok=True)
+            temp_path = f"{self.snapshot_file}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.snapshot_file)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Failed to write response cache snapshot: {e}")
+
+class CreditMeter:
+    STATE_KEY = "cmc_credits"
+
+    def __init__(self, monthly_limit: int = None, persist: bool = True):
+        self.monthly_limit = monthly_limit or config.CMC_MONTHLY_CREDIT_LIMIT
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._month = datetime.now().strftime("%Y-%m")
+        self._day = datetime.now().strftime("%Y-%m-%d")
+        self._used_month = 0
+        self._used_day = 0
+        self._last_cost: Dict[str, int] = {}
+        self._throttled = 0
+        self._warned = False
+        self._loaded = not persist
+
+    def allows(self, endpoint: str) -> bool:
+        now = datetime.now()
+        with self._lock:
+            self._roll(now)
+            cost = self._last_cost.get(endpoint, 1)
+            remaining = self.monthly_limit - self._used_month
+
+            if cost > remaining:
+                reason = f"only {max(remaining, 0)} of {self.monthly_limit} monthly credits left"
+            elif self._used_month >= self.monthly_limit * config.CMC_CREDIT_WARNING_RATIO:
+                # Near the limit, spread what is left evenly over the rest of the month
+                days_left = calendar.monthrange(now.year, now.month)[1] - now.day + 1
+                daily_budget = (remaining + self._used_day) / days_left
+                reason = None if self._used_day + cost <= daily_budget else (
+                    f"today's budget of {daily_budget:.0f} credits is spent"
+                )
+            else:
+                reason = None
+
+            if reason is not None:
+                self._throttled += 1
+
+        if reason is not None:
+            logger.warning(f"Skipping CMC {endpoint} fetch ({cost} credits): {reason}; serving cached data")
+            return False
+        return True
+
+    def record(self, endpoint: str, credits: int):
+        now = datetime.now()
+        with self._lock:
+            self._roll(now)
+            self._used_month += credits
+            self._used_day += credits
+            self._last_cost[endpoint] = credits
+            used = self._used_month
+            warn = used >= self.monthly_limit * config.CMC_CREDIT_WARNING_RATIO and not self._warned
+            self._warned = self._warned or warn
+            month = self._month
+
+        logger.info(f"CMC {endpoint} used {credits} credits ({used}/{self.monthly_limit} this month)")
+        if warn:
+            logger.warning(f"CMC credit usage at {used}/{self.monthly_limit} for {month}, throttling fetches")
+
+        if self.persist:
+            self._persist()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._roll(datetime.now())
+            return {
+                "month": self._month,
+                "used_month": self._used_month,
+                "used_today": self._used_day,
+                "monthly_limit": self.monthly_limit,
+                "throttled": self._throttled,
+            }
+
+    def _roll(self, now: datetime):
+        if not self._loaded:
+            self._loaded = True
+            self._restore()
+
+        month, day = now.strftime("%Y-%m"), now.strftime("%Y-%m-%d")
+        if month != self._month:
+            self._month, self._used_month, self._warned = month, 0, False
+        if day != self._day:
+            self._day, self._used_day = day, 0
+
+    def _restore(self):
+        try:
+            state = DataManager.get_state(self.STATE_KEY) or {}
+        except Exception as e:
+            logger.warning(f"Failed to restore CMC credit usage: {e}")
+            return
+
+        if state.get("month") == self._month:
+            self._used_month = int(state.get("used_month", 0))
+            if state.get("day") == self._day:
+                self._used_day = int(state.get("used_today", 0))
+        self._last_cost.update(state.get("last_cost") or {})
+
+    def _persist(self):
+        # Snapshot and write under one lock so a slower writer can't store an older tally
+        with self._persist_lock:
+            with self._lock:
+                state = {
+                    "month": self._month,
+                    "day": self._day,
+                    "used_month": self._used_month,
+                    "used_today": self._used_day,
+                    "last_cost": dict(self._last_cost),
+                }
+            try:
+                DataManager.set_state(self.STATE_KEY, state)
+            except Exception as e:
+                logger.warning(f"Failed to persist CMC credit usage: {e}")
+
+response_cache = ResponseCache()
+cmc_credits = CreditMeter()
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+JobCallback = Callable[[], Awaitable[None]]
+
+class ScheduledJob:
+    def __init__(self, name: str, callback: JobCallback, interval: float, jitter: float,
+                 retry_delay: Optional[float], anchor: float):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.anchor = anchor
+        self.due = anchor + random.uniform(0, jitter)
+        self.extra_due: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {"runs": 0, "failures": 0, "overlaps_skipped": 0, "ticks_missed": 0, "manual_runs": 0}
+        self.last_duration: Optional[float] = None
+        self.max_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def next_wakeup(self) -> float:
+        return self.due if self.extra_due is None else min(self.due, self.extra_due)
+
+class Scheduler:
+    def __init__(self, jitter: float = None):
+        self.jitter = config.SCHEDULER_JITTER if jitter is None else jitter
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, callback: JobCallback, interval: float, jitter: float = None,
+                delay: float = 0.0, retry_delay: float = None) -> ScheduledJob:
+        jitter = self.jitter if jitter is None else jitter
+        job = ScheduledJob(name, callback, interval, min(jitter, interval), retry_delay, time.monotonic() + delay)
+
+        previous = self._jobs.get(name)
+        if previous is not None:
+            job.task = previous.task
+        self._jobs[name] = job
+        self._wakeup.set()
+        return job
+
+    def remove_job(self, name: str) -> bool:
+        return self._jobs.pop(name, None) is not None
+
+    def has_job(self, name: str) -> bool:
+        return name in self._jobs
+
+    def job_names(self, prefix: str = "") -> List[str]:
+        return [name for name in self._jobs if name.startswith(prefix)]
+
+    def jobs_due_within(self, seconds: float, prefix: str = "") -> List[str]:
+        deadline = time.monotonic() + seconds
+        return [name for name, job in self._jobs.items() if name.startswith(prefix) and job.next_wakeup() <= deadline]
+
+    def set_interval(self, name: str, interval: float):
+        job = self._jobs.get(name)
+        if job is None or job.interval == interval:
+            return
+
+        now = time.monotonic()
+        job.anchor = max(now, job.anchor - job.interval + interval)
+        job.interval = interval
+        job.jitter = min(job.jitter, interval)
+        job.due = job.anchor + random.uniform(0, job.jitter)
+        self._wakeup.set()
+
+    def delay(self, name: str, seconds: float):
+        job = self._jobs.get(name)
+        if job is None:
+            return
+
+        job.anchor = max(job.anchor, time.monotonic() + seconds)
+        job.due = job.anchor + random.uniform(0, job.jitter)
+        job.extra_due = None
+        self._wakeup.set()
+
+    def run_now(self, name: str) -> bool:
+        job = self._jobs.get(name)
+        if job is None or job.running:
+            return False
+
+        job.extra_due = time.monotonic()
+        job.stats["manual_runs"] += 1
+        self._wakeup.set()
+        return True
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="scheduler")
+
+    async def stop(self):
+        tasks = [job.task for job in self._jobs.values() if job.running]
+        if self._task is not None:
+            tasks.append(self._task)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        return {
+            name: {
+                **job.stats,
+                "interval": job.interval,
+                "running": job.running,
+                "next_run_in": round(max(0.0, job.next_wakeup() - now), 1),
+                "last_duration": round(job.last_duration, 2) if job.last_duration is not None else None,
+                "max_lag": round(job.max_lag, 2),
+            }
+            for name, job in self._jobs.items()
+        }
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+
+            for job in list(self._jobs.values()):
+                manual = job.extra_due is not None and job.extra_due <= now
+                if manual:
+                    self._dispatch(job, now)
+                    job.extra_due = None
+                if job.due <= now:
+                    # A manual run that lands on a due tick serves that tick instead of counting as an overlap
+                    if not manual:
+                        self._dispatch(job, now)
+                    self._advance(job, now)
+
+            wakeups = [job.next_wakeup() for job in self._jobs.values()]
+            timeout = max(0.0, min(wakeups) - time.monotonic()) if wakeups else None
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, job: ScheduledJob, now: float):
+        if job.running:
+            job.stats["overlaps_skipped"] += 1
+            logger.warning(f"Skipping run of {job.name}: previous run is still in progress")
+            return
+
+        job.max_lag = max(job.max_lag, now - min(job.due, job.extra_due or job.due))
+        job.task = asyncio.create_task(self._execute(job), name=f"job:{job.name}")
+
+    def _advance(self, job: ScheduledJob, now: float):
+        ticks = int((now - job.anchor) // job.interval) + 1
+        if ticks > 1:
+            job.stats["ticks_missed"] += ticks - 1
+            logger.warning(f"Job {job.name} missed {ticks - 1} ticks")
+
+        job.anchor += ticks * job.interval
+        job.due = job.anchor + random.uniform(0, job.jitter)
+
+    async def _execute(self, job: ScheduledJob):
+        started = time.monotonic()
+        try:
+            await job.callback()
+            job.stats["runs"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.stats["failures"] += 1
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+            if job.retry_delay is not None and self._jobs.get(job.name) is job:
+                job.extra_due = time.monotonic() + job.retry_delay
+                self._wakeup.set()
+        finally:
+            job.last_duration = time.monotonic() - started
+
+        minutes, seconds = divmod(int(max(0.0, job.next_wakeup() - time.monotonic())), 60)
+        logger.info(f"Job {job.name} finished in {job.last_duration:.1f}s, next run in {minutes:02d}:{seconds:02d}")
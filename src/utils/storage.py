@@ -0,0 +1,564 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+LAST_ALERT_ID_KEY = "last_alert_id"
+
+class StorageBackend(ABC):
+    @abstractmethod
+    def load_portfolios(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def load_tickers(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def get_portfolio(self, name: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def has_ticker(self, ticker: str) -> bool:
+        ...
+
+    @abstractmethod
+    def save_portfolios(self, portfolios: List[Dict]):
+        ...
+
+    @abstractmethod
+    def save_tickers(self, tickers: List[str]):
+        ...
+
+    @abstractmethod
+    def upsert_portfolio(self, portfolio: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def delete_portfolio(self, name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def add_ticker(self, ticker: str) -> bool:
+        ...
+
+    @abstractmethod
+    def remove_ticker(self, ticker: str) -> bool:
+        ...
+
+    @abstractmethod
+    def load_alerts(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def add_alert(self, alert: Dict[str, Any]) -> int:
+        ...
+
+    @abstractmethod
+    def remove_alert(self, alert_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    def load_subscriptions(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def save_subscription(self, subscription: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def delete_subscription(self, chat_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_state(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set_state(self, key: str, value: Any):
+        ...
+
+    def close(self):
+        pass
+
+class JsonStorage(StorageBackend):
+    def __init__(self, portfolios_file: str = None, tickers_file: str = None, state_file: str = None,
+                 alerts_file: str = None, subscriptions_file: str = None):
+        self.portfolios_file = portfolios_file or config.PORTFOLIOS_FILE
+        self.tickers_file = tickers_file or config.TICKERS_FILE
+        self.state_file = state_file or config.STATE_FILE
+        self.alerts_file = alerts_file or config.ALERTS_FILE
+        self.subscriptions_file = subscriptions_file or config.SUBSCRIPTIONS_FILE
+        self._lock = threading.RLock()
+        self._cache: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        self._portfolio_index: Dict[str, Dict[str, Any]] = {}
+
+    def load_portfolios(self) -> List[Dict[str, Any]]:
+        return [dict(portfolio) for portfolio in self._read(self.portfolios_file, []) if isinstance(portfolio, dict)]
+
+    def load_tickers(self) -> List[str]:
+        return list(self._read(self.tickers_file, []))
+
+    def get_portfolio(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._read(self.portfolios_file, [])
+            portfolio = self._portfolio_index.get(name)
+            return dict(portfolio) if portfolio is not None else None
+
+    def has_ticker(self, ticker: str) -> bool:
+        return ticker in self._read(self.tickers_file, [])
+
+    def save_portfolios(self, portfolios: List[Dict]):
+        self._write(self.portfolios_file, portfolios)
+
+    def save_tickers(self, tickers: List[str]):
+        self._write(self.tickers_file, tickers)
+
+    def upsert_portfolio(self, portfolio: Dict[str, Any]):
+        with self._lock:
+            portfolios = self.load_portfolios()
+            for index, existing in enumerate(portfolios):
+                if existing.get("name") == portfolio["name"]:
+                    portfolios[index] = dict(portfolio)
+                    break
+            else:
+                portfolios.append(dict(portfolio))
+            self.save_portfolios(portfolios)
+
+    def delete_portfolio(self, name: str) -> bool:
+        with self._lock:
+            portfolios = self.load_portfolios()
+            remaining = [p for p in portfolios if p.get("name") != name]
+            if len(remaining) == len(portfolios):
+                return False
+            self.save_portfolios(remaining)
+            return True
+
+    def add_ticker(self, ticker: str) -> bool:
+        with self._lock:
+            tickers = self.load_tickers()
+            if ticker in tickers:
+                return False
+            tickers.append(ticker)
+            self.save_tickers(tickers)
+            return True
+
+    def remove_ticker(self, ticker: str) -> bool:
+        with self._lock:
+            tickers = self.load_tickers()
+            if ticker not in tickers:
+                return False
+            tickers.remove(ticker)
+            self.save_tickers(tickers)
+            return True
+
+    def load_alerts(self) -> List[Dict[str, Any]]:
+        return [dict(alert) for alert in self._read(self.alerts_file, [])]
+
+    def add_alert(self, alert: Dict[str, Any]) -> int:
+        with self._lock:
+            alerts = self.load_alerts()
+            # Like SQLite AUTOINCREMENT, never hand out an id again after its alert fires or is removed
+            last_id = max([self.get_state(LAST_ALERT_ID_KEY, 0)] + [a["id"] for a in alerts])
+            alert_id = last_id + 1
+            alerts.append({**alert, "id": alert_id})
+            self.set_state(LAST_ALERT_ID_KEY, alert_id)
+            self._write(self.alerts_file, alerts)
+            return alert_id
+
+    def remove_alert(self, alert_id: int) -> bool:
+        with self._lock:
+            alerts = self.load_alerts()
+            remaining = [a for a in alerts if a.get("id") != alert_id]
+            if len(remaining) == len(alerts):
+                return False
+            self._write(self.alerts_file, remaining)
+            return True
+
+    def load_subscriptions(self) -> List[Dict[str, Any]]:
+        return [dict(subscription) for subscription in self._read(self.subscriptions_file, [])]
+
+    def save_subscription(self, subscription: Dict[str, Any]):
+        with self._lock:
+            subscriptions = [
+                s for s in self.load_subscriptions() if str(s.get("chat_id")) != str(subscription["chat_id"])
+            ]
+            subscriptions.append(dict(subscription))
+            self._write(self.subscriptions_file, subscriptions)
+
+    def delete_subscription(self, chat_id: str) -> bool:
+        with self._lock:
+            subscriptions = self.load_subscriptions()
+            remaining = [s for s in subscriptions if str(s.get("chat_id")) != str(chat_id)]
+            if len(remaining) == len(subscriptions):
+                return False
+            self._write(self.subscriptions_file, remaining)
+            return True
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        return self._read(self.state_file, {}).get(key, default)
+
+    def set_state(self, key: str, value: Any):
+        with self._lock:
+            state = dict(self._read(self.state_file, {}))
+            state[key] = value
+            self._write(self.state_file, state)
+
+    def _signature(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _read(self, path: str, default: Any) -> Any:
+        with self._lock:
+            signature = self._signature(path)
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                data = default
+
+            self._store(path, signature, data)
+            return data
+
+    def _write(self, path: str, data: Any):
+        with self._lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+
+            self._store(path, self._signature(path), json.loads(json.dumps(data)))
+
+    def _store(self, path: str, signature: Optional[Tuple[int, int]], data: Any):
+        self._cache[path] = (signature, data)
+        if path == self.portfolios_file:
+            self._portfolio_index = {
+                portfolio.get("name"): portfolio for portfolio in data if isinstance(portfolio, dict)
+            }
+
+PORTFOLIO_COLUMNS = {
+    "name": "name",
+    "url": "url",
+    "threshold": "threshold",
+    "totalLostOrGainedSinceTheStartOfTheScript": "total_gain_loss",
+}
+
+def _unique_portfolios(portfolios: List[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+    # Names are the primary key, so a later entry with the same name would silently replace the first
+    unique: Dict[str, Dict[str, Any]] = {}
+    for portfolio in portfolios:
+        if not isinstance(portfolio, dict) or not portfolio.get("name") or not portfolio.get("url"):
+            logger.warning(f"Skipping malformed portfolio entry in {source}: {portfolio}")
+            continue
+
+        kept = unique.get(portfolio["name"])
+        if kept is None:
+            unique[portfolio["name"]] = portfolio
+        else:
+            logger.warning(
+                f"Duplicate portfolio name '{portfolio['name']}' in {source}: keeping {kept.get('url')}, "
+                f"dropping {portfolio.get('url')}"
+            )
+    return list(unique.values())
+
+def _migration_create_tables(connection: sqlite3.Connection, storage: "SqliteStorage"):
+    statements = [
+        """CREATE TABLE IF NOT EXISTS portfolios (
+            name TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            threshold REAL NOT NULL DEFAULT 0,
+            total_gain_loss REAL NOT NULL DEFAULT 0,
+            extra TEXT NOT NULL DEFAULT '{}'
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_portfolios_url ON portfolios(url)",
+        "CREATE TABLE IF NOT EXISTS tickers (symbol TEXT PRIMARY KEY)",
+        """CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )""",
+    ]
+    for statement in statements:
+        connection.execute(statement)
+
+def _migration_import_json(connection: sqlite3.Connection, storage: "SqliteStorage"):
+    source = JsonStorage()
+    portfolios = _unique_portfolios(source.load_portfolios(), source.portfolios_file)
+    tickers = source.load_tickers()
+
+    for portfolio in portfolios:
+        storage._upsert_portfolio(connection, portfolio)
+    connection.executemany("INSERT OR IGNORE INTO tickers (symbol) VALUES (?)", [(t,) for t in tickers])
+
+    logger.info(f"Imported {len(portfolios)} portfolios and {len(tickers)} tickers from JSON files")
+
+def _migration_create_alerts(connection: sqlite3.Connection, storage: "SqliteStorage"):
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            target REAL NOT NULL,
+            reference REAL,
+            chat_id TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )"""
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_alerts_chat ON alerts(chat_id)")
+
+    source = JsonStorage()
+    alerts = source.load_alerts()
+    for alert in alerts:
+        storage._insert_alert(connection, alert)
+    if alerts:
+        logger.info(f"Imported {len(alerts)} price alerts from JSON files")
+
+    last_id = source.get_state(LAST_ALERT_ID_KEY, 0)
+    if last_id > max((alert["id"] for alert in alerts), default=0):
+        connection.execute("DELETE FROM sqlite_sequence WHERE name = 'alerts'")
+        connection.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('alerts', ?)", (last_id,))
+
+def _migration_create_subscriptions(connection: sqlite3.Connection, storage: "SqliteStorage"):
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS subscriptions (
+            chat_id TEXT PRIMARY KEY,
+            topics TEXT NOT NULL DEFAULT '{}'
+        )"""
+    )
+
+    subscriptions = JsonStorage().load_subscriptions()
+    for subscription in subscriptions:
+        storage._upsert_subscription(connection, subscription)
+    if subscriptions:
+        logger.info(f"Imported {len(subscriptions)} chat subscriptions from JSON files")
+
+MIGRATIONS = [
+    (1, _migration_create_tables),
+    (2, _migration_import_json),
+    (3, _migration_create_alerts),
+    (4, _migration_create_subscriptions),
+]
+
+ALERT_COLUMNS = ("id", "symbol", "kind", "target", "reference", "chat_id", "created_at")
+
+class SqliteStorage(StorageBackend):
+    def __init__(self, path: str = None):
+        self.path = path or config.SQLITE_PATH
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._migrate()
+
+    def load_portfolios(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT name, url, threshold, total_gain_loss, extra FROM portfolios ORDER BY rowid"
+        ).fetchall()
+        return [self._row_to_portfolio(row) for row in rows]
+
+    def load_tickers(self) -> List[str]:
+        rows = self._connection().execute("SELECT symbol FROM tickers ORDER BY rowid").fetchall()
+        return [row[0] for row in rows]
+
+    def get_portfolio(self, name: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT name, url, threshold, total_gain_loss, extra FROM portfolios WHERE name = ?", (name,)
+        ).fetchone()
+        return self._row_to_portfolio(row) if row else None
+
+    def has_ticker(self, ticker: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM tickers WHERE symbol = ?", (ticker,)).fetchone()
+        return row is not None
+
+    def save_portfolios(self, portfolios: List[Dict]):
+        portfolios = _unique_portfolios(portfolios, self.path)
+        names = [portfolio["name"] for portfolio in portfolios]
+        with self._transaction() as connection:
+            for portfolio in portfolios:
+                self._upsert_portfolio(connection, portfolio)
+            placeholders = ",".join("?" * len(names))
+            connection.execute(f"DELETE FROM portfolios WHERE name NOT IN ({placeholders})", names)
+
+    def save_tickers(self, tickers: List[str]):
+        with self._transaction() as connection:
+            connection.executemany("INSERT OR IGNORE INTO tickers (symbol) VALUES (?)", [(t,) for t in tickers])
+            placeholders = ",".join("?" * len(tickers))
+            connection.execute(f"DELETE FROM tickers WHERE symbol NOT IN ({placeholders})", tickers)
+
+    def upsert_portfolio(self, portfolio: Dict[str, Any]):
+        with self._transaction() as connection:
+            self._upsert_portfolio(connection, portfolio)
+
+    def delete_portfolio(self, name: str) -> bool:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM portfolios WHERE name = ?", (name,)).rowcount > 0
+
+    def add_ticker(self, ticker: str) -> bool:
+        with self._transaction() as connection:
+            return connection.execute("INSERT OR IGNORE INTO tickers (symbol) VALUES (?)", (ticker,)).rowcount > 0
+
+    def remove_ticker(self, ticker: str) -> bool:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM tickers WHERE symbol = ?", (ticker,)).rowcount > 0
+
+    def load_alerts(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(f"SELECT {', '.join(ALERT_COLUMNS)} FROM alerts ORDER BY id").fetchall()
+        return [dict(zip(ALERT_COLUMNS, row)) for row in rows]
+
+    def add_alert(self, alert: Dict[str, Any]) -> int:
+        with self._transaction() as connection:
+            return self._insert_alert(connection, alert)
+
+    def remove_alert(self, alert_id: int) -> bool:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM alerts WHERE id = ?", (alert_id,)).rowcount > 0
+
+    def load_subscriptions(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute("SELECT chat_id, topics FROM subscriptions ORDER BY rowid").fetchall()
+        return [{"chat_id": chat_id, "topics": json.loads(topics)} for chat_id, topics in rows]
+
+    def save_subscription(self, subscription: Dict[str, Any]):
+        with self._transaction() as connection:
+            self._upsert_subscription(connection, subscription)
+
+    def delete_subscription(self, chat_id: str) -> bool:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM subscriptions WHERE chat_id = ?", (str(chat_id),)).rowcount > 0
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        row = self._connection().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, key: str, value: Any):
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, json.dumps(value), time.time()),
+            )
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+
+    def _migrate(self):
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, applied_at REAL NOT NULL)"
+        )
+
+        with self._transaction() as connection:
+            applied = {row[0] for row in connection.execute("SELECT version FROM schema_migrations")}
+            for version, migration in MIGRATIONS:
+                if version in applied:
+                    continue
+                logger.info(f"Applying storage migration {version}: {migration.__name__}")
+                migration(connection, self)
+                connection.execute(
+                    "INSERT INTO schema_migrations (version, applied_at) VALUES (?, ?)", (version, time.time())
+                )
+
+    def _upsert_portfolio(self, connection: sqlite3.Connection, portfolio: Dict[str, Any]):
+        extra = {key: value for key, value in portfolio.items() if key not in PORTFOLIO_COLUMNS}
+        connection.execute(
+            "INSERT INTO portfolios (name, url, threshold, total_gain_loss, extra) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET url = excluded.url, threshold = excluded.threshold, "
+            "total_gain_loss = excluded.total_gain_loss, extra = excluded.extra",
+            (
+                portfolio["name"],
+                portfolio["url"],
+                portfolio.get("threshold") or 0,
+                portfolio.get("totalLostOrGainedSinceTheStartOfTheScript") or 0,
+                json.dumps(extra),
+            ),
+        )
+
+    def _insert_alert(self, connection: sqlite3.Connection, alert: Dict[str, Any]) -> int:
+        cursor = connection.execute(
+            "INSERT INTO alerts (id, symbol, kind, target, reference, chat_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                alert.get("id"),
+                alert["symbol"],
+                alert["kind"],
+                alert["target"],
+                alert.get("reference"),
+                str(alert["chat_id"]),
+                alert.get("created_at") or time.time(),
+            ),
+        )
+        return cursor.lastrowid
+
+    def _upsert_subscription(self, connection: sqlite3.Connection, subscription: Dict[str, Any]):
+        connection.execute(
+            "INSERT INTO subscriptions (chat_id, topics) VALUES (?, ?) "
+            "ON CONFLICT(chat_id) DO UPDATE SET topics = excluded.topics",
+            (str(subscription["chat_id"]), json.dumps(subscription.get("topics", {}))),
+        )
+
+    def _row_to_portfolio(self, row: tuple) -> Dict[str, Any]:
+        name, url, threshold, total_gain_loss, extra = row
+        portfolio = {
+            "name": name,
+            "url": url,
+            "threshold": threshold,
+            "totalLostOrGainedSinceTheStartOfTheScript": total_gain_loss,
+        }
+        portfolio.update(json.loads(extra or "{}"))
+        return portfolio
+
+def create_storage(backend: str = None) -> StorageBackend:
+    backend = (backend or config.STORAGE_BACKEND).lower()
+    if backend == "sqlite":
+        return SqliteStorage()
+    if backend == "json":
+        return JsonStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
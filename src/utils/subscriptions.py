@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from config.settings import config
+
+TOPICS = ("market", "portfolios", "thresholds")
+# Portfolio values, usernames and P/L only go to the owner chat and chats on the allow-list
+PRIVATE_TOPICS = ("portfolios", "thresholds")
+
+Selection = Optional[Tuple[str, ...]]
+
+class SubscriptionRegistry:
+    def __init__(self):
+        self._subscriptions: Dict[str, Dict[str, Optional[List[str]]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, subscriptions: List[dict]):
+        with self._lock:
+            self._subscriptions = {
+                str(subscription["chat_id"]): dict(subscription.get("topics") or {})
+                for subscription in subscriptions
+            }
+
+    def topics_for(self, chat_id: str) -> Dict[str, Optional[List[str]]]:
+        with self._lock:
+            return dict(self._records().get(str(chat_id), {}))
+
+    def subscribe(self, chat_id: str, topic: str, keys: Optional[List[str]] = None) -> dict:
+        if topic not in TOPICS:
+            raise ValueError(f"Unknown subscription topic: {topic}")
+        if topic in PRIVATE_TOPICS and not is_authorized(chat_id):
+            raise PermissionError(f"Chat {chat_id} is not allowed to subscribe to {topic}")
+
+        with self._lock:
+            topics = dict(self._records().get(str(chat_id), {}))
+            topics[topic] = list(dict.fromkeys(keys)) if keys else None
+            self._subscriptions[str(chat_id)] = topics
+            return {"chat_id": str(chat_id), "topics": dict(topics)}
+
+    def unsubscribe(self, chat_id: str, topic: str = None) -> dict:
+        with self._lock:
+            topics = dict(self._records().get(str(chat_id), {}))
+            if topic is None:
+                topics.clear()
+            else:
+                topics.pop(topic, None)
+            self._subscriptions[str(chat_id)] = topics
+            return {"chat_id": str(chat_id), "topics": dict(topics)}
+
+    def audiences(self, topic: str) -> Dict[Selection, List[str]]:
+        groups: Dict[Selection, List[str]] = {}
+        allowed = authorized_chat_ids() if topic in PRIVATE_TOPICS else None
+        with self._lock:
+            for chat_id, topics in self._records().items():
+                if allowed is not None and chat_id not in allowed:
+                    continue
+                if topic in topics:
+                    selection = topics[topic]
+                    groups.setdefault(tuple(selection) if selection is not None else None, []).append(chat_id)
+        return groups
+
+    def subscribers(self, topic: str, key: str) -> List[str]:
+        return [
+            chat_id
+            for selection, chat_ids in self.audiences(topic).items()
+            if selection is None or key in selection
+            for chat_id in chat_ids
+        ]
+
+    def selected_keys(self, topic: str) -> List[str]:
+        keys: Dict[str, None] = {}
+        for selection in self.audiences(topic):
+            keys.update(dict.fromkeys(selection or ()))
+        return list(keys)
+
+    def stats(self) -> Dict[str, int]:
+        return {topic: sum(len(chats) for chats in self.audiences(topic).values()) for topic in TOPICS}
+
+    def _records(self) -> Dict[str, Dict[str, Optional[List[str]]]]:
+        if config.CHAT_ID and str(config.CHAT_ID) not in self._subscriptions:
+            return {str(config.CHAT_ID): {topic: None for topic in TOPICS}, **self._subscriptions}
+        return self._subscriptions
+
+def authorized_chat_ids() -> Set[str]:
+    allowed = {str(chat_id) for chat_id in config.ALLOWED_CHAT_IDS}
+    if config.CHAT_ID:
+        allowed.add(str(config.CHAT_ID))
+    return allowed
+
+def is_authorized(chat_id: str) -> bool:
+    return str(chat_id) in authorized_chat_ids()
+
+subscription_registry = SubscriptionRegistry()
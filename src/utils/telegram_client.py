@@ -1,24 +1,148 @@
-import requests
 import logging
+import re
+from typing import Dict, List, Tuple
+from src.utils.message_queue import outbound_queue
 from config.settings import config
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+HTML_UNIT = re.compile(r"<[^>]*>|&#?\w+;|[^<&]|[<&]")
+HTML_WORD = re.compile(r"(\s*)((?:<[^>]*>|[^\s<])+)")
+HTML_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^>]*>")
+
+def message_length(text: str) -> int:
+    # Telegram counts message length in UTF-16 code units, so emoji and other astral characters count twice
+    return len(text.encode("utf-16-le")) // 2
+
+def pack_message_blocks(blocks: List[str], limit: int = TELEGRAM_MESSAGE_LIMIT,
+                        separator: str = "\n\n") -> List[str]:
+    # Leave room for a "Part x/y" footer when a digest spans several messages
+    limit -= 64
+    messages, current = [], ""
+
+    for block in blocks:
+        pieces = [block] if message_length(block) <= limit else _split_block(block, limit)
+        for piece in pieces:
+            candidate = f"{current}{separator}{piece}" if current else piece
+            if message_length(candidate) <= limit:
+                current = candidate
+            else:
+                messages.append(current)
+                current = piece
+
+    if current:
+        messages.append(current)
+    return messages
+
+class _HtmlSplitter:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.pieces: List[str] = []
+        self.open_tags: List[Tuple[str, str]] = []
+        self.current = ""
+        self.length = 0
+        self.has_content = False
+
+    def add(self, separator: str, text: str) -> bool:
+        open_tags = self._apply_tags(text)
+        addition = f"{separator if self.has_content else ''}{text}"
+        length = self.length + message_length(addition)
+
+        if length + message_length(_closing_tags(open_tags)) <= self.limit:
+            self.current, self.length, self.open_tags, self.has_content = (
+                self.current + addition, length, open_tags, True
+            )
+            return True
+
+        if not self.has_content:
+            return False
+
+        self.flush()
+        return self.add(separator, text)
+
+    def force(self, text: str):
+        self.current += text
+        self.length += message_length(text)
+        self.open_tags = self._apply_tags(text)
+        self.has_content = True
+
+    def flush(self):
+        if self.has_content and HTML_TAG.sub("", self.current).strip():
+            self.pieces.append(self.current + _closing_tags(self.open_tags))
+        # Reopen whatever was still open so every piece is valid HTML on its own
+        self.current = "".join(raw for _, raw in self.open_tags)
+        self.length = message_length(self.current)
+        self.has_content = False
+
+    def _apply_tags(self, text: str) -> List[Tuple[str, str]]:
+        open_tags = list(self.open_tags)
+        for match in HTML_TAG.finditer(text):
+            closing, name = match.group(1), match.group(2).lower()
+            if not closing:
+                open_tags.append((name, match.group(0)))
+                continue
+            for index in range(len(open_tags) - 1, -1, -1):
+                if open_tags[index][0] == name:
+                    del open_tags[index]
+                    break
+        return open_tags
+
+def _closing_tags(open_tags: List[Tuple[str, str]]) -> str:
+    return "".join(f"</{name}>" for name, _ in reversed(open_tags))
+
+def _split_block(block: str, limit: int) -> List[str]:
+    # Break at line ends first, then at whitespace outside tags, and only split inside a word as a last
+    # resort; tags and entities are never cut, and open tags are closed and reopened across pieces
+    splitter = _HtmlSplitter(limit)
+    for line in block.split("\n"):
+        if splitter.add("\n", line):
+            continue
+
+        separator = "\n"
+        for match in HTML_WORD.finditer(line):
+            separator += match.group(1)
+            word = match.group(2)
+            if not splitter.add(separator, word):
+                for index, unit in enumerate(HTML_UNIT.findall(word)):
+                    if not splitter.add(separator if index == 0 else "", unit):
+                        splitter.force(unit)
+            separator = ""
+
+    splitter.flush()
+    return splitter.pieces
+
 class TelegramClient:
     @staticmethod
-    def send_message(message: str, parse_mode: str = 'HTML', disable_preview: bool = True) -> bool:
-        url = f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage"
+    async def send_message(message: str, parse_mode: str = 'HTML', disable_preview: bool = True,
+                           chat_id: str = None) -> bool:
+        chat_id = chat_id or config.CHAT_ID
         payload = {
-            'chat_id': config.CHAT_ID,
+            'chat_id': chat_id,
             'text': message,
             'parse_mode': parse_mode,
             "disable_web_page_preview": disable_preview
         }
         
-        try:
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            return True
-        except requests.RequestException as e:
-            logger.error(f"Failed to send Telegram message: {e}")
-            return False
+        queued = await outbound_queue.put(chat_id, payload)
+        if not queued:
+            logger.error(f"Failed to queue Telegram message for chat {chat_id}")
+        return queued
+
+    @staticmethod
+    async def broadcast(message: str, chat_ids: List[str], parse_mode: str = 'HTML',
+                        disable_preview: bool = True) -> int:
+        queued = 0
+        for chat_id in chat_ids:
+            if await TelegramClient.send_message(message, parse_mode, disable_preview, chat_id=chat_id):
+                queued += 1
+        return queued
+
+    @staticmethod
+    async def flush(timeout: float = None) -> bool:
+        return await outbound_queue.flush(timeout)
+
+    @staticmethod
+    def stats() -> Dict[str, float]:
+        return outbound_queue.stats()
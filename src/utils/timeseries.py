@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import math
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+import numpy as np
+from src.utils.scheduler import Scheduler
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+RAW_TIER = "raw"
+HOURLY_TIER = "hourly"
+
+class TimeSeriesStore:
+    def __init__(self, root: str = None, raw_retention_days: int = None, hourly_retention_days: int = None):
+        self.root = root or config.TIMESERIES_DIR
+        self.raw_retention_days = raw_retention_days or config.TIMESERIES_RAW_RETENTION_DAYS
+        self.hourly_retention_days = hourly_retention_days or config.TIMESERIES_HOURLY_RETENTION_DAYS
+        self._lock = threading.RLock()
+
+    def append(self, series: str, value: float, timestamp: float = None):
+        if value is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        partition = self._partition_path(series, RAW_TIER, _day_key(timestamp))
+
+        with self._lock:
+            os.makedirs(os.path.dirname(partition), exist_ok=True)
+            with open(f"{partition}.ts", "ab") as ts_file, open(f"{partition}.val", "ab") as value_file:
+                ts_file.write(np.float64(timestamp).tobytes())
+                value_file.write(np.float64(value).tobytes())
+
+    def append_many(self, points: Dict[str, float], timestamp: float = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for series, value in points.items():
+            self.append(series, value, timestamp)
+
+    def query(self, series: str, start: float, end: float = None) -> Tuple[np.ndarray, np.ndarray]:
+        end = time.time() if end is None else end
+
+        with self._lock:
+            raw_partitions = self._partitions(series, RAW_TIER)
+            raw_start = _day_start(raw_partitions[0]) if raw_partitions else end
+
+            chunks = []
+            if start < raw_start:
+                for key in self._partitions(series, HOURLY_TIER):
+                    if _month_start(key) <= min(end, raw_start) and _next_month_start(key) > start:
+                        chunks.append(self._read_range(
+                            self._partition_path(series, HOURLY_TIER, key), start, min(end, raw_start)
+                        ))
+
+            for key in raw_partitions:
+                day_start = _day_start(key)
+                if day_start <= end and day_start + 86400 > start:
+                    chunks.append(self._read_range(self._partition_path(series, RAW_TIER, key), start, end))
+
+        if not chunks:
+            return np.empty(0), np.empty(0)
+        return np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks])
+
+    def latest(self, series: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            partitions = self._partitions(series, RAW_TIER)
+            for key in reversed(partitions):
+                timestamps, values = self._load(self._partition_path(series, RAW_TIER, key))
+                if timestamps.size:
+                    return float(timestamps[-1]), float(values[-1])
+        return None
+
+    def summary(self, series: str, start: float, end: float = None) -> Optional[Dict[str, float]]:
+        timestamps, values = self.query(series, start, end)
+        if values.size == 0:
+            return None
+
+        first, last = float(values[0]), float(values[-1])
+        return {
+            "points": int(values.size),
+            "first": first,
+            "last": last,
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "change": last - first,
+            "change_pct": (last - first) / first * 100 if first else 0.0,
+            "since": float(timestamps[0]),
+        }
+
+    def series(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.root))
+
+    def compact(self, now: float = None):
+        now = time.time() if now is None else now
+        raw_cutoff = _day_key(now - self.raw_retention_days * 86400)
+        hourly_cutoff = _month_key(now - self.hourly_retention_days * 86400)
+
+        with self._lock:
+            for series in self.series():
+                for key in self._partitions(series, RAW_TIER):
+                    if key < raw_cutoff:
+                        self._downsample(series, key)
+
+                for key in self._partitions(series, HOURLY_TIER):
+                    if key < hourly_cutoff:
+                        self._remove(self._partition_path(series, HOURLY_TIER, key))
+                        logger.info(f"Dropped hourly history {series}/{key}")
+
+    def _downsample(self, series: str, day: str):
+        raw_path = self._partition_path(series, RAW_TIER, day)
+        timestamps, values = (np.array(column) for column in self._load(raw_path))
+
+        if timestamps.size:
+            buckets = np.floor(timestamps / 3600).astype(np.int64)
+            unique_buckets, first_index, counts = np.unique(buckets, return_index=True, return_counts=True)
+            sums = np.add.reduceat(values, first_index)
+
+            hourly_path = self._partition_path(series, HOURLY_TIER, _month_key(timestamps[0]))
+            os.makedirs(os.path.dirname(hourly_path), exist_ok=True)
+            with open(f"{hourly_path}.ts", "ab") as ts_file, open(f"{hourly_path}.val", "ab") as value_file:
+                ts_file.write((unique_buckets * 3600.0).astype(np.float64).tobytes())
+                value_file.write((sums / counts).astype(np.float64).tobytes())
+
+        self._remove(raw_path)
+        logger.info(f"Downsampled {series}/{day} into hourly history")
+
+    def _read_range(self, path: str, start: float, end: float) -> Tuple[np.ndarray, np.ndarray]:
+        timestamps, values = self._load(path)
+        lower = np.searchsorted(timestamps, start, side="left")
+        upper = np.searchsorted(timestamps, end, side="right")
+        return np.array(timestamps[lower:upper]), np.array(values[lower:upper])
+
+    def _load(self, path: str) -> Tuple[np.ndarray, np.ndarray]:
+        try:
+            count = min(os.path.getsize(f"{path}.ts"), os.path.getsize(f"{path}.val")) // 8
+        except OSError:
+            count = 0
+
+        if count == 0:
+            return np.empty(0), np.empty(0)
+
+        timestamps = np.memmap(f"{path}.ts", dtype=np.float64, mode="r", shape=(count,))
+        values = np.memmap(f"{path}.val", dtype=np.float64, mode="r", shape=(count,))
+        return timestamps, values
+
+    def _partitions(self, series: str, tier: str) -> List[str]:
+        directory = os.path.join(self.root, quote(series, safe=""), tier)
+        if not os.path.isdir(directory):
+            return []
+        return sorted({name.rsplit(".", 1)[0] for name in os.listdir(directory) if name.endswith(".ts")})
+
+    def _partition_path(self, series: str, tier: str, key: str) -> str:
+        return os.path.join(self.root, quote(series, safe=""), tier, key)
+
+    def _remove(self, path: str):
+        for suffix in (".ts", ".val"):
+            try:
+                os.remove(f"{path}{suffix}")
+            except FileNotFoundError:
+                pass
+
+        directory = os.path.dirname(path)
+        if os.path.isdir(directory) and not os.listdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+
+def _day_key(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+def _month_key(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m")
+
+def _day_start(key: str) -> float:
+    return datetime.strptime(key, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+def _month_start(key: str) -> float:
+    return datetime.strptime(key, "%Y-%m").replace(tzinfo=timezone.utc).timestamp()
+
+def _next_month_start(key: str) -> float:
+    year, month = map(int, key.split("-"))
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return datetime(year, month, 1, tzinfo=timezone.utc).timestamp()
+
+def parse_window(text: str) -> Optional[float]:
+    units = {"h": 3600, "d": 86400, "w": 604800}
+    text = (text or "").strip().lower()
+    if len(text) < 2 or text[-1] not in units:
+        return None
+    try:
+        window = float(text[:-1]) * units[text[-1]]
+    except ValueError:
+        return None
+    if not math.isfinite(window) or window <= 0:
+        return None
+    # Nothing older than the hourly tier survives compaction, so a longer window would only scan empty partitions
+    return min(window, config.TIMESERIES_HOURLY_RETENTION_DAYS * 86400)
+
+history_store = TimeSeriesStore()
+
+def schedule_history_compaction(scheduler: Scheduler, store: TimeSeriesStore = history_store):
+    scheduler.add_job(
+        "history-compact", lambda: asyncio.to_thread(store.compact), config.TIMESERIES_COMPACT_INTERVAL,
+        delay=config.TIMESERIES_COMPACT_INTERVAL,
+    )
+    logger.info(f"Scheduled history compaction every {config.TIMESERIES_COMPACT_INTERVAL}s")
@@ -0,0 +1,34 @@
+from src.monitoring.adaptive_polling import AdaptivePollingPolicy
+
+def policy_after(values, step=600.0, **kwargs):
+    policy = AdaptivePollingPolicy(min_interval=60, max_interval=3600, **kwargs)
+    for index, value in enumerate(values):
+        policy.observe("p", value, observed_at=index * step)
+    return policy
+
+def test_unobserved_portfolio_keeps_its_base_interval():
+    assert AdaptivePollingPolicy(min_interval=60, max_interval=3600).interval_for({"name": "p"}, 600) == 600
+
+def test_stable_portfolio_backs_off_but_not_past_the_ceiling():
+    policy = policy_after([1000.0, 1000.1, 1000.0, 1000.1])
+
+    assert policy.interval_for({"name": "p"}, 600) == 1200
+    assert policy.interval_for({"name": "p"}, 3000) == 3600
+
+def test_volatile_portfolio_polls_faster_but_not_below_the_floor():
+    policy = policy_after([1000.0, 1500.0, 1000.0, 1500.0])
+
+    assert policy.interval_for({"name": "p"}, 600) == 300
+    assert policy.interval_for({"name": "p"}, 100) == 60
+
+def test_portfolio_near_its_threshold_polls_faster():
+    policy = policy_after([1000.0, 1000.1])
+
+    assert policy.interval_for({"name": "p", "threshold": 1020}, 600) == 150
+    assert policy.interval_for({"name": "p", "threshold": 5000}, 600) == 1200
+
+def test_base_interval_below_the_floor_is_never_stretched_or_shrunk_past_it():
+    policy = policy_after([1000.0, 1100.0, 1000.0])
+
+    assert policy.interval_for({"name": "p"}, 30) == 30
+    assert policy.stats() == {"p": 30}
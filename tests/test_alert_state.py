@@ -0,0 +1,57 @@
+from src.monitoring.alert_state import ARMED, ESCALATED, FIRED, ThresholdAlertMachine
+
+def machine():
+    return ThresholdAlertMachine(hysteresis_pct=2, cooldown=1800, escalation_step_pct=5)
+
+def test_fires_once_while_above_threshold():
+    alerts = machine()
+
+    assert alerts.evaluate("p", 990, 1000, now=0) is None
+    assert alerts.evaluate("p", 1000, 1000, now=10) == FIRED
+    assert alerts.evaluate("p", 1010, 1000, now=20) is None
+    assert alerts.snapshot()["p"]["state"] == FIRED
+
+def test_dip_inside_hysteresis_band_does_not_rearm():
+    alerts = machine()
+    alerts.evaluate("p", 1000, 1000, now=0)
+
+    assert alerts.evaluate("p", 985, 1000, now=3600) is None
+    assert alerts.evaluate("p", 1001, 1000, now=3700) is None
+    assert alerts.snapshot()["p"]["state"] == FIRED
+
+def test_rearms_below_band_and_respects_cooldown():
+    alerts = machine()
+    alerts.evaluate("p", 1000, 1000, now=0)
+
+    assert alerts.evaluate("p", 970, 1000, now=60) is None
+    assert alerts.snapshot()["p"]["state"] == ARMED
+    assert alerts.evaluate("p", 1000, 1000, now=120) is None
+    assert alerts.evaluate("p", 1000, 1000, now=1800) == FIRED
+
+def test_escalates_after_another_step_and_cooldown():
+    alerts = machine()
+    alerts.evaluate("p", 1000, 1000, now=0)
+
+    assert alerts.evaluate("p", 1060, 1000, now=600) is None
+    assert alerts.evaluate("p", 1060, 1000, now=1800) == ESCALATED
+    assert alerts.evaluate("p", 1100, 1000, now=4000) is None
+    assert alerts.evaluate("p", 1113, 1000, now=4000) == ESCALATED
+
+def test_threshold_change_rearms_and_zero_threshold_clears():
+    alerts = machine()
+    alerts.evaluate("p", 1000, 1000, now=0)
+
+    assert alerts.evaluate("p", 1000, 900, now=10) == FIRED
+    assert alerts.evaluate("p", 1000, 0, now=20) is None
+    assert "p" not in alerts.snapshot()
+
+def test_restore_resumes_fired_state():
+    alerts = machine()
+    alerts.evaluate("p", 1000, 1000, now=0)
+
+    restored = machine()
+    restored.restore(alerts.snapshot())
+
+    assert restored.evaluate("p", 1005, 1000, now=10) is None
+    assert restored.evaluate("p", 900, 1000, now=20) is None
+    assert restored.snapshot()["p"]["state"] == ARMED
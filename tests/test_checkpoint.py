@@ -0,0 +1,68 @@
+import os
+from src.utils.checkpoint import StateCheckpoint
+
+def journal_lines(checkpoint):
+    if not os.path.exists(checkpoint.journal_path):
+        return []
+    with open(checkpoint.journal_path) as f:
+        return f.read().splitlines()
+
+def test_journal_replay_applies_entries_in_order(tmp_path):
+    writer = StateCheckpoint("monitor", directory=str(tmp_path), compact_every=100)
+    writer.record("previous_values", "a", 1.0)
+    writer.record("previous_values", "b", 2.0)
+    writer.flush()
+    writer.record("previous_values", "a", 3.0)
+    writer.flush()
+
+    restored = StateCheckpoint("monitor", directory=str(tmp_path)).restore()
+
+    assert restored == {"previous_values": {"a": 3.0, "b": 2.0}}
+
+def test_unchanged_values_are_not_journaled(tmp_path):
+    checkpoint = StateCheckpoint("monitor", directory=str(tmp_path), compact_every=100)
+    checkpoint.record("ns", "a", 1)
+    checkpoint.flush()
+    checkpoint.record("ns", "a", 1)
+    checkpoint.flush()
+
+    assert len(journal_lines(checkpoint)) == 1
+
+def test_torn_journal_line_is_skipped(tmp_path):
+    writer = StateCheckpoint("monitor", directory=str(tmp_path), compact_every=100)
+    writer.record("ns", "a", 1)
+    writer.flush()
+    with open(writer.journal_path, "a") as f:
+        f.write('{"ns": "ns", "values": {"a": 2')
+
+    assert StateCheckpoint("monitor", directory=str(tmp_path)).restore() == {"ns": {"a": 1}}
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    checkpoint = StateCheckpoint("monitor", directory=str(tmp_path), compact_every=2)
+    checkpoint.record("ns", "a", 1)
+    checkpoint.flush()
+    assert len(journal_lines(checkpoint)) == 1
+
+    checkpoint.record("ns", "b", 2)
+    checkpoint.flush()
+    assert journal_lines(checkpoint) == []
+    assert os.path.exists(checkpoint.snapshot_path)
+
+    checkpoint.record("ns", "a", 5)
+    checkpoint.flush()
+
+    assert StateCheckpoint("monitor", directory=str(tmp_path)).restore() == {"ns": {"a": 5, "b": 2}}
+
+def test_restored_checkpoint_keeps_counting_toward_compaction(tmp_path):
+    writer = StateCheckpoint("monitor", directory=str(tmp_path), compact_every=3)
+    for index in range(2):
+        writer.record("ns", str(index), index)
+        writer.flush()
+
+    reader = StateCheckpoint("monitor", directory=str(tmp_path), compact_every=3)
+    reader.restore()
+    reader.record("ns", "2", 2)
+    reader.flush()
+
+    assert journal_lines(reader) == []
+    assert StateCheckpoint("monitor", directory=str(tmp_path)).restore() == {"ns": {"0": 0, "1": 1, "2": 2}}
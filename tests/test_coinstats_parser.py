@@ -0,0 +1,64 @@
+import os
+import pytest
+from src.monitoring.coinstats_parser import parse_amount, parse_percentage, parse_portfolio_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("fixture, expected", [
+    ("coinstats_nextjs.html", ("cryptowhale", 184532.17, 3.42, 6101.88)),
+    ("coinstats_state_only.html", ("hodl_queen", 52310.44, -1.87, -996.12)),
+    ("coinstats_legacy.html", ("satoshi_fan", 9874.03, -2.15, -216.9)),
+])
+def test_parses_saved_layouts(fixture, expected):
+    assert parse_portfolio_page(load_fixture(fixture)) == expected
+
+def test_missing_fields_come_back_empty():
+    html = '<html><body><div class="profile"><h1 class="user-name">lonely</h1></div><p>Loading…</p></body></html>'
+    assert parse_portfolio_page(html) == ("lonely", None, None, None)
+
+def test_empty_page_is_unknown():
+    assert parse_portfolio_page("<html><body></body></html>") == ("Unknown", None, None, None)
+
+def test_generic_containers_match_selenium_fallbacks():
+    html = (
+        '<div class="Portfolio_price-info__x1" title="$1,250.50">$1.25K</div>'
+        '<div class="Change_percent__y2">-0.75%</div>'
+        '<div class="PortfolioProfitInfo_wrapper__z3">-$9.40</div>'
+    )
+    assert parse_portfolio_page(html) == ("Unknown", 1250.5, -0.75, -9.4)
+
+def test_specific_selector_wins_over_generic_container():
+    html = (
+        '<div class="PortfolioPriceInfo_PT-price-info__a">Total'
+        '<span class="PortfolioPriceInfo_PT-price-info_price__b">$42.00</span></div>'
+    )
+    assert parse_portfolio_page(html)[1] == 42.0
+
+def test_unparseable_markup_falls_back_to_page_state():
+    html = (
+        '<div class="PortfolioProfitInfo_PTProfitInfo__e">3.1% $12.00</div>'
+        '<script id="__NEXT_DATA__" type="application/json">{"portfolio": {"totalValue": 100, "profit": 12}}</script>'
+    )
+    assert parse_portfolio_page(html) == ("Unknown", 100.0, None, 12.0)
+
+def test_broken_page_state_is_ignored():
+    html = '<script id="__NEXT_DATA__" type="application/json">{"portfolio": </script>'
+    assert parse_portfolio_page(html) == ("Unknown", None, None, None)
+
+@pytest.mark.parametrize("text, expected", [
+    ("$1,234.56", 1234.56),
+    ("($216.90)", -216.9),
+    ("-$9.40", -9.4),
+    (17, 17.0),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+def test_parse_percentage():
+    assert parse_percentage("(2.15)%") == -2.15
+    with pytest.raises(ValueError):
+        parse_percentage("n/a")
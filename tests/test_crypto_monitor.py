@@ -0,0 +1,14 @@
+from src.monitoring.crypto_monitor import CryptoMarketMonitor
+
+def test_untracked_render_leaves_the_scheduled_baseline_alone():
+    monitor = CryptoMarketMonitor()
+    monitor.previous_prices["BTC"] = 100.0
+    filtered = {"BTC": {"name": "Bitcoin", "price": 110.0}}
+
+    untracked = monitor._build_ticker_lines(filtered, track_changes=False)
+    assert "(+10.00)" in untracked["BTC"]
+    assert monitor.previous_prices["BTC"] == 100.0
+
+    tracked = monitor._build_ticker_lines(filtered)
+    assert "(+10.00)" in tracked["BTC"]
+    assert monitor.previous_prices["BTC"] == 110.0
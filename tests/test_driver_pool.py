@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+from src.monitoring.driver_pool import ChromeDriverPool
+
+class FakeDriver:
+    def __init__(self, pid: int):
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=pid))
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        return 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_calls += 1
+
+def test_driver_is_recycled_when_process_tree_rss_grows(monkeypatch):
+    pool = ChromeDriverPool(lambda: FakeDriver(os.getpid()), size=1, max_navigations=100, max_memory_growth_mb=100)
+    readings = iter([200.0, 250.0, 350.0])
+    monkeypatch.setattr(pool, "_process_tree_rss_mb", lambda pooled: next(readings))
+
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+
+    pool.release(first)
+    assert first.driver.quit_calls == 1
+    assert pool.stats()["recycled_memory"] == 1
+
+def rss_of(pool: ChromeDriverPool, pid: int) -> float:
+    return pool._process_tree_rss_mb(SimpleNamespace(driver=FakeDriver(pid)))
+
+def test_process_tree_rss_includes_child_processes():
+    pool = ChromeDriverPool(lambda: None, size=1)
+    child = subprocess.Popen(
+        [sys.executable, "-c", "import time; data = b'x' * 64 * 2 ** 20; print('ready', flush=True); time.sleep(30)"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        child.stdout.readline()
+        child_rss, tree_rss = rss_of(pool, child.pid), rss_of(pool, os.getpid())
+    finally:
+        child.kill()
+        child.wait()
+
+    assert child_rss >= 64
+    assert tree_rss > child_rss
+
+def test_driver_without_a_local_service_has_no_reading():
+    pool = ChromeDriverPool(lambda: None, size=1)
+
+    assert pool._process_tree_rss_mb(SimpleNamespace(driver=object())) is None
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import logging
+import httpx
+from config.settings import config
+from src.utils.message_queue import OutboundQueue
+
+def run_queue(handler, messages, max_size=None):
+    requests = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        requests.append(payload)
+        return handler(payload, requests)
+
+    async def scenario():
+        queue = OutboundQueue(max_size=max_size, client=httpx.AsyncClient(transport=httpx.MockTransport(record)))
+        for chat_id, text in messages:
+            assert await queue.put(chat_id, {"chat_id": chat_id, "text": text}, timeout=1)
+        assert await queue.stop(timeout=10)
+        return queue.stats()
+
+    return asyncio.run(scenario()), requests
+
+def ok(payload, requests):
+    return httpx.Response(200, json={"ok": True})
+
+def test_messages_for_one_chat_are_sent_in_order(monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_CHAT_RATE", 1000)
+    stats, requests = run_queue(ok, [("1", "a"), ("2", "x"), ("1", "b"), ("1", "c")])
+
+    assert [r["text"] for r in requests if r["chat_id"] == "1"] == ["a", "b", "c"]
+    assert stats["sent"] == 4 and stats["depth"] == 0
+
+def test_rate_limited_message_is_retried_without_counting_an_attempt(monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_CHAT_RATE", 1000)
+
+    def limit_first(payload, requests):
+        if len(requests) == 1:
+            return httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 0.01}})
+        return httpx.Response(200, json={"ok": True})
+
+    stats, requests = run_queue(limit_first, [("1", "a")])
+
+    assert len(requests) == 2
+    assert stats["rate_limited"] == 1 and stats["sent"] == 1 and stats["retried"] == 0
+
+def test_rejected_message_is_logged_with_chat_and_description(caplog):
+    def reject(payload, requests):
+        return httpx.Response(400, json={"ok": False, "description": "Bad Request: chat not found"})
+
+    with caplog.at_level(logging.ERROR, logger="src.utils.message_queue"):
+        stats, requests = run_queue(reject, [("42", "a")])
+
+    assert len(requests) == 1 and stats["failed"] == 1
+    assert "chat 42" in caplog.text and "chat not found" in caplog.text
+
+def test_put_rejects_when_the_queue_stays_full(monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_CHAT_RATE", 0.01)
+
+    async def scenario():
+        queue = OutboundQueue(max_size=2, client=httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"ok": True})
+        )))
+        results = [await queue.put("1", {"chat_id": "1", "text": str(i)}, timeout=0.05) for i in range(4)]
+        stats = queue.stats()
+        await queue.stop(timeout=0)
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+    assert results == [True, True, True, False]
+    assert stats["rejected"] == 1
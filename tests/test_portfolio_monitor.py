@@ -0,0 +1,56 @@
+import asyncio
+from config.settings import config
+from src.monitoring.portfolio_monitor import PortfolioMonitor
+from src.utils.scheduler import Scheduler
+
+def run_round(monkeypatch, delays, far=(), starts=None):
+    monkeypatch.setattr(config, "PORTFOLIO_MESSAGE_MODE", "digest")
+    monkeypatch.setattr(config, "ADAPTIVE_POLLING", False)
+    monitor = PortfolioMonitor()
+    digests = []
+
+    async def fetch(url):
+        await asyncio.sleep(delays[url])
+        return "user", 100.0, 1.0, 1.0
+
+    async def send(portfolio, username, total_value, percentage_change, money_changed, digest=None):
+        digest[portfolio["name"]] = portfolio["name"]
+
+    async def send_digest(updates):
+        digests.append(sorted(updates))
+
+    monkeypatch.setattr(monitor, "fetch_portfolio_data", fetch)
+    monkeypatch.setattr(monitor, "send_portfolio_update", send)
+    monkeypatch.setattr(monitor, "send_portfolio_digest", send_digest)
+
+    async def scenario():
+        monitor.scheduler = Scheduler(jitter=0)
+        for name in delays:
+            monitor._portfolios[name] = {"name": name, "url": name}
+            monitor.scheduler.add_job(monitor.job_name(name), lambda: None, 3600, delay=100 if name in far else 0)
+
+        async def start(name):
+            await asyncio.sleep((starts or {}).get(name, 0))
+            await monitor.update_portfolio(name)
+
+        await asyncio.gather(*(start(name) for name in delays if name not in far))
+        await monitor._round_task
+        return digests
+
+    try:
+        return asyncio.run(scenario())
+    finally:
+        monitor.executor.shutdown(wait=True)
+        monitor.scraper.close()
+
+def test_digest_waits_for_every_portfolio_due_in_the_round(monkeypatch):
+    monkeypatch.setattr(config, "PORTFOLIO_DIGEST_WINDOW", 10)
+    digests = run_round(monkeypatch, {"fast": 0.0, "slow": 0.1}, starts={"slow": 0.2})
+
+    assert digests == [["fast", "slow"]]
+
+def test_portfolios_due_later_are_not_part_of_the_round(monkeypatch):
+    monkeypatch.setattr(config, "PORTFOLIO_DIGEST_WINDOW", 10)
+    digests = run_round(monkeypatch, {"now": 0.0, "later": 0.0}, far={"later"})
+
+    assert digests == [["now"]]
@@ -0,0 +1,21 @@
+import threading
+from src.monitoring.portfolio_scraper import PortfolioScraper
+
+def test_each_thread_gets_its_own_http_session():
+    scraper = PortfolioScraper(pool_size=1)
+    sessions = []
+
+    def worker():
+        sessions.append((scraper._http_session(), scraper._http_session()))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(first is second for first, second in sessions)
+    assert len({id(first) for first, _ in sessions}) == 3
+
+    scraper.close()
+    assert scraper._http_sessions == []
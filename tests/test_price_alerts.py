@@ -0,0 +1,70 @@
+from src.monitoring.price_alerts import PriceAlertEngine, _SymbolBook
+
+class Prices:
+    def __init__(self, **prices):
+        self.prices = prices
+
+    def price(self, symbol):
+        return self.prices.get(symbol)
+
+def alert(alert_id, kind, target, symbol="BTC", reference=None):
+    return {"id": alert_id, "symbol": symbol, "kind": kind, "target": target, "reference": reference, "chat_id": "1"}
+
+def test_book_crossed_includes_levels_touched_exactly():
+    book = _SymbolBook()
+    book.insert("above", 100.0, 1)
+    book.insert("above", 120.0, 2)
+    book.insert("below", 80.0, 3)
+    book.insert("below", 90.0, 4)
+
+    assert book.crossed(95.0) == []
+    assert sorted(book.crossed(100.0)) == [1]
+    assert book.crossed(90.0) == [4]
+    assert sorted(book.crossed(80.0)) == [3, 4]
+    assert sorted(book.crossed(130.0)) == [1, 2]
+
+def test_book_discard_removes_only_the_matching_id():
+    book = _SymbolBook()
+    book.insert("above", 100.0, 1)
+    book.insert("above", 100.0, 2)
+
+    book.discard("above", 100.0, 1)
+
+    assert book.crossed(100.0) == [2]
+    assert len(book) == 1
+
+def test_evaluate_fires_each_alert_once_and_removes_it():
+    engine = PriceAlertEngine()
+    engine.load([alert(1, "above", 100), alert(2, "below", 50), alert(3, "move", 10, reference=80), alert(4, "above", 1, "ETH")])
+
+    triggered = engine.evaluate(Prices(BTC=100.0))
+
+    assert sorted(a["id"] for a, _ in triggered) == [1, 3]
+    assert all(price == 100.0 for _, price in triggered)
+    assert engine.evaluate(Prices(BTC=100.0)) == []
+    assert engine.stats() == {"alerts": 2, "symbols": 2}
+
+def test_move_alert_fires_once_even_when_both_bounds_cross():
+    engine = PriceAlertEngine()
+    engine.add(alert(1, "move", 150, reference=100))
+
+    assert [a["id"] for a, _ in engine.evaluate(Prices(BTC=300.0))] == [1]
+    assert engine.stats() == {"alerts": 0, "symbols": 0}
+
+def test_removed_alert_never_fires():
+    engine = PriceAlertEngine()
+    engine.add(alert(1, "above", 100))
+
+    assert engine.remove(1)["id"] == 1
+    assert engine.remove(1) is None
+    assert engine.evaluate(Prices(BTC=1000.0)) == []
+
+def test_reused_id_replaces_the_old_levels():
+    engine = PriceAlertEngine()
+    engine.add(alert(1, "above", 100))
+    engine.remove(1)
+    engine.add(alert(1, "above", 200))
+    engine.add(alert(1, "above", 300))
+
+    assert engine.evaluate(Prices(BTC=250.0)) == []
+    assert [a["target"] for a, _ in engine.evaluate(Prices(BTC=300.0))] == [300]
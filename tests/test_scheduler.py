@@ -0,0 +1,80 @@
+import asyncio
+from src.utils.scheduler import ScheduledJob, Scheduler
+
+def make_job(anchor: float = 0.0, interval: float = 10.0) -> ScheduledJob:
+    return ScheduledJob("job", None, interval, jitter=0, retry_delay=None, anchor=anchor)
+
+def test_advance_keeps_ticks_on_the_anchor_grid():
+    scheduler, job = Scheduler(jitter=0), make_job()
+
+    scheduler._advance(job, now=0.5)
+    assert job.due == 10.0
+
+    scheduler._advance(job, now=10.9)
+    assert job.due == 20.0
+    assert job.stats["ticks_missed"] == 0
+
+def test_advance_counts_missed_ticks():
+    scheduler, job = Scheduler(jitter=0), make_job(anchor=10.0)
+
+    scheduler._advance(job, now=35.0)
+
+    assert job.due == 40.0
+    assert job.stats["ticks_missed"] == 2
+
+def run_scheduler(setup, seconds: float):
+    async def scenario():
+        scheduler = Scheduler(jitter=0)
+        jobs = setup(scheduler)
+        scheduler.start()
+        await asyncio.sleep(seconds)
+        await scheduler.stop()
+        return scheduler.stats(), jobs
+    return asyncio.run(scenario())
+
+def test_slow_job_skips_overlapping_ticks():
+    async def slow():
+        await asyncio.sleep(0.25)
+
+    stats, _ = run_scheduler(lambda scheduler: scheduler.add_job("slow", slow, 0.1), 0.4)
+
+    assert stats["slow"]["runs"] == 1
+    assert stats["slow"]["overlaps_skipped"] >= 1
+
+def test_manual_run_on_a_due_tick_is_not_an_overlap():
+    calls = []
+
+    async def record():
+        calls.append(1)
+
+    def setup(scheduler):
+        scheduler.add_job("job", record, 60)
+        assert scheduler.run_now("job")
+
+    stats, _ = run_scheduler(setup, 0.05)
+
+    assert len(calls) == 1
+    assert stats["job"]["manual_runs"] == 1
+    assert stats["job"]["overlaps_skipped"] == 0
+
+def test_run_now_triggers_between_ticks_and_refuses_while_running():
+    started = []
+
+    async def wait():
+        started.append(1)
+        await asyncio.sleep(0.2)
+
+    async def scenario():
+        scheduler = Scheduler(jitter=0)
+        scheduler.add_job("job", wait, 60, delay=60)
+        scheduler.start()
+        assert scheduler.run_now("job")
+        await asyncio.sleep(0.05)
+        refused = scheduler.run_now("job")
+        await scheduler.stop()
+        return refused, scheduler.stats()["job"]
+
+    refused, stats = asyncio.run(scenario())
+    assert started == [1]
+    assert refused is False
+    assert stats["manual_runs"] == 1 and stats["next_run_in"] > 59
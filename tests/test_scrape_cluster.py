@@ -0,0 +1,59 @@
+import time
+from src.monitoring.scrape_cluster import FAILED_RESULT, ScrapeBroker
+
+RESULT = ("user", 100.0, 1.0, 1.0)
+
+def test_leased_job_completes_once():
+    broker = ScrapeBroker(lease_seconds=60, max_attempts=3)
+    broker.submit("job", "https://example.com/p")
+
+    assert broker.lease("w1", 0) == ("job", "https://example.com/p")
+    assert broker.lease("w2", 0) is None
+    assert broker.complete("w1", "job", RESULT, {"paths": {"fast_path": 1}})
+    assert broker.collect(0) == [("job", RESULT, {"paths": {"fast_path": 1}})]
+    assert broker.stats()["completed"] == 1
+
+def test_expired_lease_is_redispatched_and_stale_result_dropped():
+    broker = ScrapeBroker(lease_seconds=0.05, max_attempts=3)
+    broker.submit("job", "https://example.com/p")
+    broker.lease("w1", 0)
+
+    time.sleep(0.1)
+    assert broker.lease("w2", 0) == ("job", "https://example.com/p")
+    assert not broker.complete("w1", "job", RESULT)
+    assert broker.complete("w2", "job", RESULT)
+
+    stats = broker.stats()
+    assert stats["redispatched"] == 1 and stats["stale_results"] == 1 and stats["completed"] == 1
+
+def test_heartbeat_keeps_the_lease_alive():
+    broker = ScrapeBroker(lease_seconds=0.1, max_attempts=3)
+    broker.submit("job", "https://example.com/p")
+    broker.lease("w1", 0)
+
+    for _ in range(4):
+        time.sleep(0.05)
+        assert broker.heartbeat("w1", "job")
+
+    assert broker.lease("w2", 0) is None
+    assert broker.stats()["redispatched"] == 0
+
+def test_job_is_abandoned_after_max_expired_leases():
+    broker = ScrapeBroker(lease_seconds=0.05, max_attempts=2)
+    broker.submit("job", "https://example.com/p")
+
+    broker.lease("w1", 0)
+    time.sleep(0.1)
+    broker.lease("w2", 0)
+    time.sleep(0.1)
+
+    assert broker.collect(0) == [("job", FAILED_RESULT, None)]
+    assert broker.stats()["abandoned"] == 1
+    assert not broker.heartbeat("w2", "job")
+
+def test_cancelled_job_is_never_leased():
+    broker = ScrapeBroker(lease_seconds=60, max_attempts=3)
+    broker.submit("job", "https://example.com/p")
+    broker.cancel("job")
+
+    assert broker.lease("w1", 0) is None
@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import pytest
+from config.settings import config
+from src.utils import storage
+from src.utils.storage import LAST_ALERT_ID_KEY, JsonStorage, SqliteStorage
+
+@pytest.fixture
+def json_files(tmp_path, monkeypatch):
+    paths = {
+        "PORTFOLIOS_FILE": tmp_path / "portfolios.json",
+        "TICKERS_FILE": tmp_path / "tickers.json",
+        "STATE_FILE": tmp_path / "state.json",
+        "ALERTS_FILE": tmp_path / "alerts.json",
+        "SUBSCRIPTIONS_FILE": tmp_path / "subscriptions.json",
+    }
+    for name, path in paths.items():
+        monkeypatch.setattr(config, name, str(path))
+    return paths
+
+def write_json(path, data):
+    path.write_text(json.dumps(data))
+
+def applied_versions(path):
+    with sqlite3.connect(path) as connection:
+        return [row[0] for row in connection.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+def test_fresh_database_imports_json_and_skips_malformed_portfolios(tmp_path, json_files):
+    write_json(json_files["PORTFOLIOS_FILE"], [
+        {"name": "main", "url": "https://example.com/a", "threshold": 100, "note": "kept"},
+        {"name": "main", "url": "https://example.com/duplicate"},
+        {"url": "https://example.com/nameless"},
+        "not a portfolio",
+    ])
+    write_json(json_files["TICKERS_FILE"], ["BTC", "ETH"])
+
+    db = SqliteStorage(str(tmp_path / "bot.db"))
+
+    assert db.load_portfolios() == [
+        {"name": "main", "url": "https://example.com/a", "threshold": 100.0,
+         "totalLostOrGainedSinceTheStartOfTheScript": 0.0, "note": "kept"}
+    ]
+    assert db.load_tickers() == ["BTC", "ETH"]
+    assert applied_versions(db.path) == [1, 2, 3, 4]
+
+def test_existing_database_is_upgraded_to_the_latest_schema(tmp_path, json_files, monkeypatch):
+    path = str(tmp_path / "bot.db")
+    write_json(json_files["PORTFOLIOS_FILE"], [{"name": "main", "url": "https://example.com/a"}])
+
+    all_migrations = storage.MIGRATIONS
+    monkeypatch.setattr(storage, "MIGRATIONS", all_migrations[:2])
+    old = SqliteStorage(path)
+    old.upsert_portfolio({"name": "added-later", "url": "https://example.com/b", "threshold": 5})
+    old.close()
+    assert applied_versions(path) == [1, 2]
+
+    write_json(json_files["ALERTS_FILE"], [
+        {"id": 3, "symbol": "BTC", "kind": "above", "target": 100000, "chat_id": 1, "created_at": 1.0}
+    ])
+    write_json(json_files["STATE_FILE"], {LAST_ALERT_ID_KEY: 7})
+    write_json(json_files["SUBSCRIPTIONS_FILE"], [{"chat_id": "42", "topics": {"market": ["BTC"]}}])
+    monkeypatch.setattr(storage, "MIGRATIONS", all_migrations)
+
+    db = SqliteStorage(path)
+
+    assert [p["name"] for p in db.load_portfolios()] == ["main", "added-later"]
+    assert [a["id"] for a in db.load_alerts()] == [3]
+    assert db.load_alerts()[0]["chat_id"] == "1"
+    assert db.add_alert({"symbol": "ETH", "kind": "below", "target": 1000, "chat_id": "1"}) == 8
+    assert db.load_subscriptions() == [{"chat_id": "42", "topics": {"market": ["BTC"]}}]
+    assert applied_versions(path) == [1, 2, 3, 4]
+
+def test_reopening_does_not_reapply_migrations(tmp_path, json_files):
+    write_json(json_files["PORTFOLIOS_FILE"], [{"name": "main", "url": "https://example.com/a"}])
+    path = str(tmp_path / "bot.db")
+    SqliteStorage(path).close()
+
+    write_json(json_files["PORTFOLIOS_FILE"], [{"name": "other", "url": "https://example.com/b"}])
+    db = SqliteStorage(path)
+
+    assert [p["name"] for p in db.load_portfolios()] == ["main"]
+    assert applied_versions(path) == [1, 2, 3, 4]
+
+def test_json_reads_are_served_from_cache_until_the_file_changes(tmp_path, json_files, monkeypatch):
+    write_json(json_files["PORTFOLIOS_FILE"], [{"name": "main", "url": "https://example.com/a"}])
+    json_storage = JsonStorage()
+    reads = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        if str(path) == str(json_files["PORTFOLIOS_FILE"]):
+            reads.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+
+    assert json_storage.get_portfolio("main")["url"] == "https://example.com/a"
+    assert json_storage.load_portfolios() == json_storage.load_portfolios()
+    assert len(reads) == 1
+
+    write_json(json_files["PORTFOLIOS_FILE"], [{"name": "main", "url": "https://example.com/changed-on-disk"}])
+    assert json_storage.get_portfolio("main")["url"] == "https://example.com/changed-on-disk"
+    assert len(reads) == 2
+
+def test_json_cache_hands_out_copies(json_files):
+    write_json(json_files["PORTFOLIOS_FILE"], [{"name": "main", "url": "https://example.com/a"}])
+    json_storage = JsonStorage()
+
+    json_storage.load_portfolios()[0]["url"] = "mutated"
+    json_storage.get_portfolio("main")["url"] = "mutated"
+
+    assert json_storage.get_portfolio("main")["url"] == "https://example.com/a"
+
+def test_json_writes_refresh_the_cache_and_index(json_files):
+    json_storage = JsonStorage()
+    json_storage.upsert_portfolio({"name": "main", "url": "https://example.com/a"})
+    json_storage.upsert_portfolio({"name": "main", "url": "https://example.com/b"})
+
+    assert json_storage.get_portfolio("main")["url"] == "https://example.com/b"
+    assert json_storage.delete_portfolio("main")
+    assert json_storage.get_portfolio("main") is None
@@ -0,0 +1,51 @@
+import pytest
+from config.settings import config
+from src.utils.subscriptions import SubscriptionRegistry, is_authorized
+
+@pytest.fixture(autouse=True)
+def chats(monkeypatch):
+    monkeypatch.setattr(config, "CHAT_ID", "100")
+    monkeypatch.setattr(config, "ALLOWED_CHAT_IDS", ["200"])
+
+def test_owner_and_allow_listed_chats_are_authorized():
+    assert is_authorized("100")
+    assert is_authorized(200)
+    assert not is_authorized("300")
+
+def test_unlisted_chat_cannot_subscribe_to_private_topics():
+    registry = SubscriptionRegistry()
+
+    with pytest.raises(PermissionError):
+        registry.subscribe("300", "portfolios")
+    with pytest.raises(PermissionError):
+        registry.subscribe("300", "thresholds", ["main"])
+
+    registry.subscribe("300", "market", ["BTC"])
+    assert registry.topics_for("300") == {"market": ["BTC"]}
+
+def test_owner_chat_receives_every_topic_by_default():
+    registry = SubscriptionRegistry()
+
+    assert registry.subscribers("portfolios", "main") == ["100"]
+    assert registry.subscribers("market", "BTC") == ["100"]
+
+def test_stored_private_subscriptions_from_unlisted_chats_are_not_delivered():
+    registry = SubscriptionRegistry()
+    registry.load([
+        {"chat_id": "200", "topics": {"portfolios": ["main"]}},
+        {"chat_id": "300", "topics": {"portfolios": None, "market": None}},
+    ])
+
+    assert sorted(registry.subscribers("portfolios", "main")) == ["100", "200"]
+    assert registry.subscribers("portfolios", "other") == ["100"]
+    assert sorted(registry.subscribers("market", "BTC")) == ["100", "300"]
+
+def test_removing_a_chat_from_the_allow_list_stops_its_private_updates(monkeypatch):
+    registry = SubscriptionRegistry()
+    registry.subscribe("200", "thresholds")
+    assert "200" in registry.subscribers("thresholds", "main")
+
+    monkeypatch.setattr(config, "ALLOWED_CHAT_IDS", [])
+
+    assert registry.subscribers("thresholds", "main") == ["100"]
+    assert registry.stats()["thresholds"] == 1
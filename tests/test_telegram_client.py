@@ -0,0 +1,40 @@
+import re
+from src.utils.telegram_client import TELEGRAM_MESSAGE_LIMIT, message_length, pack_message_blocks
+
+def assert_valid_html(message: str):
+    open_tags = []
+    for closing, name in re.findall(r"<(/?)([a-z]+)[^>]*>", message):
+        if closing:
+            assert open_tags and open_tags[-1] == name, message
+            open_tags.pop()
+        else:
+            open_tags.append(name)
+    assert not open_tags, message
+    assert not re.search(r"<[^>]*$|&#?\w*$", message), message
+
+def test_small_blocks_share_a_message():
+    assert pack_message_blocks(["<b>one</b>", "two"]) == ["<b>one</b>\n\ntwo"]
+
+def test_length_counts_utf16_code_units():
+    assert message_length("🚀") == 2
+    messages = pack_message_blocks(["🚀" * 3000])
+    assert len(messages) == 2
+    assert all(message_length(message) <= TELEGRAM_MESSAGE_LIMIT for message in messages)
+
+def test_oversized_block_keeps_tags_and_entities_intact():
+    links = " ".join(f'<a href="https://example.com/{i}">coin &amp; {i} 📈</a>' for i in range(500))
+    block = f"📊 <b>Digest {links}</b>\n<i>{'x' * 6000}</i>"
+
+    messages = pack_message_blocks(["header", block])
+
+    assert len(messages) > 2
+    for message in messages:
+        assert message_length(message) <= TELEGRAM_MESSAGE_LIMIT
+        assert_valid_html(message)
+    assert messages[1].startswith("<b>")
+    assert re.sub(r"<[^>]*>|\s", "", "".join(messages)) == re.sub(r"<[^>]*>|\s", "", "header" + block)
+
+def test_lines_are_preferred_split_points():
+    block = "\n".join(f"line {i:04d} " + "y" * 90 for i in range(100))
+    for message in pack_message_blocks([block]):
+        assert all(re.fullmatch(r"line \d{4} y{90}", line) for line in message.split("\n"))
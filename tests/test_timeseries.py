@@ -0,0 +1,14 @@
+import pytest
+from config.settings import config
+from src.utils.timeseries import parse_window
+
+@pytest.mark.parametrize("text, seconds", [("24h", 86400), ("7d", 604800), ("2w", 1209600), ("1.5h", 5400)])
+def test_parse_window_units(text, seconds):
+    assert parse_window(text) == seconds
+
+@pytest.mark.parametrize("text", ["", "h", "24", "7x", "nanh", "infd", "-infd", "0h", "-3d"])
+def test_parse_window_rejects_invalid_windows(text):
+    assert parse_window(text) is None
+
+def test_parse_window_is_capped_at_retention():
+    assert parse_window("100000d") == config.TIMESERIES_HOURLY_RETENTION_DAYS * 86400